@@ -0,0 +1,195 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Headless Lollypop application for benchmarks
+    Only databases and helpers are created, no window is shown.
+    Environment (XDG dirs, settings backend) must be set before import
+"""
+
+import gi
+gi.require_version("Gst", "1.0")
+gi.require_version("Gtk", "3.0")
+gi.require_version("GstAudio", "1.0")
+gi.require_version("GstController", "1.0")
+gi.require_version("GstPbutils", "1.0")
+from gi.repository import Gio, GLib, Gst, GstPbutils
+Gst.init(None)
+GstPbutils.pb_utils_init()
+
+import os
+import sys
+import threading
+from time import monotonic
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lollypop.settings import Settings  # noqa: E402
+from lollypop.sql_profiler import SqlProfiler  # noqa: E402
+from lollypop.database import Database  # noqa: E402
+from lollypop.database_cache import CacheDatabase  # noqa: E402
+from lollypop.database_http import HttpCacheDatabase  # noqa: E402
+from lollypop.database_albums import AlbumsDatabase  # noqa: E402
+from lollypop.database_artists import ArtistsDatabase  # noqa: E402
+from lollypop.database_genres import GenresDatabase  # noqa: E402
+from lollypop.database_tracks import TracksDatabase  # noqa: E402
+from lollypop.playlists import Playlists  # noqa: E402
+from lollypop.helper_task import TaskHelper  # noqa: E402
+from lollypop.helper_stats import StatsHelper  # noqa: E402
+from lollypop.colistening import CoListening  # noqa: E402
+from lollypop.artwork import Artwork  # noqa: E402
+from lollypop.artwork_album import AlbumArtwork  # noqa: E402
+from lollypop.artwork_mosaic import MosaicArtwork  # noqa: E402
+
+
+class HeadlessProgress:
+    """
+        Progress bar replacement
+    """
+
+    def add(self, parent):
+        pass
+
+    def set_fraction(self, fraction, parent):
+        pass
+
+
+class HeadlessContainer:
+    """
+        Container replacement
+    """
+
+    def __init__(self):
+        self.progress = HeadlessProgress()
+
+
+class HeadlessWindow:
+    """
+        Window replacement, scanner only reports progress to it
+    """
+
+    def __init__(self):
+        self.container = HeadlessContainer()
+
+    def get_scale_factor(self):
+        return 1
+
+
+class HeadlessDirector:
+    """
+        Web services director replacement, no web services
+    """
+    collection_ws = None
+
+
+class HeadlessApplication(Gio.Application):
+    """
+        Application with databases and helpers only
+    """
+
+    def __init__(self, music_uri):
+        """
+            Init application
+            @param music_uri as str
+        """
+        Gio.Application.__init__(
+            self,
+            application_id="org.gnome.Lollypop.Benchmark",
+            flags=Gio.ApplicationFlags.NON_UNIQUE)
+        self.set_default()
+        self.cursors = {}
+        self.debug = False
+        self.version = "benchmark"
+        self.sql_profiler = SqlProfiler()
+        self.settings = Settings.new()
+        self.settings.set_value("music-uris",
+                                GLib.Variant("as", [music_uri]))
+        for key in ["auto-update", "network-access"]:
+            self.settings.set_value(key, GLib.Variant("b", False))
+        self.db = Database()
+        self.cache = CacheDatabase()
+        self.http_cache = HttpCacheDatabase()
+        self.playlists = Playlists()
+        self.albums = AlbumsDatabase(self.db)
+        self.artists = ArtistsDatabase(self.db)
+        self.genres = GenresDatabase(self.db)
+        self.tracks = TracksDatabase(self.db)
+        self.task_helper = TaskHelper()
+        self.stats_helper = StatsHelper()
+        self.colistening = CoListening()
+        self.art = Artwork()
+        self.album_art = AlbumArtwork()
+        self.mosaic_art = MosaicArtwork()
+        self.window = HeadlessWindow()
+        self.ws_director = HeadlessDirector()
+        self.add_action(Gio.SimpleAction.new("update_db", None))
+        self.__scanner = None
+
+    def set_setting(self, key, value):
+        """
+            Set a setting and dispatch changes
+            @param key as str
+            @param value as GLib.Variant
+        """
+        self.settings.set_value(key, value)
+        self.iterate()
+
+    def scan(self, method, *args, timeout=600):
+        """
+            Run a scan and wait for it
+            @param method as str: CollectionScanner method
+            @param args as scanner method args
+            @param timeout as int (seconds)
+            @return float: duration in seconds
+        """
+        loop = GLib.MainLoop()
+        handler_id = self.scanner.connect("scan-finished",
+                                          lambda *ignore: loop.quit())
+        timeout_id = GLib.timeout_add_seconds(timeout, loop.quit)
+        start = monotonic()
+        getattr(self.scanner, method)(*args)
+        loop.run()
+        duration = monotonic() - start
+        self.scanner.disconnect(handler_id)
+        if duration >= timeout:
+            raise Exception("Scan timeout")
+        GLib.source_remove(timeout_id)
+        self.wait_for_tasks()
+        return duration
+
+    def iterate(self):
+        """
+            Dispatch pending main loop events
+        """
+        context = GLib.MainContext.default()
+        while context.iteration(False):
+            pass
+
+    def wait_for_tasks(self):
+        """
+            Wait for background tasks (search index, mosaics, ...)
+        """
+        for thread in threading.enumerate():
+            if thread is not threading.current_thread():
+                thread.join()
+        self.iterate()
+
+    @property
+    def scanner(self):
+        """
+            Get collection scanner
+            @return CollectionScanner
+        """
+        if self.__scanner is None:
+            from lollypop.collection_scanner import CollectionScanner
+            self.__scanner = CollectionScanner()
+        return self.__scanner
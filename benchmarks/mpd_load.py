@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Load test for Lollypop MPD server
+    Enable server with:
+    gsettings set org.gnome.Lollypop mpd-server true
+    Then run: ./benchmarks/mpd_load.py --clients 200
+"""
+
+import argparse
+import asyncio
+import json
+from time import monotonic
+
+
+class Client:
+    """
+        Minimal MPD client
+    """
+
+    def __init__(self, host, port):
+        """
+            Init client
+            @param host as str
+            @param port as int
+        """
+        self.__host = host
+        self.__port = port
+        self.__reader = None
+        self.__writer = None
+
+    async def connect(self):
+        """
+            Connect to server and read banner
+        """
+        (self.__reader, self.__writer) = await asyncio.open_connection(
+            self.__host, self.__port, limit=1 << 20)
+        banner = await self.__reader.readline()
+        if not banner.startswith(b"OK MPD"):
+            raise Exception("Invalid banner: %s" % banner)
+
+    async def command(self, line):
+        """
+            Send command and read response
+            @param line as str
+            @return [bytes]
+        """
+        self.__writer.write(("%s\n" % line).encode("utf-8"))
+        await self.__writer.drain()
+        return await self.read_response()
+
+    async def read_response(self):
+        """
+            Read response until OK/ACK
+            @return [bytes]
+        """
+        lines = []
+        while True:
+            line = await self.__reader.readline()
+            if not line:
+                raise ConnectionError("Connection closed")
+            elif line == b"OK\n":
+                return lines
+            elif line.startswith(b"ACK"):
+                raise Exception(line.decode("utf-8").strip())
+            lines.append(line)
+
+    def send(self, line):
+        """
+            Send command without reading response
+            @param line as str
+        """
+        self.__writer.write(("%s\n" % line).encode("utf-8"))
+
+    def close(self):
+        """
+            Close connection
+        """
+        if self.__writer is not None:
+            self.__writer.close()
+
+
+def get_percentiles(values):
+    """
+        Get latency percentiles in ms
+        @param values as [float]
+        @return {}
+    """
+    if not values:
+        return {}
+    values = sorted(values)
+    return {"count": len(values),
+            "p50": round(values[len(values) // 2] * 1000, 2),
+            "p95": round(values[int(len(values) * 0.95)] * 1000, 2),
+            "max": round(values[-1] * 1000, 2)}
+
+
+async def run_polling_client(args, latencies, errors):
+    """
+        Client polling status/currentsong/playlistinfo
+        @param args as argparse.Namespace
+        @param latencies as {str: [float]}
+        @param errors as [str]
+    """
+    client = Client(args.host, args.port)
+    try:
+        await client.connect()
+        for i in range(args.requests):
+            for command in ["status", "currentsong", "playlistinfo"]:
+                start = monotonic()
+                await client.command(command)
+                latencies[command].append(monotonic() - start)
+    except Exception as e:
+        errors.append(str(e))
+    finally:
+        client.close()
+
+
+async def run_idle_client(args, ready, wakeups, errors):
+    """
+        Client waiting in idle, count wake ups
+        @param args as argparse.Namespace
+        @param ready as asyncio.Event
+        @param wakeups as [float]
+        @param errors as [str]
+    """
+    client = Client(args.host, args.port)
+    try:
+        await client.connect()
+        client.send("idle player")
+        ready.set()
+        while True:
+            await client.read_response()
+            wakeups.append(monotonic())
+            client.send("idle player")
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        errors.append(str(e))
+    finally:
+        client.close()
+
+
+async def run_listallinfo(args, latencies, errors):
+    """
+        Client streaming whole collection
+        @param args as argparse.Namespace
+        @param latencies as {str: [float]}
+        @param errors as [str]
+    """
+    client = Client(args.host, args.port)
+    try:
+        await client.connect()
+        start = monotonic()
+        lines = await client.command("listallinfo")
+        latencies["listallinfo"].append(monotonic() - start)
+        latencies["listallinfo_songs"] = sum(
+            1 for line in lines if line.startswith(b"file: "))
+    except Exception as e:
+        errors.append(str(e))
+    finally:
+        client.close()
+
+
+async def run(args):
+    """
+        Run load test
+        @param args as argparse.Namespace
+        @return {}
+    """
+    latencies = {"status": [], "currentsong": [], "playlistinfo": [],
+                 "listallinfo": []}
+    errors = []
+    wakeups = []
+    idle_tasks = []
+    readies = []
+    for i in range(args.idle_clients):
+        ready = asyncio.Event()
+        readies.append(ready)
+        idle_tasks.append(asyncio.ensure_future(
+            run_idle_client(args, ready, wakeups, errors)))
+    await asyncio.wait_for(
+        asyncio.gather(*[ready.wait() for ready in readies]), 30)
+    start = monotonic()
+    tasks = [run_polling_client(args, latencies, errors)
+             for i in range(args.clients)]
+    if args.listallinfo:
+        tasks.append(run_listallinfo(args, latencies, errors))
+    # Trigger player events for idle clients
+    trigger = Client(args.host, args.port)
+    await trigger.connect()
+    trigger_start = monotonic()
+    await trigger.command("pause")
+    await trigger.command("pause")
+    await asyncio.gather(*tasks)
+    duration = monotonic() - start
+    # Let idle clients receive events
+    await asyncio.sleep(1)
+    trigger.close()
+    for task in idle_tasks:
+        task.cancel()
+    await asyncio.gather(*idle_tasks, return_exceptions=True)
+    result = {"clients": args.clients,
+              "idle_clients": args.idle_clients,
+              "duration": round(duration, 3),
+              "errors": len(errors),
+              "idle_wakeups": len(wakeups),
+              "idle_wakeup_latency": get_percentiles(
+                  [wakeup - trigger_start for wakeup in wakeups])}
+    for (command, values) in latencies.items():
+        if isinstance(values, list):
+            result[command] = get_percentiles(values)
+        else:
+            result[command] = values
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MPD server load test")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6600)
+    parser.add_argument("--clients", type=int, default=100,
+                        help="Clients polling status")
+    parser.add_argument("--idle-clients", type=int, default=100,
+                        help="Clients waiting in idle")
+    parser.add_argument("--requests", type=int, default=20,
+                        help="Requests per polling client")
+    parser.add_argument("--listallinfo", action="store_true",
+                        help="Also stream whole collection")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=4))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Micro benchmark for settings reads in SQLite functions
+    Compare noaccents() reading GSettings per row against settings snapshot
+    Needs org.gnome.Lollypop schema installed (or GSETTINGS_SCHEMA_DIR)
+    Run: ./benchmarks/settings_snapshot.py --rows 100000
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import unicodedata
+from random import choice, seed
+from time import monotonic
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from lollypop.settings import Settings  # noqa: E402
+
+
+def get_noaccents(case_sensitive_p):
+    """
+        Get noaccents() using case_sensitive_p()
+        @param case_sensitive_p as function
+        @return function
+    """
+    def noaccents(string):
+        nfkd_form = unicodedata.normalize("NFKD", string)
+        v = u"".join([c for c in nfkd_form if not unicodedata.combining(c)])
+        if case_sensitive_p():
+            return v
+        else:
+            return v.lower()
+    return noaccents
+
+
+def get_names(count):
+    """
+        Get random track names
+        @param count as int
+        @return [str]
+    """
+    seed(count)
+    letters = "abcdeéèfghiïjklmnoöpqrstuüvwxyz "
+    return ["".join(choice(letters) for i in range(20)) for i in range(count)]
+
+
+def run_query(sql, noaccents, repeat):
+    """
+        Run search query with noaccents() as SQLite function
+        @param sql as sqlite3.Connection
+        @param noaccents as function
+        @param repeat as int
+        @return float: best duration
+    """
+    sql.create_function("noaccents", 1, noaccents)
+    durations = []
+    for i in range(repeat):
+        start = monotonic()
+        sql.execute("SELECT rowid FROM tracks\
+                     WHERE noaccents(name) LIKE ?", ("%eee%",)).fetchall()
+        durations.append(monotonic() - start)
+    return min(durations)
+
+
+def run(args):
+    """
+        Run benchmark
+        @param args as argparse.Namespace
+        @return {}
+    """
+    settings = Settings.new()
+    sql = sqlite3.connect(":memory:")
+    sql.execute("CREATE TABLE tracks (name TEXT NOT NULL)")
+    sql.executemany("INSERT INTO tracks (name) VALUES (?)",
+                    [(name,) for name in get_names(args.rows)])
+    gsettings = run_query(
+        sql,
+        get_noaccents(lambda: settings.get_value(
+            "case-sensitive-search").get_boolean()),
+        args.repeat)
+    snapshot = run_query(
+        sql,
+        get_noaccents(lambda: settings.snapshot.case_sensitive_search),
+        args.repeat)
+    return {"rows": args.rows,
+            "gsettings_ms": round(gsettings * 1000, 2),
+            "snapshot_ms": round(snapshot * 1000, 2),
+            "per_row_saved_us": round(
+                (gsettings - snapshot) * 1000000 / args.rows, 3)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Settings snapshot micro benchmark")
+    parser.add_argument("--rows", type=int, default=100000,
+                        help="Rows in synthetic tracks table")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Queries per run, best is kept")
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=4))
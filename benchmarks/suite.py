@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Headless benchmark suite
+    Generate a synthetic collection in a temporary directory then time
+    collection scans, local search, albums orderings, smart playlists and
+    artwork cache. Data, cache and settings are isolated in the temporary
+    directory, settings schema is compiled from data/.
+    Run: ./benchmarks/suite.py --artists 200 --output results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from time import monotonic, time
+
+from synthetic_library import LibraryGenerator
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def setup_environment(tmp):
+    """
+        Isolate Lollypop data, cache and settings in tmp
+        @param tmp as str
+    """
+    for name in ["XDG_DATA_HOME", "XDG_CACHE_HOME", "XDG_CONFIG_HOME"]:
+        path = os.path.join(tmp, name.lower())
+        os.makedirs(path)
+        os.environ[name] = path
+    schemas = os.path.join(tmp, "schemas")
+    os.makedirs(schemas)
+    subprocess.run(["glib-compile-schemas", "--targetdir", schemas,
+                    os.path.join(ROOT, "data")], check=True)
+    os.environ["GSETTINGS_SCHEMA_DIR"] = schemas
+    os.environ["GSETTINGS_BACKEND"] = "memory"
+
+
+def measure(repeat, function, *args):
+    """
+        Time function
+        @param repeat as int
+        @param function as function
+        @param args as function args
+        @return {}: durations in ms
+    """
+    durations = []
+    for i in range(repeat):
+        start = monotonic()
+        function(*args)
+        durations.append(monotonic() - start)
+    return {"best_ms": round(min(durations) * 1000, 3),
+            "mean_ms": round(sum(durations) / len(durations) * 1000, 3)}
+
+
+def bench_scans(app, generator, args):
+    """
+        Time full, unchanged and incremental scans
+        @param app as HeadlessApplication
+        @param generator as LibraryGenerator
+        @param args as argparse.Namespace
+        @return {}
+    """
+    from gi.repository import GLib
+    from lollypop.define import ScanType
+    results = {}
+    results["full_s"] = round(app.scan("update", ScanType.FULL), 3)
+    results["tracks"] = len(app.tracks.get_uris())
+    results["full_unchanged_s"] = round(app.scan("update", ScanType.FULL), 3)
+    (changed, removed) = generator.mutate(args.mutate)
+    results["incremental_changed"] = len(changed)
+    results["incremental_removed"] = len(removed)
+    results["incremental_s"] = round(
+        app.scan("update_files",
+                 [GLib.filename_to_uri(path) for path in changed],
+                 [GLib.filename_to_uri(path) for path in removed]), 3)
+    return results
+
+
+def bench_search(app, generator, args):
+    """
+        Time local search for typical and regexp queries
+        @param app as HeadlessApplication
+        @param generator as LibraryGenerator
+        @param args as argparse.Namespace
+        @return {}
+    """
+    from gi.repository import Gio, GLib
+    from lollypop.define import StorageType
+    from lollypop.search_local import LocalSearch
+    search = LocalSearch()
+    artist = generator.artists[len(generator.artists) // 2]
+    queries = [("word", artist.split()[0], False),
+               ("words", "%s %s" % (artist, generator.genres[0]), False),
+               ("short", artist[:2], False),
+               ("regexp", "^%s.*a$" % artist[:2], True)]
+    results = {}
+    for (name, query, regexp) in queries:
+        app.set_setting("regexp-search", GLib.Variant("b", regexp))
+        results[name] = measure(args.repeat, search.get, query,
+                                StorageType.COLLECTION, Gio.Cancellable())
+        app.iterate()
+    return results
+
+
+def bench_albums(app, args):
+    """
+        Time AlbumsDatabase.get_ids() for all orderings
+        @param app as HeadlessApplication
+        @param args as argparse.Namespace
+        @return {}
+    """
+    from lollypop.define import OrderBy, StorageType
+    genre_ids = [genre_id for (genre_id, name, sortname) in app.genres.get()]
+    results = {}
+    for name in ["ARTIST_YEAR", "ARTIST_TITLE", "TITLE", "YEAR_DESC",
+                 "POPULARITY", "YEAR_ASC"]:
+        orderby = getattr(OrderBy, name)
+        results[name.lower()] = measure(args.repeat, app.albums.get_ids,
+                                        [], [], StorageType.COLLECTION,
+                                        False, orderby)
+        results[name.lower() + "_genre"] = measure(
+            args.repeat, app.albums.get_ids, genre_ids[:1], [],
+            StorageType.COLLECTION, False, orderby)
+    return results
+
+
+def bench_smart_playlists(app, generator, args):
+    """
+        Time smart playlist requests, as built by SmartPlaylistView
+        @param app as HeadlessApplication
+        @param generator as LibraryGenerator
+        @param args as argparse.Namespace
+        @return {}
+    """
+    requests = {
+        "popularity": "SELECT DISTINCT(tracks.rowid) FROM tracks\
+                       WHERE ( ((tracks.popularity >= '0')) )\
+                       ORDER BY random() LIMIT 100",
+        "genre": "SELECT DISTINCT(tracks.rowid) FROM tracks, genres,\
+                  album_genres WHERE (album_genres.genre_id = genres.rowid\
+                  AND tracks.album_id = album_genres.album_id\
+                  AND ((genres.name LIKE '%%%s%%' COLLATE NOCASE)) )\
+                  ORDER BY random() LIMIT 100" % generator.genres[0][:3],
+        "artist_by_album": "SELECT DISTINCT(tracks.rowid) FROM tracks,\
+                  artists, albums, track_artists\
+                  WHERE (track_artists.artist_id = artists.rowid\
+                  AND tracks.rowid = track_artists.track_id\
+                  AND ((artists.name LIKE '%%%s%%' COLLATE NOCASE)) )\
+                  AND tracks.album_id = albums.rowid\
+                  ORDER BY albums.name LIMIT 500" % generator.artists[0][:2]
+    }
+    results = {}
+    for (name, request) in requests.items():
+        playlist_id = app.playlists.add("smart %s" % name)
+        app.playlists.set_smart(playlist_id, True)
+        app.playlists.set_smart_sql(playlist_id, request)
+        results[name] = measure(args.repeat,
+                                app.playlists.get_smart_track_uris,
+                                playlist_id)
+    app.iterate()
+    return results
+
+
+def bench_artwork(app, args):
+    """
+        Time album artwork loading from files (cold) and from cache (warm)
+        @param app as HeadlessApplication
+        @param args as argparse.Namespace
+        @return {}
+    """
+    from lollypop.define import ArtSize, StorageType
+    from lollypop.objects_album import Album
+    albums = [Album(album_id) for album_id in app.albums.get_ids(
+        [], [], StorageType.COLLECTION, False)]
+
+    def load():
+        return [app.album_art.get(album, ArtSize.BIG, ArtSize.BIG, 1)
+                for album in albums]
+    start = monotonic()
+    found = len([pixbuf for pixbuf in load() if pixbuf is not None])
+    results = {"albums": len(albums),
+               "found": found,
+               "cold_ms": round((monotonic() - start) * 1000, 3),
+               "warm": measure(args.repeat, load)}
+    app.wait_for_tasks()
+    return results
+
+
+def run(args, tmp):
+    """
+        Run benchmarks
+        @param args as argparse.Namespace
+        @param tmp as str
+        @return {}
+    """
+    root = os.path.join(tmp, "music")
+    generator = LibraryGenerator(root, args.artists, args.albums,
+                                 args.tracks, args.genres, args.featuring,
+                                 args.compilations, args.covers,
+                                 seed=args.seed)
+    results = {"timestamp": int(time()),
+               "python": platform.python_version(),
+               "library": generator.generate()}
+    setup_environment(tmp)
+    from gi.repository import GLib
+    from headless import HeadlessApplication
+    app = HeadlessApplication(GLib.filename_to_uri(root))
+    if args.profile_sql:
+        app.sql_profiler.enable()
+    results["scans"] = bench_scans(app, generator, args)
+    results["search"] = bench_search(app, generator, args)
+    results["albums"] = bench_albums(app, args)
+    results["smart_playlists"] = bench_smart_playlists(app, generator, args)
+    results["artwork"] = bench_artwork(app, args)
+    if args.profile_sql:
+        results["sql"] = app.sql_profiler.get_top(args.profile_sql)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Lollypop headless benchmark suite")
+    parser.add_argument("--artists", type=int, default=100)
+    parser.add_argument("--albums", type=int, nargs=2, default=[1, 4],
+                        metavar=("MIN", "MAX"), help="Albums per artist")
+    parser.add_argument("--tracks", type=int, nargs=2, default=[6, 14],
+                        metavar=("MIN", "MAX"), help="Tracks per album")
+    parser.add_argument("--genres", type=int, default=20)
+    parser.add_argument("--featuring", type=float, default=0.1,
+                        help="Ratio of tracks with a guest artist")
+    parser.add_argument("--compilations", type=float, default=0.05,
+                        help="Ratio of compilation albums")
+    parser.add_argument("--covers", type=float, default=0.5,
+                        help="Ratio of albums with a cover file")
+    parser.add_argument("--mutate", type=float, default=0.05,
+                        help="Ratio of tracks changed before incremental scan")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Runs per measure, best and mean are kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to file")
+    parser.add_argument("--profile-sql", type=int, default=0, metavar="N",
+                        help="Add N slowest SQL statements to results")
+    parser.add_argument("--keep", action="store_true",
+                        help="Keep temporary directory")
+    args = parser.parse_args()
+    tmp = tempfile.mkdtemp(prefix="lollypop-benchmark-")
+    try:
+        results = run(args, tmp)
+    finally:
+        if args.keep:
+            print("Data kept in %s" % tmp, file=sys.stderr)
+        else:
+            shutil.rmtree(tmp)
+    output = json.dumps(results, indent=4)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
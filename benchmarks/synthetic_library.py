@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    Synthetic collection generator for benchmarks
+    Tracks are tiny valid WAV files tagged with RIFF INFO chunks
+    (title, artist, album, genre, date), no external tool needed.
+    Run: ./benchmarks/synthetic_library.py /tmp/music --artists 100
+"""
+
+import argparse
+import json
+import os
+import struct
+import zlib
+from random import Random
+
+# Some accented syllables to exercise noaccents()
+SYLLABLES = ["ba", "be", "bo", "ca", "ci", "da", "dé", "fa", "fi", "ga",
+             "gu", "ka", "la", "lè", "lo", "ma", "mi", "mö", "na", "ni",
+             "pa", "pi", "ra", "ré", "ro", "sa", "si", "ta", "tü", "va",
+             "vo", "za"]
+
+
+class LibraryGenerator:
+    """
+        Generate a synthetic collection into a directory
+    """
+
+    def __init__(self, root, artists=50, albums=(1, 4), tracks=(6, 14),
+                 genres=20, featuring=0.1, compilations=0.05, covers=0.5,
+                 duration=100, seed=0):
+        """
+            Init generator
+            @param root as str
+            @param artists as int
+            @param albums as (int, int): albums per artist range
+            @param tracks as (int, int): tracks per album range
+            @param genres as int: genres count
+            @param featuring as float: ratio of tracks with a guest artist
+            @param compilations as float: ratio of compilation albums
+            @param covers as float: ratio of albums with a cover file
+            @param duration as int: track duration in ms
+            @param seed as int
+        """
+        self.__root = root
+        self.__artists = artists
+        self.__albums = albums
+        self.__tracks = tracks
+        self.__featuring = featuring
+        self.__compilations = compilations
+        self.__covers = covers
+        self.__duration = duration
+        self.__random = Random(seed)
+        self.__genres = [self.__get_name(1, 2).title()
+                         for i in range(genres)]
+        self.__artist_names = []
+
+    def generate(self):
+        """
+            Generate collection
+            @return {}: collection statistics
+        """
+        stats = {"artists": self.__artists, "albums": 0, "tracks": 0,
+                 "compilations": 0, "covers": 0, "bytes": 0}
+        self.__artist_names = self.__get_names(self.__artists, 1, 3)
+        for artist in self.__artist_names:
+            for i in range(self.__random.randint(*self.__albums)):
+                compilation = self.__random.random() < self.__compilations
+                album_artist = "Various" if compilation else artist
+                path = self.add_album(album_artist,
+                                      self.__get_name(1, 4).title(),
+                                      compilation)
+                stats["albums"] += 1
+                stats["compilations"] += compilation
+                for filename in os.listdir(path):
+                    filepath = os.path.join(path, filename)
+                    if filename.endswith(".wav"):
+                        stats["tracks"] += 1
+                    else:
+                        stats["covers"] += 1
+                    stats["bytes"] += os.path.getsize(filepath)
+        return stats
+
+    def add_album(self, album_artist, album, compilation=False):
+        """
+            Add an album
+            @param album_artist as str
+            @param album as str
+            @param compilation as bool: tracks from random artists
+            @return album path as str
+        """
+        path = os.path.join(self.__root, album_artist, album)
+        os.makedirs(path, exist_ok=True)
+        genre = self.__random.choice(self.__genres)
+        year = self.__random.randint(1960, 2021)
+        for number in range(1, self.__random.randint(*self.__tracks) + 1):
+            if compilation:
+                artists = [self.__random.choice(self.__artist_names)]
+            else:
+                artists = [album_artist]
+            if self.__random.random() < self.__featuring:
+                artists.append(self.__random.choice(self.__artist_names))
+            title = self.__get_name(1, 5).capitalize()
+            self.write_track(
+                os.path.join(path, "%02d - %s.wav" % (number, title)),
+                {"INAM": title, "IART": ";".join(artists), "IPRD": album,
+                 "IGNR": genre, "ICRD": str(year)})
+        if self.__random.random() < self.__covers:
+            with open(os.path.join(path, "cover.png"), "wb") as f:
+                f.write(get_png(self.__random.randint(0, 0xFFFFFF)))
+        return path
+
+    def write_track(self, filepath, tags):
+        """
+            Write a silent track with tags
+            @param filepath as str
+            @param tags as {str: str}: RIFF INFO ids and values
+        """
+        with open(filepath, "wb") as f:
+            f.write(get_wav(tags, self.__duration))
+
+    def mutate(self, ratio, seed=1):
+        """
+            Change collection for incremental scans: retag, remove files,
+            add an album
+            @param ratio as float: ratio of tracks to retag/remove
+            @param seed as int
+            @return ([str], [str]): (changed paths, removed paths)
+        """
+        random = Random(seed)
+        changed = []
+        removed = []
+        paths = sorted(get_tracks(self.__root))
+        for path in random.sample(paths, int(len(paths) * ratio)):
+            if random.random() < 0.5:
+                os.remove(path)
+                removed.append(path)
+            else:
+                (title, artist, album) = get_tags_from_path(path)
+                self.write_track(path, {"INAM": title + " (Remix)",
+                                        "IART": artist, "IPRD": album})
+                changed.append(path)
+        if self.__artist_names:
+            album_path = self.add_album(self.__artist_names[0],
+                                        self.__get_name(2, 4).title())
+            changed += get_tracks(album_path)
+        return (changed, removed)
+
+    @property
+    def genres(self):
+        """
+            Get genres names
+            @return [str]
+        """
+        return self.__genres
+
+    @property
+    def artists(self):
+        """
+            Get artists names
+            @return [str]
+        """
+        return self.__artist_names
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_name(self, min_words, max_words):
+        """
+            Get a random name
+            @param min_words as int
+            @param max_words as int
+            @return str
+        """
+        words = []
+        for i in range(self.__random.randint(min_words, max_words)):
+            words.append("".join(self.__random.choice(SYLLABLES)
+                                 for j in range(self.__random.randint(1, 3))))
+        return " ".join(words)
+
+    def __get_names(self, count, min_words, max_words):
+        """
+            Get unique random names
+            @param count as int
+            @param min_words as int
+            @param max_words as int
+            @return [str]
+        """
+        names = []
+        lowered = set()
+        while len(names) < count:
+            name = self.__get_name(min_words, max_words).title()
+            if name.lower() not in lowered:
+                lowered.add(name.lower())
+                names.append(name)
+        return names
+
+
+def get_wav(tags, duration):
+    """
+        Get a silent 8 kHz mono 8 bits WAV file
+        @param tags as {str: str}: RIFF INFO ids and values
+        @param duration as int (ms)
+        @return bytes
+    """
+    info = b"INFO"
+    for (key, value) in tags.items():
+        data = value.encode("utf-8") + b"\0"
+        if len(data) % 2:
+            data += b"\0"
+        info += key.encode("ascii") + struct.pack("<I", len(data)) + data
+    fmt = struct.pack("<HHIIHH", 1, 1, 8000, 8000, 1, 8)
+    samples = b"\x80" * (8 * duration)
+    if len(samples) % 2:
+        samples += b"\x80"
+    chunks = b"WAVE" +\
+        b"fmt " + struct.pack("<I", len(fmt)) + fmt +\
+        b"LIST" + struct.pack("<I", len(info)) + info +\
+        b"data" + struct.pack("<I", len(samples)) + samples
+    return b"RIFF" + struct.pack("<I", len(chunks)) + chunks
+
+
+def get_png(color, size=64):
+    """
+        Get a plain color PNG image
+        @param color as int: 0xRRGGBB
+        @param size as int
+        @return bytes
+    """
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data +\
+            struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+    pixel = struct.pack(">I", color)[1:]
+    rows = b"".join(b"\0" + pixel * size for i in range(size))
+    return b"\x89PNG\r\n\x1a\n" +\
+        chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)) +\
+        chunk(b"IDAT", zlib.compress(rows)) +\
+        chunk(b"IEND", b"")
+
+
+def get_tracks(root):
+    """
+        Get tracks paths in directory
+        @param root as str
+        @return [str]
+    """
+    tracks = []
+    for (dirpath, dirnames, filenames) in os.walk(root):
+        for filename in filenames:
+            if filename.endswith(".wav"):
+                tracks.append(os.path.join(dirpath, filename))
+    return tracks
+
+
+def get_tags_from_path(path):
+    """
+        Get (title, artist, album) from generated track path
+        @param path as str
+        @return (str, str, str)
+    """
+    (dirpath, filename) = os.path.split(path)
+    (dirpath, album) = os.path.split(dirpath)
+    artist = os.path.basename(dirpath)
+    title = filename[5:-4]
+    return (title, artist, album)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic collection")
+    parser.add_argument("root", help="Target directory")
+    parser.add_argument("--artists", type=int, default=50)
+    parser.add_argument("--albums", type=int, nargs=2, default=[1, 4],
+                        metavar=("MIN", "MAX"), help="Albums per artist")
+    parser.add_argument("--tracks", type=int, nargs=2, default=[6, 14],
+                        metavar=("MIN", "MAX"), help="Tracks per album")
+    parser.add_argument("--genres", type=int, default=20)
+    parser.add_argument("--featuring", type=float, default=0.1,
+                        help="Ratio of tracks with a guest artist")
+    parser.add_argument("--compilations", type=float, default=0.05,
+                        help="Ratio of compilation albums")
+    parser.add_argument("--covers", type=float, default=0.5,
+                        help="Ratio of albums with a cover file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generator = LibraryGenerator(args.root, args.artists, args.albums,
+                                 args.tracks, args.genres, args.featuring,
+                                 args.compilations, args.covers,
+                                 seed=args.seed)
+    print(json.dumps(generator.generate(), indent=4))
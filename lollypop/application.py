@@ -14,6 +14,7 @@ import gi
 gi.require_version("Gst", "1.0")
 gi.require_version("Gtk", "3.0")
 gi.require_version("GstAudio", "1.0")
+gi.require_version("GstController", "1.0")
 gi.require_version("GstPbutils", "1.0")
 gi.require_version("TotemPlParser", "1.0")
 gi.require_version("Handy", "1")
@@ -22,25 +23,26 @@ Gst.init(None)
 GstPbutils.pb_utils_init()
 
 from threading import current_thread
-from pickle import dump
 from signal import signal, SIGINT, SIGTERM
 
 from lollypop.utils import init_proxy_from_gnome
 from lollypop.application_actions import ApplicationActions
 from lollypop.application_cmdline import ApplicationCmdline
 from lollypop.utils_file import install_youtube_dl
-from lollypop.define import LOLLYPOP_DATA_PATH, StorageType
 from lollypop.database import Database
 from lollypop.player import Player
 from lollypop.inhibitor import Inhibitor
 from lollypop.artwork import Artwork
 from lollypop.artwork_album import AlbumArtwork
 from lollypop.artwork_artist import ArtistArtwork
+from lollypop.artwork_mosaic import MosaicArtwork
 from lollypop.logger import Logger
 from lollypop.ws_director import DirectorWebService
 from lollypop.sqlcursor import SqlCursor
 from lollypop.settings import Settings
 from lollypop.database_cache import CacheDatabase
+from lollypop.database_http import HttpCacheDatabase
+from lollypop.database_similars import SimilarsDatabase
 from lollypop.database_albums import AlbumsDatabase
 from lollypop.database_artists import ArtistsDatabase
 from lollypop.database_genres import GenresDatabase
@@ -48,8 +50,13 @@ from lollypop.database_tracks import TracksDatabase
 from lollypop.notification import NotificationManager
 from lollypop.playlists import Playlists
 from lollypop.helper_task import TaskHelper
+from lollypop.helper_stats import StatsHelper
 from lollypop.helper_art import ArtHelper
-from lollypop.collection_scanner import CollectionScanner
+from lollypop.colistening import CoListening
+from lollypop.startup_profiler import StartupProfiler
+from lollypop.sql_profiler import SqlProfiler
+from lollypop.player_state import PlayerState
+from lollypop.search_index import SearchIndex
 
 
 class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
@@ -67,6 +74,8 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
             @param data_dir as str
             @param app_id as str
         """
+        self.startup_profiler = StartupProfiler()
+        self.sql_profiler = SqlProfiler()
         Gtk.Application.__init__(
             self,
             application_id=app_id,
@@ -93,6 +102,8 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
         self.cursors = {}
         self.shown_sidebar_tooltip = False
         self.system_supports_color_schemes = False
+        self.mpd_server = None
+        self.__scanner = None
         self.__window = None
         self.__fs_window = None
         settings = Gio.Settings.new("org.gnome.desktop.interface")
@@ -123,6 +134,7 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
                                          None)
         except Exception as e:
             Logger.error("Application::init(): %s" % e)
+        self.startup_profiler.mark("settings")
 
         cssProviderFile = Gio.File.new_for_uri(
             "resource:///org/gnome/Lollypop/application.css")
@@ -141,28 +153,32 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
             styleContext = Gtk.StyleContext()
             styleContext.add_provider_for_screen(
                 screen, cssProvider, Gtk.STYLE_PROVIDER_PRIORITY_USER + 1)
+        self.startup_profiler.mark("css")
         self.db = Database()
         self.cache = CacheDatabase()
+        self.http_cache = HttpCacheDatabase()
         self.playlists = Playlists()
+        self.similars = SimilarsDatabase()
         self.albums = AlbumsDatabase(self.db)
         self.artists = ArtistsDatabase(self.db)
         self.genres = GenresDatabase(self.db)
         self.tracks = TracksDatabase(self.db)
+        self.startup_profiler.mark("databases")
         self.player = Player()
         self.inhibitor = Inhibitor()
-        self.scanner = CollectionScanner()
         self.notify = NotificationManager()
         self.task_helper = TaskHelper()
+        self.stats_helper = StatsHelper()
+        self.colistening = CoListening()
+        self.startup_profiler.mark("player")
         self.art_helper = ArtHelper()
         self.art = Artwork()
         self.art.update_art_size()
         self.album_art = AlbumArtwork()
         self.artist_art = ArtistArtwork()
+        self.mosaic_art = MosaicArtwork()
         self.ws_director = DirectorWebService()
-        self.ws_director.start()
-        if not self.settings.get_value("disable-mpris"):
-            from lollypop.mpris import MPRIS
-            MPRIS(self)
+        self.startup_profiler.mark("artwork")
 
         settings = Gtk.Settings.get_default()
         # Fallback setting
@@ -176,11 +192,7 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
                 self.system_supports_color_schemes = True
                 manager.set_color_scheme(Handy.ColorScheme.PREFER_LIGHT)
         ApplicationActions.__init__(self)
-        monitor = Gio.NetworkMonitor.get_default()
-        if monitor.get_network_available() and\
-                not monitor.get_network_metered() and\
-                self.settings.get_value("recent-youtube-dl"):
-            self.task_helper.run(install_youtube_dl)
+        self.startup_profiler.mark("actions")
 
     def do_startup(self):
         """
@@ -193,9 +205,14 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
             self.init()
             self.__window = Window()
             self.__window.connect("delete-event", self.__hide_on_delete)
+            self.startup_profiler.mark("window")
             self.__window.setup()
             self.__window.show()
+            self.startup_profiler.mark("window setup")
             self.player.restore_state()
+            self.startup_profiler.mark("player state")
+            # Idle sources run after pending redraws
+            GLib.idle_add(self.__on_first_frame)
 
     def quit(self, vacuum=False, wait=100):
         """
@@ -211,12 +228,15 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
             return
         self.album_art.cancellable.cancel()
         self.artist_art.cancellable.cancel()
+        self.stats_helper.flush()
         if self.settings.get_value("save-state"):
             self.__window.container.stack.save_history()
         # Then vacuum db
         if vacuum:
             self.__vacuum()
             self.art.clean_artwork()
+        if self.sql_profiler.enabled:
+            print(self.sql_profiler.report())
         Gio.Application.quit(self)
         if GLib.environ_getenv(GLib.get_environ(), "DEBUG_LEAK") is not None:
             import gc
@@ -243,6 +263,17 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
         else:
             self.__fs_window.destroy()
 
+    @property
+    def scanner(self):
+        """
+            Get collection scanner, created on first use
+            @return CollectionScanner
+        """
+        if self.__scanner is None:
+            from lollypop.collection_scanner import CollectionScanner
+            self.__scanner = CollectionScanner()
+        return self.__scanner
+
     @property
     def proxy_host(self):
         """
@@ -316,28 +347,10 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
             Save player state
         """
         if self.settings.get_value("save-state"):
-            if self.player.current_track.id is None or\
-                    self.player.current_track.storage_type &\
-                    StorageType.EPHEMERAL:
-                track_id = None
-            else:
-                track_id = self.player.current_track.id
-                # Save albums context
-                try:
-                    with open(LOLLYPOP_DATA_PATH + "/Albums.bin", "wb") as f:
-                        dump(self.player.albums, f)
-                except Exception as e:
-                    Logger.error("Application::__save_state(): %s" % e)
-            dump(track_id, open(LOLLYPOP_DATA_PATH + "/track_id.bin", "wb"))
-            dump([self.player.is_playing, self.player.is_party],
-                 open(LOLLYPOP_DATA_PATH + "/player.bin", "wb"))
-            dump(self.player.queue,
-                 open(LOLLYPOP_DATA_PATH + "/queue.bin", "wb"))
-            if self.player.current_track.id is not None:
-                position = self.player.position
-            else:
-                position = 0
-            dump(position, open(LOLLYPOP_DATA_PATH + "/position.bin", "wb"))
+            PlayerState().save(self.player)
+        self.colistening.save()
+        if self.mpd_server is not None:
+            self.mpd_server.stop()
         self.player.stop_all()
 
     def __vacuum(self):
@@ -356,7 +369,8 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
             self.artists.clean(False)
             self.genres.clean(False)
             SqlCursor.remove(self.db)
-            self.cache.clean(True)
+            self.http_cache.clean(True)
+            self.similars.clean(True)
 
             with SqlCursor(self.db) as sql:
                 sql.isolation_level = None
@@ -381,6 +395,28 @@ class Application(Gtk.Application, ApplicationActions, ApplicationCmdline):
             GLib.idle_add(self.quit, True)
         return widget.hide_on_delete()
 
+    def __on_first_frame(self):
+        """
+            Start subsystems not needed by first frame
+        """
+        self.startup_profiler.finish()
+        self.ws_director.start()
+        if not GLib.file_test(SearchIndex.PATH, GLib.FileTest.EXISTS):
+            self.task_helper.run(SearchIndex().update)
+        self.task_helper.run(self.colistening.load)
+        if not self.settings.get_value("disable-mpris"):
+            from lollypop.mpris import MPRIS
+            MPRIS(self)
+        if self.settings.get_value("mpd-server"):
+            from lollypop.mpd import MpdServer
+            self.mpd_server = MpdServer()
+            self.mpd_server.start()
+        monitor = Gio.NetworkMonitor.get_default()
+        if monitor.get_network_available() and\
+                not monitor.get_network_metered() and\
+                self.settings.get_value("recent-youtube-dl"):
+            self.task_helper.run(install_youtube_dl)
+
     def __on_activate(self, application):
         """
             Call default handler
@@ -62,6 +62,23 @@ class ApplicationCmdline:
                              GLib.OptionArg.NONE,
                              "Lollypop version",
                              None)
+        self.add_main_option("profile-startup", b"\0", GLib.OptionFlags.NONE,
+                             GLib.OptionArg.NONE,
+                             "Print startup phases duration",
+                             None)
+        self.add_main_option("rebuild-featuring", b"\0",
+                             GLib.OptionFlags.NONE,
+                             GLib.OptionArg.NONE,
+                             "Rebuild featuring artists from database",
+                             None)
+        self.add_main_option("profile-sql", b"\0", GLib.OptionFlags.NONE,
+                             GLib.OptionArg.NONE,
+                             "Record SQL statements, log slow ones",
+                             None)
+        self.add_main_option("sql-report", b"\0", GLib.OptionFlags.NONE,
+                             GLib.OptionArg.NONE,
+                             "Print slowest SQL statements (--profile-sql)",
+                             None)
         self.connect("command-line", self.__on_command_line)
         self.connect("handle-local-options", self.__on_handle_local_options)
 
@@ -110,6 +127,10 @@ class ApplicationCmdline:
             if options.contains("version"):
                 print(self.__version)
                 exit(0)
+            if options.contains("profile-startup"):
+                self.startup_profiler.enable()
+            if options.contains("profile-sql"):
+                self.sql_profiler.enable()
             self.register(None)
             if self.get_is_remote():
                 Gdk.notify_startup_complete()
@@ -171,6 +192,15 @@ class ApplicationCmdline:
                 self.player.next()
             elif options.contains("prev"):
                 self.player.prev()
+            elif options.contains("rebuild-featuring"):
+                self.task_helper.run(self.artists.update_featuring)
+            elif options.contains("sql-report"):
+                report = self.sql_profiler.report()
+                # GLib < 2.80: print in primary instance output
+                if hasattr(app_cmd_line, "print_literal"):
+                    app_cmd_line.print_literal(report + "\n")
+                else:
+                    print(report)
             elif options.contains("emulate-phone"):
                 self.window.toolbar.end.devices_popover.add_fake_phone()
             elif len(args) > 1:
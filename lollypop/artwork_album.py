@@ -232,7 +232,9 @@ class AlbumArtwork(ArtworkManager, AlbumArtworkDownloader):
                         stream, None)
                     stream.close()
             if pixbuf is None:
-                self.download(album.id)
+                # Do not queue albums without artwork found recently
+                if not self._is_missing("album:%s" % album.lp_album_id):
+                    self.download(album.id)
                 return None
             pixbuf = self.load_behaviour(pixbuf,
                                          width, height, behaviour)
@@ -114,7 +114,9 @@ class ArtistArtwork(ArtworkManager, ArtistArtworkDownloader):
                 if artwork_path is not None:
                     pixbuf = GdkPixbuf.Pixbuf.new_from_file(artwork_path)
                 else:
-                    self.download(artist)
+                    # Do not queue artists without artwork found recently
+                    if not self._is_missing("artist:%s" % artist):
+                        self.download(artist)
                     return None
                 pixbuf = self.load_behaviour(pixbuf,
                                              width, height, behaviour)
@@ -13,6 +13,9 @@
 from gi.repository import GLib, Gio
 
 import json
+from queue import Queue, Empty
+from threading import Thread, Lock
+from time import time
 
 from lollypop.define import App, GOOGLE_API_ID
 from lollypop.utils import get_network_available, emit_signal
@@ -25,11 +28,19 @@ class ArtworkDownloader:
         Need to be herited by an ArtworkManager
     """
 
+    # Items downloaded in parallel
+    __MAX_WORKERS = 3
+    # Max time to wait for providers, in seconds
+    __DEADLINE = 15
+
     def __init__(self):
         """
             Init art downloader
         """
         self.__cancellable = Gio.Cancellable()
+        self.__queue = []
+        self.__workers = 0
+        self.__queue_lock = Lock()
 
     def search_artwork_from_google(self, search, cancellable):
         """
@@ -78,6 +89,85 @@ class ArtworkDownloader:
 #######################
 # PROTECTED           #
 #######################
+    def _add_to_queue(self, item):
+        """
+            Queue item for download, start a worker if needed
+            @param item as object passed to _download_item()
+        """
+        with self.__queue_lock:
+            if item in self.__queue:
+                return
+            self.__queue.append(item)
+            if self.__workers >= self.__MAX_WORKERS:
+                return
+            self.__workers += 1
+        App().task_helper.run(self.__download_queue)
+
+    def _download_item(self, item):
+        """
+            Download artwork for item
+            @param item as object
+        """
+        pass
+
+    def _get_first_uri(self, methods, *args):
+        """
+            Query all methods concurrently, return first uri found
+            Pending methods are cancelled as soon as an uri is found
+            @param methods as [function]
+            @param args as methods arguments
+            @return (uri as str/None, exhausted as bool)
+            exhausted is True if all methods returned without result
+        """
+        def query(method, cancellable):
+            uris = []
+            try:
+                uris = method(*args, cancellable)
+            except Exception as e:
+                Logger.warning("ArtworkDownloader::_get_first_uri(): %s", e)
+            results.put(uris)
+
+        results = Queue()
+        cancellable = Gio.Cancellable()
+        for method in methods:
+            thread = Thread(target=query, args=(method, cancellable))
+            thread.daemon = True
+            thread.start()
+        pending = len(methods)
+        deadline = time() + self.__DEADLINE
+        try:
+            while pending > 0:
+                timeout = deadline - time()
+                if timeout <= 0 or self.__cancellable.is_cancelled():
+                    return (None, False)
+                try:
+                    uris = results.get(timeout=min(timeout, 0.5))
+                except Empty:
+                    continue
+                pending -= 1
+                for uri in uris:
+                    if uri:
+                        return (uri, False)
+            return (None, True)
+        finally:
+            cancellable.cancel()
+
+    def _is_missing(self, key):
+        """
+            True if artwork for key was recently not found
+            @param key as str
+            @return bool
+        """
+        days = App().settings.get_value("artwork-missing-delay").get_int32()
+        return App().cache.is_artwork_missing(key, days * 86400)
+
+    def _set_missing(self, key):
+        """
+            Remember artwork for key was not found
+            @param key as str
+        """
+        App().cache.set_artwork_missing(key)
+
     def _get_musicbrainz_mbid(self, mbid_type, string, cancellable):
         """
             Get musicbrainz mbid for type and string
@@ -96,7 +186,8 @@ class ArtworkDownloader:
             string = GLib.uri_escape_string(string, None, True)
             (status, data) = App().task_helper.load_uri_content_sync(
                                                           uri % string,
-                                                          cancellable)
+                                                          cancellable,
+                                                          cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 if mbid_type == "artist":
@@ -120,6 +211,21 @@ class ArtworkDownloader:
 #######################
 # PRIVATE             #
 #######################
+    def __download_queue(self):
+        """
+            Download artwork for queued items
+        """
+        while True:
+            with self.__queue_lock:
+                if not self.__queue or self.__cancellable.is_cancelled():
+                    self.__workers -= 1
+                    return
+                item = self.__queue.pop()
+            try:
+                self._download_item(item)
+            except Exception as e:
+                Logger.error("ArtworkDownloader::__download_queue(): %s" % e)
+
     def __on_load_google_content(self, uri, loaded, content):
         """
             Extract uris from content
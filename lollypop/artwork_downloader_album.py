@@ -40,8 +40,6 @@ class AlbumArtworkDownloader(ArtworkDownloader):
             "Deezer": self.__get_deezer_album_artwork_uri,
             "Last.fm": self.__get_lastfm_album_artwork_uri
         }
-        self.__queue = []
-        self.__downloading = False
 
     def add_from_uri(self, album, uri, cancellable):
         """
@@ -66,9 +64,7 @@ class AlbumArtworkDownloader(ArtworkDownloader):
         """
         if not get_network_available("DATA"):
             return
-        self.__queue.append(album_id)
-        if not self.__downloading:
-            App().task_helper.run(self.__download_queue)
+        self._add_to_queue(album_id)
 
     def search(self, artist, album, cancellable):
         """
@@ -88,6 +84,32 @@ class AlbumArtworkDownloader(ArtworkDownloader):
                 results.append((uri, api))
         emit_signal(self, "uri-artwork-found", results)
 
+#######################
+# PROTECTED           #
+#######################
+    def _download_item(self, album_id):
+        """
+            Download artwork for album
+            @param album_id as int
+        """
+        album = Album(album_id)
+        key = "album:%s" % album.lp_album_id
+        if self._is_missing(key):
+            return
+        artist_ids = App().albums.get_artist_ids(album_id)
+        is_compilation = artist_ids and\
+            artist_ids[0] == Type.COMPILATIONS
+        if is_compilation:
+            artist = ""
+        else:
+            artist = ", ".join(App().albums.get_artists(album_id))
+        (uri, exhausted) = self._get_first_uri(list(self.__methods.values()),
+                                               artist, album.name)
+        if uri is not None:
+            self.add_from_uri(album, uri, self.cancellable)
+        elif exhausted:
+            self._set_missing(key)
+
 #######################
 # PRIVATE             #
 #######################
@@ -107,7 +129,7 @@ class AlbumArtworkDownloader(ArtworkDownloader):
             uri = "https://api.deezer.com/search/album/?" +\
                   "q=%s&output=json" % album_formated
             (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
+                uri, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 for item in decode["data"]:
@@ -137,7 +159,7 @@ class AlbumArtworkDownloader(ArtworkDownloader):
             uri = "http://webservice.fanart.tv/v3/music/albums/%s?api_key=%s"\
                 % (mbid, FANARTTV_ID)
             (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
+                uri, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 for cover in decode["albums"][mbid]["albumcover"]:
@@ -170,7 +192,7 @@ class AlbumArtworkDownloader(ArtworkDownloader):
             headers = [("Authorization", bearer)]
             (status,
              data) = App().task_helper.load_uri_content_sync_with_headers(
-                    uri, headers, cancellable)
+                    uri, headers, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 for item in decode["albums"]["items"]:
@@ -197,7 +219,7 @@ class AlbumArtworkDownloader(ArtworkDownloader):
             uri = "https://itunes.apple.com/search" +\
                   "?entity=album&term=%s" % album_formated
             (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
+                uri, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 if "results" in decode.keys():
@@ -227,7 +249,7 @@ class AlbumArtworkDownloader(ArtworkDownloader):
                                                      artist,
                                                      album)
             (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
+                uri, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 for item in decode["album"]:
@@ -258,36 +280,3 @@ class AlbumArtworkDownloader(ArtworkDownloader):
         except:
             Logger.error("Last.FM: %s - %s", artist, album)
         return uris
-
-    def __download_queue(self):
-        """
-            Cache albums artwork (from queue)
-        """
-        self.__downloading = True
-        try:
-            while self.__queue:
-                album_id = self.__queue.pop()
-                album = App().albums.get_name(album_id)
-                artist_ids = App().albums.get_artist_ids(album_id)
-                is_compilation = artist_ids and\
-                    artist_ids[0] == Type.COMPILATIONS
-                if is_compilation:
-                    artist = ""
-                else:
-                    artist = ", ".join(App().albums.get_artists(album_id))
-                found = False
-                for api in self.__methods.keys():
-                    result = self.__methods[api](artist, album)
-                    for uri in result:
-                        self.add_from_uri(
-                            Album(album_id), uri, self.cancellable)
-                        break
-                    # Found, do not search in another helper
-                    if found:
-                        break
-                # Not found, save empty artwork
-                if not found:
-                    self.add(Album(album_id), None)
-        except Exception as e:
-            Logger.error("AlbumArtworkDownloader::__download_queue: %s" % e)
-        self.__downloading = False
@@ -38,8 +38,6 @@ class ArtistArtworkDownloader(ArtworkDownloader):
             "Spotify": self.__get_spotify_artist_artwork_uri,
             "Deezer": self.__get_deezer_artist_artwork_uri
         }
-        self.__queue = []
-        self.__downloading = False
 
     def add_from_uri(self, artist, uri, cancellable, storage_type):
         """
@@ -65,9 +63,7 @@ class ArtistArtworkDownloader(ArtworkDownloader):
         """
         if not get_network_available("DATA"):
             return
-        self.__queue.append(artist)
-        if not self.__downloading:
-            App().task_helper.run(self.__download_queue)
+        self._add_to_queue(artist)
 
     def search(self, artist, cancellable):
         """
@@ -86,6 +82,25 @@ class ArtistArtworkDownloader(ArtworkDownloader):
                 results.append((uri, api))
         emit_signal(self, "uri-artwork-found", results)
 
+#######################
+# PROTECTED           #
+#######################
+    def _download_item(self, artist):
+        """
+            Download artwork for artist
+            @param artist as str
+        """
+        key = "artist:%s" % artist
+        if self._is_missing(key):
+            return
+        (uri, exhausted) = self._get_first_uri(list(self.__methods.values()),
+                                               artist)
+        if uri is not None:
+            self.add_from_uri(artist, uri, self.cancellable,
+                              StorageType.COLLECTION)
+        elif exhausted:
+            self._set_missing(key)
+
 #######################
 # PRIVATE             #
 #######################
@@ -104,7 +119,7 @@ class ArtistArtworkDownloader(ArtworkDownloader):
             uri = "https://theaudiodb.com/api/v1/json/"
             uri += "%s/search.php?s=%s" % (AUDIODB_CLIENT_ID, artist)
             (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
+                uri, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 for item in decode["artists"]:
@@ -133,7 +148,7 @@ class ArtistArtworkDownloader(ArtworkDownloader):
             uri = "https://api.deezer.com/search/artist/?" +\
                   "q=%s&output=json&index=0" % artist_formated
             (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
+                uri, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 for item in decode["data"]:
@@ -161,7 +176,7 @@ class ArtistArtworkDownloader(ArtworkDownloader):
             uri = "http://webservice.fanart.tv/v3/music/%s?api_key=%s" % (
                 mbid, FANARTTV_ID)
             (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
+                uri, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 for item in decode["artistbackground"]:
@@ -192,7 +207,7 @@ class ArtistArtworkDownloader(ArtworkDownloader):
             headers = [("Authorization", bearer)]
             (status,
              data) = App().task_helper.load_uri_content_sync_with_headers(
-                    uri, headers, cancellable)
+                    uri, headers, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 for item in decode["artists"]["items"]:
@@ -203,29 +218,3 @@ class ArtistArtworkDownloader(ArtworkDownloader):
             Logger.error(e)
             Logger.error("Spotify: %s", uri)
         return uris
-
-    def __download_queue(self):
-        """
-            Cache artwork for all artists
-        """
-        self.__downloading = True
-        try:
-            while self.__queue:
-                artist = self.__queue.pop()
-                found = False
-                for api in self.__methods.keys():
-                    result = self.__methods[api](artist)
-                    for uri in result:
-                        found = True
-                        self.add_from_uri(artist, uri, self.cancellable,
-                                          StorageType.COLLECTION)
-                        break
-                    # Found, do not search in another helper
-                    if found:
-                        break
-                # Not found, save empty artwork
-                if not found:
-                    self.add(artist, None, StorageType.COLLECTION)
-        except Exception as e:
-            Logger.error("ArtistArtworkDownloader::__download_queue(): %s" % e)
-        self.__downloading = False
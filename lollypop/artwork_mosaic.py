@@ -0,0 +1,203 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import Gtk, Gdk, GdkPixbuf
+
+import cairo
+from random import shuffle
+
+from lollypop.define import App, Type
+from lollypop.objects_album import Album
+from lollypop.utils import get_round_surface, get_icon_name
+from lollypop.logger import Logger
+
+
+class MosaicArtwork:
+    """
+        Compose rounded mosaics of album covers for genres/decades/playlists
+        Albums used by mosaics are stored in cache database, mosaics are
+        only invalidated when their albums change.
+    """
+    __MAX_COVERS = 9
+
+    def __init__(self):
+        """
+            Init mosaics
+        """
+        # Unknown albums for previous mosaics
+        if App().cache.new_mosaics:
+            App().art.clean_rounded()
+        App().album_art.connect("album-artwork-changed",
+                                self.__on_album_artwork_changed)
+
+    def compose(self, name, album_ids, icon_name, art_size, scale_factor):
+        """
+            Compose mosaic from first album covers and add it to cache
+            @param name as str: artwork name
+            @param album_ids as [int]
+            @param icon_name as str: used if no cover available
+            @param art_size as int
+            @param scale_factor as int
+            @return cairo.Surface/None
+            @thread safe
+        """
+        try:
+            # Request covers at the size they will be painted
+            cover_size = self.__get_layout(
+                min(len(album_ids), self.__MAX_COVERS), art_size)[0]
+            pixbufs = []
+            used_album_ids = []
+            for album_id in album_ids:
+                if len(pixbufs) == self.__MAX_COVERS:
+                    break
+                pixbuf = App().album_art.get(Album(album_id),
+                                             cover_size,
+                                             cover_size,
+                                             scale_factor)
+                if pixbuf is not None:
+                    pixbufs.append(pixbuf)
+                    used_album_ids.append(album_id)
+            (size, positions) = self.__get_layout(len(pixbufs), art_size)
+            if pixbufs and size != cover_size:
+                pixbufs = [pixbuf.scale_simple(size * scale_factor,
+                                               size * scale_factor,
+                                               GdkPixbuf.InterpType.BILINEAR)
+                           for pixbuf in pixbufs]
+            elif not pixbufs:
+                theme = Gtk.IconTheme.get_default()
+                icon = theme.lookup_icon(icon_name, size,
+                                         Gtk.IconLookupFlags.USE_BUILTIN)
+                if icon is not None:
+                    pixbufs = [icon.load_icon()]
+            surface = cairo.ImageSurface(cairo.FORMAT_RGB24,
+                                         art_size, art_size)
+            ctx = cairo.Context(surface)
+            ctx.rectangle(0, 0, art_size, art_size)
+            ctx.set_source_rgb(1, 1, 1)
+            ctx.fill()
+            # Repeat covers to fill all cells
+            for (i, (x, y)) in enumerate(positions):
+                if not pixbufs:
+                    break
+                pixbuf = pixbufs[i % len(pixbufs)]
+                subsurface = Gdk.cairo_surface_create_from_pixbuf(
+                    pixbuf, scale_factor, None)
+                ctx.set_source_surface(subsurface, x * size, y * size)
+                ctx.paint()
+            rounded = get_round_surface(surface, scale_factor, art_size / 4)
+            App().art.add_to_cache(name, rounded, "ROUNDED", scale_factor)
+            App().cache.add_mosaic_album_ids(name, used_album_ids)
+            return rounded
+        except Exception as e:
+            Logger.error("MosaicArtwork::compose(): %s", e)
+            return None
+
+    def pregenerate_genres(self, storage_type, art_size, scale_factor):
+        """
+            Compose missing genre mosaics
+            @param storage_type as StorageType
+            @param art_size as int
+            @param scale_factor as int
+            @thread safe
+        """
+        try:
+            icon_name = get_icon_name(Type.GENRES)
+            for (genre_id, genre_name, sortname) in App().genres.get():
+                name = "genre_" + genre_name
+                if App().art.exists_in_cache(name, "ROUNDED",
+                                             art_size, art_size):
+                    continue
+                album_ids = App().albums.get_ids([genre_id], [],
+                                                 storage_type, True)
+                shuffle(album_ids)
+                self.compose(name, album_ids, icon_name,
+                             art_size, scale_factor)
+        except Exception as e:
+            Logger.error("MosaicArtwork::pregenerate_genres(): %s", e)
+
+    def invalidate(self, album_ids):
+        """
+            Remove mosaics from cache if albums changed
+            @param album_ids as [int]: added/removed/updated albums
+            @thread safe
+        """
+        try:
+            if not album_ids:
+                return
+            names = set(App().cache.get_mosaics_for_album_ids(album_ids))
+            # Not full mosaics may now have a new cover
+            partial_names = set(App().cache.get_partial_mosaics(
+                self.__MAX_COVERS))
+            if partial_names:
+                for album_id in album_ids:
+                    names |= self.__get_mosaics_for_album_id(album_id,
+                                                             partial_names)
+            for name in names:
+                App().art.remove_from_cache(name, "ROUNDED")
+            App().cache.remove_mosaics(list(names))
+            Logger.info("MosaicArtwork::invalidate(): %s mosaics",
+                        len(names))
+        except Exception as e:
+            Logger.error("MosaicArtwork::invalidate(): %s", e)
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_mosaics_for_album_id(self, album_id, names):
+        """
+            Get genre/decade mosaics album belongs to
+            @param album_id as int
+            @param names as set(str): mosaics to check
+            @return set(str)
+        """
+        mosaics = set()
+        for genre_id in App().albums.get_genre_ids(album_id):
+            name = "genre_%s" % App().genres.get_name(genre_id)
+            if name in names:
+                mosaics.add(name)
+        year = App().albums.get_year(album_id)
+        if year is not None:
+            for name in names:
+                if not name.startswith("decade_"):
+                    continue
+                # See AlbumsDecadeWidget
+                (first, last) = name[7:].split(" - ")
+                if int(first) <= year <= int(last):
+                    mosaics.add(name)
+        return mosaics
+
+    def __get_layout(self, count, art_size):
+        """
+            Get cover size and cells for covers count
+            @param count as int
+            @param art_size as int
+            @return (int, [(float, float)])
+        """
+        if count == 0:
+            return (art_size // 2, [(0.5, 0.5)])
+        elif count <= 2:
+            return (art_size, [(0, 0)])
+        elif count <= 5:
+            return (-(-art_size // 2), [(0, 0), (1, 0),
+                                        (0, 1), (1, 1)])
+        else:
+            return (-(-art_size // 3), [(0, 0), (1, 0), (2, 0),
+                                        (0, 1), (1, 1), (2, 1),
+                                        (0, 2), (1, 2), (2, 2)])
+
+    def __on_album_artwork_changed(self, art, album_id):
+        """
+            Invalidate mosaics for album
+            @param art as AlbumArtwork
+            @param album_id as int
+        """
+        App().task_helper.run(self.invalidate, [album_id])
@@ -0,0 +1,436 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import Gio, GLib
+
+from array import array
+from bisect import bisect_left
+from math import sqrt
+from struct import pack, unpack, calcsize
+from threading import Lock
+
+from lollypop.define import App, LOLLYPOP_DATA_PATH, StorageType
+from lollypop.logger import Logger
+
+
+class SparseMatrix:
+    """
+        Symmetric sparse matrix of floats indexed by ints
+        Each row is stored as two sorted arrays (columns, values)
+    """
+
+    def __init__(self):
+        """
+            Init matrix
+        """
+        self.__rows = {}
+        self.__totals = {}
+
+    def add(self, row, col, value):
+        """
+            Add value at (row, col) and (col, row)
+            @param row as int
+            @param col as int
+            @param value as float
+        """
+        self.__add(row, col, value)
+        self.__add(col, row, value)
+
+    def get_row(self, row):
+        """
+            Get non zero values for row
+            @param row as int
+            @return [(int, float)]
+        """
+        if row not in self.__rows.keys():
+            return []
+        (cols, values) = self.__rows[row]
+        return list(zip(cols, values))
+
+    def get_total(self, row):
+        """
+            Get sum of values for row
+            @param row as int
+            @return float
+        """
+        return self.__totals.get(row, 0.0)
+
+    def to_arrays(self):
+        """
+            Get matrix as coordinate arrays (upper triangle only)
+            @return (array("I"), array("I"), array("f"))
+        """
+        rows = array("I")
+        cols = array("I")
+        values = array("f")
+        for (row, (row_cols, row_values)) in self.__rows.items():
+            for (col, value) in zip(row_cols, row_values):
+                if col > row:
+                    rows.append(row)
+                    cols.append(col)
+                    values.append(value)
+        return (rows, cols, values)
+
+    def from_arrays(self, rows, cols, values):
+        """
+            Load matrix from coordinate arrays
+            @param rows as array("I")
+            @param cols as array("I")
+            @param values as array("f")
+        """
+        self.__rows = {}
+        self.__totals = {}
+        for (row, col, value) in zip(rows, cols, values):
+            self.add(row, col, value)
+
+    def keep(self, ids):
+        """
+            Remove rows and columns not in ids
+            @param ids as set(int)
+        """
+        kept = (array("I"), array("I"), array("f"))
+        for (row, col, value) in zip(*self.to_arrays()):
+            if row in ids and col in ids:
+                kept[0].append(row)
+                kept[1].append(col)
+                kept[2].append(value)
+        self.from_arrays(*kept)
+
+    def __len__(self):
+        """
+            Get count of non zero values in upper triangle
+            @return int
+        """
+        return sum(len(cols) for (cols, values) in self.__rows.values()) // 2
+
+#######################
+# PRIVATE             #
+#######################
+    def __add(self, row, col, value):
+        """
+            Add value at (row, col)
+            @param row as int
+            @param col as int
+            @param value as float
+        """
+        if row not in self.__rows.keys():
+            self.__rows[row] = (array("I"), array("f"))
+        (cols, values) = self.__rows[row]
+        index = bisect_left(cols, col)
+        if index < len(cols) and cols[index] == col:
+            values[index] += value
+        else:
+            cols.insert(index, col)
+            values.insert(index, value)
+        self.__totals[row] = self.__totals.get(row, 0.0) + value
+
+
+class CoListening:
+    """
+        Offline recommender based on listening sessions
+        Artists/albums played in the same session are related, scores
+        are then weighted with genre, year and BPM proximity
+    """
+
+    __PATH = "%s/colistening.bin" % LOLLYPOP_DATA_PATH
+    __HEADER = "<4sIII"
+    __MAGIC = b"LPCL"
+    __VERSION = 1
+    # Max gap between two plays of a same session, in seconds
+    __SESSION_GAP = 1800
+    # A play is related to this count of previous plays in session
+    __WINDOW = 20
+    # Save model every this count of plays
+    __SAVE_INTERVAL = 20
+
+    def __init__(self):
+        """
+            Init model
+        """
+        self.__lock = Lock()
+        self.__artists = SparseMatrix()
+        self.__albums = SparseMatrix()
+        self.__features = {}
+        self.__genres = {}
+        self.__session = []
+        self.__last_play = 0
+        self.__unsaved = 0
+        self.__loaded = False
+        self.__invalidated = False
+
+    def load(self):
+        """
+            Load model from disk, build it from history if needed
+            @thread safe
+        """
+        try:
+            if GLib.file_test(self.__PATH, GLib.FileTest.EXISTS):
+                self.__load_from_disk()
+            else:
+                self.rebuild()
+            self.__load_features()
+            self.__loaded = True
+        except Exception as e:
+            Logger.error("CoListening::load(): %s", e)
+
+    def rebuild(self):
+        """
+            Rebuild model from tracks listening history
+            @thread safe
+        """
+        artists = SparseMatrix()
+        albums = SparseMatrix()
+        session = []
+        last_play = 0
+        play = None
+        for (timestamp, album_id, artist_id) in\
+                App().tracks.get_listening_history():
+            # Rows are sorted, merge artists of a same play
+            if play is not None and play[0] == timestamp and\
+                    play[1] == album_id:
+                play[2].add(artist_id)
+                continue
+            if play is not None:
+                last_play = self.__add_to_session(
+                    artists, albums, session, last_play, *play)
+            play = (timestamp, album_id, {artist_id})
+        if play is not None:
+            self.__add_to_session(artists, albums, session,
+                                  last_play, *play)
+        with self.__lock:
+            self.__artists = artists
+            self.__albums = albums
+            self.__session = []
+        self.__invalidated = False
+        self.save()
+        Logger.info("CoListening::rebuild(): %s artists relations",
+                    len(artists))
+
+    def update(self):
+        """
+            Follow collection changes: drop removed artists and albums,
+            reload artists features
+            @thread safe
+        """
+        if not self.__loaded:
+            return
+        try:
+            if self.__invalidated:
+                self.rebuild()
+            else:
+                artist_ids = set(App().artists.get_all_ids())
+                album_ids = set(App().albums.get_all_ids())
+                with self.__lock:
+                    self.__artists.keep(artist_ids)
+                    self.__albums.keep(album_ids)
+                self.save()
+            self.__load_features()
+        except Exception as e:
+            Logger.error("CoListening::update(): %s", e)
+
+    def invalidate(self):
+        """
+            Drop model as DB ids are going to be reused (DB reset)
+            Model is rebuilt on next update
+        """
+        with self.__lock:
+            self.__artists = SparseMatrix()
+            self.__albums = SparseMatrix()
+            self.__session = []
+            self.__features = {}
+            self.__genres = {}
+        self.__invalidated = True
+        try:
+            f = Gio.File.new_for_path(self.__PATH)
+            if f.query_exists():
+                f.delete(None)
+        except Exception as e:
+            Logger.error("CoListening::invalidate(): %s", e)
+
+    def add_play(self, artist_ids, album_id, timestamp):
+        """
+            Update model with a new play
+            @param artist_ids as [int]
+            @param album_id as int
+            @param timestamp as int
+        """
+        if not self.__loaded:
+            return
+        with self.__lock:
+            self.__last_play = self.__add_to_session(
+                self.__artists, self.__albums, self.__session,
+                self.__last_play, timestamp, album_id, set(artist_ids))
+            self.__unsaved += 1
+            save = self.__unsaved >= self.__SAVE_INTERVAL
+        if save:
+            App().task_helper.run(self.save)
+
+    def get_similar_artist_ids(self, artist_ids, limit=50):
+        """
+            Get artists related to artist ids
+            @param artist_ids as [int]
+            @param limit as int
+            @return [int]
+        """
+        with self.__lock:
+            scores = self.__get_scores(self.__artists, artist_ids)
+        seed_genres = set()
+        for artist_id in artist_ids:
+            seed_genres |= self.__genres.get(artist_id, set())
+        # Complete with artists sharing a genre
+        if len(scores) < limit:
+            for (artist_id, genres) in self.__genres.items():
+                if artist_id not in scores.keys() and\
+                        artist_id not in artist_ids and\
+                        genres & seed_genres:
+                    scores[artist_id] = 0.0
+        ranked = []
+        for (artist_id, score) in scores.items():
+            bonus = self.__get_features_similarity(artist_ids, artist_id,
+                                                   seed_genres)
+            ranked.append(((score + 0.01) * (1 + bonus), artist_id))
+        ranked.sort(reverse=True)
+        return [artist_id for (score, artist_id) in ranked[:limit]]
+
+    def get_similar_album_ids(self, album_ids, limit=20):
+        """
+            Get albums related to album ids
+            @param album_ids as [int]
+            @param limit as int
+            @return [int]
+        """
+        with self.__lock:
+            scores = self.__get_scores(self.__albums, album_ids)
+        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        return [album_id for (album_id, score) in ranked[:limit]]
+
+    def save(self):
+        """
+            Save model to disk
+            @thread safe
+        """
+        try:
+            with self.__lock:
+                artists = self.__artists.to_arrays()
+                albums = self.__albums.to_arrays()
+                self.__unsaved = 0
+            tmp_path = self.__PATH + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(pack(self.__HEADER, self.__MAGIC, self.__VERSION,
+                             len(artists[0]), len(albums[0])))
+                for arrays in [artists, albums]:
+                    for a in arrays:
+                        a.tofile(f)
+            GLib.rename(tmp_path, self.__PATH)
+        except Exception as e:
+            Logger.error("CoListening::save(): %s", e)
+
+#######################
+# PRIVATE             #
+#######################
+    def __load_from_disk(self):
+        """
+            Load model from disk
+        """
+        with open(self.__PATH, "rb") as f:
+            header = f.read(calcsize(self.__HEADER))
+            (magic, version, artists_count, albums_count) = unpack(
+                self.__HEADER, header)
+            if magic != self.__MAGIC or version != self.__VERSION:
+                raise Exception("Invalid model version")
+            matrices = []
+            for count in [artists_count, albums_count]:
+                arrays = (array("I"), array("I"), array("f"))
+                for a in arrays:
+                    a.fromfile(f, count)
+                matrix = SparseMatrix()
+                matrix.from_arrays(*arrays)
+                matrices.append(matrix)
+        with self.__lock:
+            (self.__artists, self.__albums) = matrices
+
+    def __load_features(self):
+        """
+            Load artists features from DB
+        """
+        self.__features = App().artists.get_features(StorageType.COLLECTION)
+        self.__genres = App().artists.get_genre_ids_by_artist(
+            StorageType.COLLECTION)
+
+    def __add_to_session(self, artists, albums, session, last_play,
+                         timestamp, album_id, artist_ids):
+        """
+            Relate play with previous plays in session
+            @param artists as SparseMatrix
+            @param albums as SparseMatrix
+            @param session as [(int, set(int))]
+            @param last_play as int
+            @param timestamp as int
+            @param album_id as int
+            @param artist_ids as set(int)
+            @return timestamp as int
+        """
+        if timestamp - last_play > self.__SESSION_GAP:
+            session.clear()
+        for (previous_album_id, previous_artist_ids) in session:
+            if previous_album_id != album_id:
+                albums.add(album_id, previous_album_id, 1.0)
+            for artist_id in artist_ids:
+                for previous_artist_id in previous_artist_ids:
+                    if artist_id != previous_artist_id:
+                        artists.add(artist_id, previous_artist_id, 1.0)
+        session.append((album_id, artist_ids))
+        if len(session) > self.__WINDOW:
+            session.pop(0)
+        return timestamp
+
+    def __get_scores(self, matrix, ids):
+        """
+            Get cosine normalized scores for ids neighbours
+            @param matrix as SparseMatrix
+            @param ids as [int]
+            @return {int: float}
+        """
+        scores = {}
+        for row in ids:
+            row_total = matrix.get_total(row)
+            for (col, value) in matrix.get_row(row):
+                if col in ids:
+                    continue
+                norm = sqrt(row_total * matrix.get_total(col))
+                scores[col] = scores.get(col, 0.0) + value / norm
+        return scores
+
+    def __get_features_similarity(self, artist_ids, artist_id, seed_genres):
+        """
+            Get features similarity between artists and artist
+            @param artist_ids as [int]
+            @param artist_id as int
+            @param seed_genres as set(int)
+            @return float between 0 and 1
+        """
+        similarity = 0.0
+        if self.__genres.get(artist_id, set()) & seed_genres:
+            similarity += 0.5
+        if artist_id not in self.__features.keys():
+            return similarity
+        (year, bpm) = self.__features[artist_id]
+        for seed_id in artist_ids:
+            if seed_id not in self.__features.keys():
+                continue
+            (seed_year, seed_bpm) = self.__features[seed_id]
+            if year is not None and seed_year is not None:
+                similarity += max(0, 1 - abs(year - seed_year) / 20) * 0.25
+            if bpm and seed_bpm:
+                similarity += max(0, 1 - abs(bpm - seed_bpm) / 40) * 0.25
+            break
+        return similarity
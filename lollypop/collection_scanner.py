@@ -29,15 +29,18 @@ from multiprocessing import cpu_count
 from lollypop.collection_item import CollectionItem
 from lollypop.inotify import Inotify
 from lollypop.define import App, ScanType, Type, StorageType, ScanUpdate
+from lollypop.define import ArtSize
 from lollypop.define import FileType
 from lollypop.sqlcursor import SqlCursor
 from lollypop.tagreader import TagReader, Discoverer
 from lollypop.logger import Logger
 from lollypop.database_history import History
+from lollypop.search_index import SearchIndex
 from lollypop.objects_track import Track
 from lollypop.utils_file import is_audio, is_pls, get_mtime, get_file_type
 from lollypop.utils_album import tracks_to_albums
 from lollypop.utils import emit_signal, profile, split_list
+from lollypop.utils import get_default_storage_type
 from lollypop.utils import get_lollypop_album_id, get_lollypop_track_id
 
 
@@ -69,8 +72,13 @@ class CollectionScanner(GObject.GObject, TagReader):
         self.__tags = {}
         self.__items = []
         self.__notified_ids = []
+        self.__removed_album_ids = set()
         self.__pending_new_artist_ids = []
         self.__history = History()
+        # Loaded while scanning: {uri: track id}
+        # and {(basename, duration): track id}
+        self.__track_ids = None
+        self.__basename_ids = None
         self.__progress_total = 1
         self.__progress_count = 0
         self.__progress_fraction = 0
@@ -80,7 +88,7 @@ class CollectionScanner(GObject.GObject, TagReader):
             self.__inotify = Inotify()
         else:
             self.__inotify = None
-        App().albums.update_max_count()
+        App().task_helper.run(App().albums.update_max_count)
 
     def update(self, scan_type, uris=[]):
         """
@@ -113,6 +121,24 @@ class CollectionScanner(GObject.GObject, TagReader):
             # Launch scan in a separate thread
             self.__thread = App().task_helper.run(self.__scan, scan_type, uris)
 
+    def update_files(self, uris, removed_uris=[], moved_uris=[]):
+        """
+            Update database for changed files only
+            @param uris as [str]: created/modified files
+            @param removed_uris as [str]: removed files or directories
+            @param moved_uris as [(str, str)]: moved files or directories
+        """
+        if self.is_locked():
+            GLib.timeout_add(250, self.update_files,
+                             uris, removed_uris, moved_uris)
+            return
+        self.__disable_compilations = not App().settings.get_value(
+                "show-compilations")
+        App().lookup_action("update_db").set_enabled(False)
+        Logger.info("Update started")
+        self.__thread = App().task_helper.run(self.__update_files, uris,
+                                              removed_uris, moved_uris)
+
     def save_album(self, item):
         """
             Add album to DB
@@ -243,7 +269,6 @@ class CollectionScanner(GObject.GObject, TagReader):
         # Update album genres
         for genre_id in item.genre_ids:
             App().albums.add_genre(item.album_id, genre_id)
-        App().cache.clear_durations(item.album_id)
 
     def update_track(self, item):
         """
@@ -287,11 +312,11 @@ class CollectionScanner(GObject.GObject, TagReader):
                                    album_loved, album_pop, album_rate,
                                    album_synced)
             App().tracks.remove(track_id)
+            self.__removed_album_ids.add(album_id)
             genre_ids = App().tracks.get_genre_ids(track_id)
             App().albums.clean()
             App().genres.clean()
             App().artists.clean()
-            App().cache.clear_durations(album_id)
             SqlCursor.commit(App().db)
             item = CollectionItem(album_id=album_id)
             if not App().albums.get_name(album_id):
@@ -365,8 +390,9 @@ class CollectionScanner(GObject.GObject, TagReader):
             App().ws_director.collection_ws.stop()
         uris = App().tracks.get_uris()
         i = 0
+        App().colistening.invalidate()
         SqlCursor.add(App().db)
-        SqlCursor.add(self.__history)
+        self.__history.load()
         count = len(uris)
         for uri in uris:
             self.del_from_db(uri, True)
@@ -377,11 +403,10 @@ class CollectionScanner(GObject.GObject, TagReader):
         App().albums.clean(False)
         App().artists.clean(False)
         App().genres.clean(False)
-        App().cache.clear_table("duration")
         SqlCursor.commit(App().db)
         SqlCursor.remove(App().db)
-        SqlCursor.commit(self.__history)
-        SqlCursor.remove(self.__history)
+        self.__history.save()
+        self.__update_touched_albums()
         GLib.idle_add(update_ui)
 
     def __update_progress(self, current, total, allowed_diff):
@@ -398,10 +423,11 @@ class CollectionScanner(GObject.GObject, TagReader):
             GLib.idle_add(App().window.container.progress.set_fraction,
                           new_fraction, self)
 
-    def __finish(self, items):
+    def __finish(self, items, album_ids):
         """
             Notify from main thread when scan finished
             @param items as [CollectionItem]
+            @param album_ids as [int]: added/updated/removed albums
         """
         track_ids = [item.track_id for item in items]
         self.__thread = None
@@ -412,8 +438,13 @@ class CollectionScanner(GObject.GObject, TagReader):
         emit_signal(self, "scan-finished", track_ids)
         # Update max count value
         App().albums.update_max_count()
-        # Update featuring
-        App().artists.update_featuring()
+        # Nothing changed, watcher events may come every few seconds
+        if album_ids:
+            App().task_helper.run(SearchIndex().update)
+            App().task_helper.run(App().colistening.update)
+        App().task_helper.run(App().mosaic_art.pregenerate_genres,
+                              get_default_storage_type(), ArtSize.BIG,
+                              App().window.get_scale_factor())
         if App().ws_director.collection_ws is not None:
             App().ws_director.collection_ws.start()
 
@@ -424,13 +455,8 @@ class CollectionScanner(GObject.GObject, TagReader):
         """
         if self.__inotify is None:
             return
-        # Add monitors on dirs
-        for d in dirs:
-            # Handle a stop request
-            if self.__thread is None:
-                break
-            if d.startswith("file://"):
-                self.__inotify.add_monitor(d)
+        self.__inotify.add_monitors([d for d in dirs
+                                     if d.startswith("file://")])
 
     @profile
     def __get_objects_for_uris(self, scan_type, uris):
@@ -501,7 +527,6 @@ class CollectionScanner(GObject.GObject, TagReader):
         """
         try:
             self.__items = []
-            App().art.clean_rounded()
             (files, dirs, streams) = self.__get_objects_for_uris(
                 scan_type, uris)
             if len(uris) != len(streams) and not files:
@@ -518,6 +543,9 @@ class CollectionScanner(GObject.GObject, TagReader):
 
             # Get mtime of all tracks to detect which has to be updated
             db_mtimes = App().tracks.get_mtimes()
+            # Restore stats in memory
+            self.__load_track_ids()
+            self.__history.load()
             # * 2 => Scan + Save
             self.__progress_total = len(files) * 2 + len(streams)
             self.__progress_count = 0
@@ -557,14 +585,125 @@ class CollectionScanner(GObject.GObject, TagReader):
                 App().player.play_albums(albums)
             else:
                 self.__add_monitor(dirs)
-                GLib.idle_add(self.__finish, self.__items)
+                album_ids = self.__update_touched_albums()
+                GLib.idle_add(self.__finish, self.__items, album_ids)
             self.__tags = {}
             self.__items = []
             self.__pending_new_artist_ids = []
         except Exception as e:
             Logger.warning("CollectionScanner::__scan(): %s", e)
+        self.__track_ids = None
+        self.__basename_ids = None
+        self.__history.save()
         SqlCursor.remove(App().db)
 
+    def __update_files(self, uris, removed_uris, moved_uris):
+        """
+            Update database for files
+            @param uris as [str]
+            @param removed_uris as [str]
+            @param moved_uris as [(str, str)]
+            @thread safe
+        """
+        try:
+            SqlCursor.add(App().db)
+            self.__items = []
+            self.__tags = {}
+            self.__notified_ids = []
+            self.__pending_new_artist_ids = []
+            uris = list(uris)
+            self.__progress_total = max(1, len(uris) + len(moved_uris))
+            self.__progress_count = 0
+            self.__progress_fraction = 0
+            rescan_uris = []
+            for (old_uri, new_uri) in moved_uris:
+                if self.__move_uri(old_uri, new_uri):
+                    continue
+                f = Gio.File.new_for_uri(new_uri)
+                if f.query_file_type(Gio.FileQueryInfoFlags.NONE, None) ==\
+                        Gio.FileType.DIRECTORY:
+                    rescan_uris.append(new_uri)
+                else:
+                    uris.append(new_uri)
+            for uri in removed_uris:
+                for db_uri in App().tracks.get_uris([uri]):
+                    if db_uri == uri or db_uri.startswith(uri + "/"):
+                        Logger.info("Removed, file has been deleted: %s",
+                                    db_uri)
+                        self.del_from_db(db_uri, True)
+            discoverer = Discoverer()
+            mtime = int(time())
+            for uri in uris:
+                try:
+                    if not Gio.File.new_for_uri(uri).query_exists():
+                        continue
+                    if self.__scan_to_handle(uri):
+                        self.__tags[uri] = self.__get_tags(discoverer,
+                                                           uri, mtime)
+                except Exception as e:
+                    Logger.error("Scanning file: %s, %s" % (uri, e))
+            self.__items += self.__save_in_db(StorageType.COLLECTION)
+            album_ids = self.__update_touched_albums()
+            GLib.idle_add(self.__finish, self.__items, album_ids)
+            if rescan_uris:
+                GLib.idle_add(self.update, ScanType.NEW_FILES, rescan_uris)
+            self.__tags = {}
+            self.__items = []
+            self.__pending_new_artist_ids = []
+        except Exception as e:
+            Logger.warning("CollectionScanner::__update_files(): %s", e)
+        SqlCursor.remove(App().db)
+
+    def __move_uri(self, old_uri, new_uri):
+        """
+            Move tracks in DB from old uri to new uri, keep stats
+            @param old_uri as str
+            @param new_uri as str
+            @return True if tracks moved
+        """
+        track_id = App().tracks.get_id_by_uri(old_uri)
+        if track_id is None:
+            # A directory
+            if App().tracks.move_uris(old_uri, new_uri) == 0:
+                return False
+            App().albums.move_uris(old_uri, new_uri)
+        # Replaced an existing track, tags need to be read again
+        elif App().tracks.get_id_by_uri(new_uri) is not None:
+            self.del_from_db(old_uri, True)
+            return False
+        else:
+            App().tracks.set_uri(track_id, new_uri)
+            album_id = App().tracks.get_album_id(track_id)
+            old_parent = Gio.File.new_for_uri(old_uri).get_parent()
+            new_parent = Gio.File.new_for_uri(new_uri).get_parent()
+            if App().albums.get_uri(album_id) == old_parent.get_uri():
+                App().albums.set_uri(album_id, new_parent.get_uri())
+        Logger.info("Moved: %s -> %s", old_uri, new_uri)
+        return True
+
+    def __update_touched_albums(self):
+        """
+            Update featuring and mosaics for added/updated/removed albums
+            @return [int]: touched album ids
+        """
+        album_ids = list(set(self.__notified_ids) | self.__removed_album_ids)
+        self.__removed_album_ids = set()
+        App().artists.update_featuring(album_ids)
+        App().mosaic_art.invalidate(album_ids)
+        return album_ids
+
+    def __load_track_ids(self):
+        """
+            Load track ids by uri and by basename/duration
+        """
+        self.__track_ids = {}
+        self.__basename_ids = {}
+        for (uri, duration, track_id) in App().tracks.get_uris_durations():
+            self.__track_ids[uri] = track_id
+            basename = uri.split("/")[-1]
+            basename = GLib.uri_unescape_string(basename, None) or basename
+            self.__basename_ids.setdefault((basename, duration), track_id)
+
     def __scan_to_handle(self, uri):
         """
             Check if file has to be handle by scanner
@@ -743,10 +882,15 @@ class CollectionScanner(GObject.GObject, TagReader):
         duration = int(info.get_duration() / 1000000)
         Logger.debug("CollectionScanner::add2db(): Restore stats")
         # Restore stats
-        track_id = App().tracks.get_id_by_uri(uri)
-        if track_id is None:
-            track_id = App().tracks.get_id_by_basename_duration(name,
-                                                                duration)
+        if self.__track_ids is None:
+            track_id = App().tracks.get_id_by_uri(uri)
+            if track_id is None:
+                track_id = App().tracks.get_id_by_basename_duration(
+                    name, duration)
+        else:
+            track_id = self.__track_ids.get(uri)
+            if track_id is None:
+                track_id = self.__basename_ids.get((name, duration))
         if track_id is None:
             (track_pop, track_rate, track_ltime,
              album_mtime, track_loved, album_loved,
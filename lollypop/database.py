@@ -12,7 +12,6 @@
 
 from gi.repository import Gio
 
-import sqlite3
 from threading import Lock
 from random import shuffle
 import itertools
@@ -72,7 +71,9 @@ class Database:
                                               loved INT NOT NULL,
                                               mtime INT NOT NULL,
                                               storage_type INT NOT NULL,
-                                              synced INT NOT NULL)"""
+                                              synced INT NOT NULL,
+                                              duration INT NOT NULL DEFAULT 0
+                                              )"""
     __create_artists = """CREATE TABLE artists (id INTEGER PRIMARY KEY,
                                                name TEXT NOT NULL,
                                                sortname TEXT NOT NULL,
@@ -126,6 +127,76 @@ class Database:
                                                 album_id)"""
     __create_track_genres_idx = """CREATE index idx_tg ON track_genres(
                                                 track_id)"""
+    __create_featuring_idx = """CREATE index idx_fa ON featuring(
+                                                album_id)"""
+    __create_album_discs = """CREATE TABLE album_discs (
+                                                album_id INT NOT NULL,
+                                                discnumber INT NOT NULL,
+                                                duration INT NOT NULL,
+                                                PRIMARY KEY (album_id,
+                                                             discnumber))"""
+    __create_tracks_album_idx = """CREATE index idx_td ON tracks(
+                                                album_id, discnumber)"""
+    # Album and disc durations are aggregates of tracks durations
+    DURATION_TRIGGERS = [
+        """CREATE TRIGGER tracks_duration_insert AFTER INSERT ON tracks
+           BEGIN
+               UPDATE albums SET duration=duration + IFNULL(NEW.duration, 0)
+               WHERE rowid=NEW.album_id;
+               INSERT OR IGNORE INTO album_discs (album_id, discnumber,
+                                                  duration)
+               VALUES (NEW.album_id, IFNULL(NEW.discnumber, 0), 0);
+               UPDATE album_discs
+               SET duration=duration + IFNULL(NEW.duration, 0)
+               WHERE album_id=NEW.album_id
+               AND discnumber=IFNULL(NEW.discnumber, 0);
+           END""",
+        """CREATE TRIGGER tracks_duration_delete AFTER DELETE ON tracks
+           BEGIN
+               UPDATE albums SET duration=duration - IFNULL(OLD.duration, 0)
+               WHERE rowid=OLD.album_id;
+               UPDATE album_discs
+               SET duration=duration - IFNULL(OLD.duration, 0)
+               WHERE album_id=OLD.album_id
+               AND discnumber=IFNULL(OLD.discnumber, 0);
+               DELETE FROM album_discs
+               WHERE album_id=OLD.album_id
+               AND discnumber=IFNULL(OLD.discnumber, 0)
+               AND NOT EXISTS (SELECT 1 FROM tracks
+                               WHERE album_id=OLD.album_id
+                               AND IFNULL(discnumber, 0)=IFNULL(
+                                   OLD.discnumber, 0));
+           END""",
+        """CREATE TRIGGER tracks_duration_update
+           AFTER UPDATE OF duration, album_id, discnumber ON tracks
+           BEGIN
+               UPDATE albums SET duration=duration - IFNULL(OLD.duration, 0)
+               WHERE rowid=OLD.album_id;
+               UPDATE album_discs
+               SET duration=duration - IFNULL(OLD.duration, 0)
+               WHERE album_id=OLD.album_id
+               AND discnumber=IFNULL(OLD.discnumber, 0);
+               DELETE FROM album_discs
+               WHERE album_id=OLD.album_id
+               AND discnumber=IFNULL(OLD.discnumber, 0)
+               AND NOT EXISTS (SELECT 1 FROM tracks
+                               WHERE album_id=OLD.album_id
+                               AND IFNULL(discnumber, 0)=IFNULL(
+                                   OLD.discnumber, 0));
+               UPDATE albums SET duration=duration + IFNULL(NEW.duration, 0)
+               WHERE rowid=NEW.album_id;
+               INSERT OR IGNORE INTO album_discs (album_id, discnumber,
+                                                  duration)
+               VALUES (NEW.album_id, IFNULL(NEW.discnumber, 0), 0);
+               UPDATE album_discs
+               SET duration=duration + IFNULL(NEW.duration, 0)
+               WHERE album_id=NEW.album_id
+               AND discnumber=IFNULL(NEW.discnumber, 0);
+           END""",
+        """CREATE TRIGGER albums_duration_delete AFTER DELETE ON albums
+           BEGIN
+               DELETE FROM album_discs WHERE album_id=OLD.rowid;
+           END"""]
 
     def __init__(self):
         """
@@ -155,6 +226,11 @@ class Database:
                     sql.execute(self.__create_track_artists_idx)
                     sql.execute(self.__create_album_genres_idx)
                     sql.execute(self.__create_track_genres_idx)
+                    sql.execute(self.__create_album_discs)
+                    sql.execute(self.__create_tracks_album_idx)
+                    sql.execute(self.__create_featuring_idx)
+                    for trigger in self.DURATION_TRIGGERS:
+                        sql.execute(trigger)
                     sql.execute("PRAGMA user_version=%s" % upgrade.version)
             except Exception as e:
                 Logger.error("Database::__init__(): %s" % e)
@@ -206,7 +282,7 @@ class Database:
             Return a new sqlite cursor
         """
         try:
-            c = sqlite3.connect(self.DB_PATH, 600.0)
+            c = App().sql_profiler.connect(self.DB_PATH, 600.0)
             c.create_collation("LOCALIZED", LocalizedCollation())
             c.create_function("noaccents", 1, noaccents)
             c.create_function("noaccents2", 1, noaccents2)
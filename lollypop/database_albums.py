@@ -94,6 +94,19 @@ class AlbumsDatabase:
                              VALUES (?, ?)",
                             (album_id, genre_id))
 
+    def add_genre_to_albums(self, album_ids, genre_id):
+        """
+            Add genre to albums
+            @param album_ids as [int]
+            @param genre_id as int
+        """
+        with SqlCursor(self.__db, True) as sql:
+            sql.executemany("INSERT INTO album_genres (album_id, genre_id)\
+                             SELECT ?1, ?2 WHERE NOT EXISTS (\
+                                SELECT * FROM album_genres\
+                                WHERE album_id=?1 AND genre_id=?2)",
+                            [(album_id, genre_id) for album_id in album_ids])
+
     def set_artist_ids(self, album_id, artist_ids):
         """
             Set artist id
@@ -178,6 +191,17 @@ class AlbumsDatabase:
             sql.execute("UPDATE albums SET timestamp=? WHERE rowid=?",
                         (timestamp, album_id))
 
+    def set_dates(self, dates):
+        """
+            Set years and timestamps
+            @param dates as [(int, int, int)]: (album_id, year, timestamp)
+        """
+        with SqlCursor(self.__db, True) as sql:
+            sql.executemany("UPDATE albums SET year=?, timestamp=?\
+                             WHERE rowid=?",
+                            [(year, timestamp, album_id)
+                             for (album_id, year, timestamp) in dates])
+
     def set_uri(self, album_id, uri):
         """
             Set album uri for album id
@@ -188,6 +212,19 @@ class AlbumsDatabase:
             sql.execute("UPDATE albums SET uri=? WHERE rowid=?",
                         (uri, album_id))
 
+    def move_uris(self, old_uri, new_uri):
+        """
+            Replace old uri with new uri, for uri and its children
+            @param old_uri as str
+            @param new_uri as str
+        """
+        prefix = old_uri + "/"
+        with SqlCursor(self.__db, True) as sql:
+            sql.execute("UPDATE albums SET uri=? || substr(uri, ?)\
+                         WHERE uri=? OR substr(uri, 1, ?)=?",
+                        (new_uri, len(old_uri) + 1, old_uri,
+                         len(prefix), prefix))
+
     def set_storage_type(self, album_id, storage_type):
         """
             Set storage type
@@ -403,6 +440,15 @@ class AlbumsDatabase:
                              VALUES (?, 1, ?)",
                             (album_id, mtime))
 
+    def get_all_ids(self):
+        """
+            Get all albums ids
+            @return [int]
+        """
+        with SqlCursor(self.__db) as sql:
+            result = sql.execute("SELECT rowid FROM albums")
+            return list(itertools.chain(*result))
+
     def get_higher_popularity(self):
         """
             Get higher available popularity
@@ -590,6 +636,21 @@ class AlbumsDatabase:
                 return v[0]
             return -1
 
+    def get_ids_for_lp_album_ids(self, lp_album_ids):
+        """
+            Get album ids for Lollypop recording ids
+            @param lp_album_ids as [str]
+            @return {str: int}: {lp_album_id: album_id}
+        """
+        if not lp_album_ids:
+            return {}
+        with SqlCursor(self.__db) as sql:
+            request = "SELECT lp_album_id, rowid FROM albums\
+                       WHERE lp_album_id IN (%s)"
+            result = sql.execute(request % ",".join("?" * len(lp_album_ids)),
+                                 lp_album_ids)
+            return dict(result)
+
     def get_mtime(self, album_id):
         """
             Get modification time
@@ -1037,7 +1098,7 @@ class AlbumsDatabase:
         genre_ids = remove_static(genre_ids)
         artist_ids = remove_static(artist_ids)
         if orderby is None:
-            orderby = App().settings.get_enum("orderby")
+            orderby = App().settings.snapshot.orderby
         if orderby == OrderBy.ARTIST_YEAR:
             order = " ORDER BY artists.sortname\
                      COLLATE NOCASE COLLATE LOCALIZED,\
@@ -1190,7 +1251,7 @@ class AlbumsDatabase:
 
     def get_duration(self, album_id, genre_ids, artist_ids, disc_number):
         """
-            Album duration in seconds
+            Album duration in milliseconds
             @param album_id as int
             @param genre_ids as [int]
             @param artist_ids as [int]
@@ -1199,54 +1260,41 @@ class AlbumsDatabase:
         """
         genre_ids = remove_static(genre_ids)
         artist_ids = remove_static(artist_ids)
-        request = "SELECT SUM(duration) FROM ("
         with SqlCursor(self.__db) as sql:
-            if genre_ids and artist_ids:
-                filters = (album_id,)
-                filters += tuple(genre_ids)
-                filters += tuple(artist_ids)
-                request += "SELECT duration\
-                           FROM tracks, track_genres, track_artists\
-                           WHERE tracks.album_id=?\
-                           AND track_genres.track_id = tracks.rowid\
-                           AND track_artists.track_id = tracks.rowid AND"
-                request += make_subrequest("track_genres.genre_id=?",
-                                           "OR",
-                                           len(genre_ids))
-                request += " AND "
-                request += make_subrequest("track_artists.artist_id=?",
-                                           "OR",
-                                           len(artist_ids))
-            elif artist_ids:
-                filters = (album_id,)
-                filters += tuple(artist_ids)
-                request += "SELECT duration\
-                           FROM tracks, track_artists\
-                           WHERE tracks.album_id=?\
-                           AND track_artists.track_id = tracks.rowid AND"
-                request += make_subrequest("track_artists.artist_id=?",
-                                           "OR",
-                                           len(artist_ids))
-            elif genre_ids:
-                filters = (album_id,)
-                filters += tuple(genre_ids)
-                request += "SELECT duration\
-                           FROM tracks, track_genres\
-                           WHERE tracks.album_id=?\
-                           AND track_genres.track_id = tracks.rowid AND"
-                request += make_subrequest("track_genres.genre_id=?",
-                                           "OR",
-                                           len(genre_ids))
+            # Aggregates maintained by tracks triggers
+            if not genre_ids and not artist_ids:
+                if disc_number is None:
+                    result = sql.execute("SELECT duration FROM albums\
+                                          WHERE rowid=?", (album_id,))
+                else:
+                    result = sql.execute("SELECT duration FROM album_discs\
+                                          WHERE album_id=?\
+                                          AND discnumber=?",
+                                         (album_id, disc_number))
             else:
                 filters = (album_id,)
-                request += "SELECT duration\
-                           FROM tracks\
+                request = "SELECT SUM(duration) FROM tracks\
                            WHERE tracks.album_id=?"
-            if disc_number is not None:
-                filters += (disc_number,)
-                request += " AND discnumber=?"
-            request += " GROUP BY tracks.id)"
-            result = sql.execute(request, filters)
+                if disc_number is not None:
+                    filters += (disc_number,)
+                    request += " AND discnumber=?"
+                if genre_ids:
+                    filters += tuple(genre_ids)
+                    request += " AND EXISTS (SELECT 1 FROM track_genres\
+                                WHERE track_genres.track_id=tracks.rowid AND"
+                    request += make_subrequest("track_genres.genre_id=?",
+                                               "OR",
+                                               len(genre_ids))
+                    request += ")"
+                if artist_ids:
+                    filters += tuple(artist_ids)
+                    request += " AND EXISTS (SELECT 1 FROM track_artists\
+                                WHERE track_artists.track_id=tracks.rowid AND"
+                    request += make_subrequest("track_artists.artist_id=?",
+                                               "OR",
+                                               len(artist_ids))
+                    request += ")"
+                result = sql.execute(request, filters)
             v = result.fetchone()
             if v and v[0] is not None:
                 return v[0]
@@ -1302,6 +1350,25 @@ class AlbumsDatabase:
             result = sql.execute(request, filters)
             return list(result)
 
+    def get_search_entries(self, storage_type):
+        """
+            Get albums for search index
+            @param storage_type as StorageType
+            @return [(int, str, str, int, str)]:
+                    [(id, name, artists, popularity, lp_album_id)]
+        """
+        with SqlCursor(self.__db) as sql:
+            result = sql.execute("SELECT albums.rowid, albums.name,\
+                                  (SELECT group_concat(artists.name, ', ')\
+                                   FROM album_artists, artists\
+                                   WHERE album_artists.album_id=albums.rowid\
+                                   AND artists.rowid=album_artists.artist_id),\
+                                  albums.popularity, albums.lp_album_id\
+                                  FROM albums\
+                                  WHERE albums.storage_type & ?",
+                                 (storage_type,))
+            return list(result)
+
     def calculate_artist_ids(self, album_id, disable_compilations):
         """
             Calculate artist ids based on tracks
@@ -309,23 +309,81 @@ class ArtistsDatabase:
             result = sql.execute(request, filters)
             return list(itertools.chain(*result))
 
-    def update_featuring(self):
+    def get_all_ids(self):
         """
-            Calculate featuring for current DB
+            Get all artists ids
+            @return [int]
+        """
+        with SqlCursor(self.__db) as sql:
+            result = sql.execute("SELECT rowid FROM artists")
+            return list(itertools.chain(*result))
+
+    def get_features(self, storage_type):
+        """
+            Get year and BPM averages for artists
+            @param storage_type as StorageType
+            @return {int: (float, float)}: {artist_id: (year, bpm)}
+        """
+        with SqlCursor(self.__db) as sql:
+            result = sql.execute("SELECT track_artists.artist_id,\
+                                  AVG(tracks.year), AVG(tracks.bpm)\
+                                  FROM tracks, track_artists\
+                                  WHERE track_artists.track_id=tracks.rowid\
+                                  AND tracks.storage_type & ?\
+                                  GROUP BY track_artists.artist_id",
+                                 (storage_type,))
+            return {row[0]: (row[1], row[2]) for row in result}
+
+    def get_genre_ids_by_artist(self, storage_type):
         """
+            Get genre ids for all artists
+            @param storage_type as StorageType
+            @return {int: set(int)}: {artist_id: genre_ids}
+        """
+        with SqlCursor(self.__db) as sql:
+            result = sql.execute("SELECT DISTINCT album_artists.artist_id,\
+                                  album_genres.genre_id\
+                                  FROM album_artists, album_genres, albums\
+                                  WHERE album_artists.album_id=\
+                                  album_genres.album_id\
+                                  AND albums.rowid=album_artists.album_id\
+                                  AND albums.storage_type & ?",
+                                 (storage_type,))
+            genres = {}
+            for (artist_id, genre_id) in result:
+                genres.setdefault(artist_id, set()).add(genre_id)
+            return genres
+
+    def update_featuring(self, album_ids=None):
+        """
+            Calculate featuring for current DB
+            @param album_ids as [int]: only update featuring for albums,
+                                       full rebuild if None
+        """
+        request = "SELECT track_artists.artist_id, tracks.album_id\
+                   FROM tracks, track_artists\
+                   WHERE track_artists.track_id = tracks.rowid\
+                   AND NOT EXISTS (\
+                    SELECT * FROM album_artists WHERE\
+                    album_artists.album_id = tracks.album_id AND\
+                    album_artists.artist_id = track_artists.artist_id)"
         with SqlCursor(self.__db, True) as sql:
-            sql.execute("DELETE FROM featuring")
-            result = sql.execute(
-                        "SELECT track_artists.artist_id, tracks.album_id\
-                         FROM tracks, track_artists\
-                         WHERE track_artists.track_id = tracks.rowid\
-                         AND NOT EXISTS (\
-                          SELECT * FROM album_artists WHERE\
-                          album_artists.album_id = tracks.album_id AND\
-                          album_artists.artist_id = track_artists.artist_id)")
-            for (artist_id, album_id) in result:
-                sql.execute("INSERT INTO featuring (artist_id, album_id)\
-                             VALUES (?, ?)", (artist_id, album_id))
+            if album_ids is None:
+                sql.execute("DELETE FROM featuring")
+                sql.execute("INSERT INTO featuring (artist_id, album_id) " +
+                            request)
+                return
+            album_ids = list(album_ids)
+            # Stay under SQLite variables limit
+            for i in range(0, len(album_ids), 500):
+                chunk = album_ids[i:i + 500]
+                subrequest = " IN (%s)" % ",".join("?" * len(chunk))
+                sql.execute("DELETE FROM featuring WHERE album_id" +
+                            subrequest, chunk)
+                result = sql.execute(
+                    request + " AND tracks.album_id" + subrequest, chunk)
+                sql.executemany("INSERT INTO featuring (artist_id, album_id)\
+                                 VALUES (?, ?)", list(result))
 
     def get_featured(self, genre_ids, artist_ids, storage_type, skipped):
         """
@@ -335,7 +393,7 @@ class ArtistsDatabase:
             @param storage_type as StorageType
             @param skipped as bool
         """
-        orderby = App().settings.get_enum("orderby")
+        orderby = App().settings.snapshot.orderby
         if orderby == OrderBy.ARTIST_YEAR:
             order = " ORDER BY artists.sortname\
                      COLLATE NOCASE COLLATE LOCALIZED,\
@@ -12,90 +12,151 @@
 
 from gi.repository import Gio
 
-import sqlite3
+import itertools
 from threading import Lock
+from time import time
 
-from lollypop.define import CACHE_PATH
+from lollypop.define import App, CACHE_PATH
 from lollypop.sqlcursor import SqlCursor
-from lollypop.database import Database
 from lollypop.logger import Logger
 
 
 class CacheDatabase:
     """
-        Cache calculation into database
+        Cache artwork lookups into database
     """
     DB_PATH = "%s/cache_v1.db" % CACHE_PATH
 
-    # SQLite documentation:
-    # In SQLite, a column with type INTEGER PRIMARY KEY
-    # is an alias for the ROWID.
-    # Here, we define an id INT PRIMARY KEY but never feed it,
-    # this make VACUUM not destroy rowids...
-    __create_duration = """CREATE TABLE duration (
-                            id TEXT PRIMARY KEY,
-                            album_id INT NOT NULL,
-                            duration INT NOT NULL DEFAULT 0)"""
+    __create_artwork_missing = """CREATE TABLE IF NOT EXISTS artwork_missing (
+                                    key TEXT PRIMARY KEY,
+                                    mtime INT NOT NULL)"""
+    __create_mosaics = """CREATE TABLE IF NOT EXISTS mosaics (
+                            name TEXT PRIMARY KEY,
+                            count INT NOT NULL)"""
+    __create_mosaic_albums = """CREATE TABLE IF NOT EXISTS mosaic_albums (
+                                  name TEXT NOT NULL,
+                                  album_id INT NOT NULL,
+                                  PRIMARY KEY (name, album_id))"""
+    __create_mosaic_albums_idx = """CREATE INDEX IF NOT EXISTS idx_ma
+                                      ON mosaic_albums(album_id)"""
 
     def __init__(self):
         """
             Create database tables
         """
         self.thread_lock = Lock()
-        f = Gio.File.new_for_path(self.DB_PATH)
-        if not f.query_exists():
-            try:
-                d = Gio.File.new_for_path(CACHE_PATH)
-                if not d.query_exists():
-                    d.make_directory_with_parents()
-                # Create db schema
-                with SqlCursor(self, True) as sql:
-                    sql.execute(self.__create_duration)
-            except Exception as e:
-                Logger.error("DatabaseCache::__init__(): %s" % e)
-
-    def set_duration(self, album_id, album_hash, duration):
-        """
-            Set duration in cache for album
-            @param album_id as int
-            @param album_hash as str
-            @param duration as int
+        # True if mosaics dependencies were not tracked yet
+        self.new_mosaics = False
+        try:
+            d = Gio.File.new_for_path(CACHE_PATH)
+            if not d.query_exists():
+                d.make_directory_with_parents()
+            with SqlCursor(self, True) as sql:
+                sql.execute(self.__create_artwork_missing)
+                result = sql.execute("SELECT name FROM sqlite_master\
+                                      WHERE type='table' AND name='mosaics'")
+                self.new_mosaics = result.fetchone() is None
+                sql.execute(self.__create_mosaics)
+                sql.execute(self.__create_mosaic_albums)
+                sql.execute(self.__create_mosaic_albums_idx)
+                # Durations are now maintained in main database
+                sql.execute("DROP TABLE IF EXISTS duration")
+        except Exception as e:
+            Logger.error("DatabaseCache::__init__(): %s" % e)
+
+    def set_artwork_missing(self, key):
+        """
+            Remember no artwork was found for key
+            @param key as str
         """
         try:
             with SqlCursor(self, True) as sql:
-                sql.execute("INSERT INTO duration (id, album_id, duration)\
-                             VALUES (?, ?, ?)",
-                            (album_hash, album_id, duration))
+                sql.execute("INSERT OR REPLACE INTO artwork_missing\
+                             (key, mtime) VALUES (?, ?)",
+                            (key, int(time())))
         except Exception as e:
-            Logger.error("DatabaseCache::set_duration(): %s", e)
+            Logger.error("DatabaseCache::set_artwork_missing(): %s", e)
 
-    def get_duration(self, album_hash):
+    def is_artwork_missing(self, key, delay):
         """
-            Get duration in cache for album
-            @param album_hash as str
-            @return int/None
+            True if no artwork was found for key during last delay
+            @param key as str
+            @param delay as int (seconds)
+            @return bool
         """
         try:
             with SqlCursor(self) as sql:
-                result = sql.execute("SELECT duration\
-                                      FROM duration\
-                                      WHERE id=?",
-                                     (album_hash,))
+                result = sql.execute("SELECT mtime FROM artwork_missing\
+                                      WHERE key=?", (key,))
                 v = result.fetchone()
                 if v is not None:
-                    return v[0]
+                    return v[0] + delay > time()
         except Exception as e:
-            Logger.error("DatabaseCache::get_duration(): %s", e)
-        return None
+            Logger.error("DatabaseCache::is_artwork_missing(): %s", e)
+        return False
 
-    def clear_durations(self, album_id):
+    def add_mosaic_album_ids(self, name, album_ids):
         """
-            Clear durations for album_id
-            @param album_id as int
+            Remember albums used by mosaic, replace previous composition
+            @param name as str
+            @param album_ids as [int]
         """
-        with SqlCursor(self, True) as sql:
-            sql.execute("DELETE FROM duration WHERE album_id=?",
-                        (album_id,))
+        try:
+            with SqlCursor(self, True) as sql:
+                sql.execute("DELETE FROM mosaic_albums WHERE name=?", (name,))
+                sql.executemany("INSERT OR IGNORE INTO mosaic_albums\
+                                 (name, album_id) VALUES (?, ?)",
+                                [(name, album_id) for album_id in album_ids])
+                sql.execute("INSERT OR REPLACE INTO mosaics (name, count)\
+                             SELECT ?, COUNT(*) FROM mosaic_albums\
+                             WHERE name=?", (name, name))
+        except Exception as e:
+            Logger.error("DatabaseCache::add_mosaic_album_ids(): %s", e)
+
+    def get_mosaics_for_album_ids(self, album_ids):
+        """
+            Get mosaics using albums
+            @param album_ids as [int]
+            @return [str]
+        """
+        try:
+            with SqlCursor(self) as sql:
+                request = "SELECT DISTINCT name FROM mosaic_albums\
+                           WHERE album_id IN (%s)" % ",".join(
+                               "?" * len(album_ids))
+                result = sql.execute(request, album_ids)
+                return list(itertools.chain(*result))
+        except Exception as e:
+            Logger.error("DatabaseCache::get_mosaics_for_album_ids(): %s", e)
+        return []
+
+    def get_partial_mosaics(self, count):
+        """
+            Get mosaics using less than count albums
+            @param count as int
+            @return [str]
+        """
+        try:
+            with SqlCursor(self) as sql:
+                result = sql.execute("SELECT name FROM mosaics\
+                                      WHERE count < ?", (count,))
+                return list(itertools.chain(*result))
+        except Exception as e:
+            Logger.error("DatabaseCache::get_partial_mosaics(): %s", e)
+        return []
+
+    def remove_mosaics(self, names):
+        """
+            Forget albums used by mosaics
+            @param names as [str]
+        """
+        try:
+            with SqlCursor(self, True) as sql:
+                for table in ["mosaics", "mosaic_albums"]:
+                    sql.executemany("DELETE FROM %s WHERE name=?" % table,
+                                    [(name,) for name in names])
+        except Exception as e:
+            Logger.error("DatabaseCache::remove_mosaics(): %s", e)
 
     def clear_table(self, table):
         """
@@ -105,22 +166,12 @@ class CacheDatabase:
         with SqlCursor(self, True) as sql:
             sql.execute('DELETE FROM "%s"' % table)
 
-    def clean(self, commit=True):
-        """
-            Clean cache
-            @param commit as bool
-        """
-        with SqlCursor(self, commit) as sql:
-            sql.execute('ATTACH DATABASE "%s" AS music' % Database.DB_PATH)
-            sql.execute("DELETE FROM duration WHERE duration.album_id NOT IN (\
-                            SELECT albums.rowid FROM music.albums)")
-
     def get_cursor(self):
         """
             Return a new sqlite cursor
         """
         try:
-            c = sqlite3.connect(self.DB_PATH, 600.0)
+            c = App().sql_profiler.connect(self.DB_PATH, 600.0)
             return c
         except:
             exit(-1)
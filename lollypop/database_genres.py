@@ -79,7 +79,7 @@ class GenresDatabase:
             @param ignore as bool
             @return [int]
         """
-        orderby = App().settings.get_enum("orderby")
+        orderby = App().settings.snapshot.orderby
         order = " ORDER BY genres.name, "
         if orderby == OrderBy.ARTIST_YEAR:
             order += " artists.sortname\
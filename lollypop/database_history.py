@@ -12,10 +12,10 @@
 
 from gi.repository import GLib
 
-import sqlite3
 from threading import Lock
 
 from lollypop.sqlcursor import SqlCursor
+from lollypop.define import App
 
 
 class History:
@@ -39,12 +39,19 @@ class History:
                             album_loved INT NOT NULL,
                             album_synced INT NOT NULL,
                             album_popularity INT NOT NULL)"""
+    __create_history_idx = """CREATE INDEX IF NOT EXISTS idx_history
+                               ON history(name, duration)"""
+    __FIELDS = """popularity, rate, ltime, mtime, loved, album_loved,
+                  album_popularity, album_rate, album_synced"""
 
     def __init__(self):
         """
             Init playlists manager
         """
         self.thread_lock = Lock()
+        # In memory history while scanning: {(name, duration): stats}
+        self.__entries = None
+        self.__pending = {}
         # Create db schema
         try:
             with SqlCursor(self, True) as sql:
@@ -52,6 +59,7 @@ class History:
         except:
             pass
         with SqlCursor(self, True) as sql:
+            sql.execute(self.__create_history_idx)
             result = sql.execute("SELECT COUNT(*)\
                                   FROM history")
             v = result.fetchone()
@@ -79,29 +87,29 @@ class History:
             @param album_synced as int
             @thread safe
         """
+        # Needed because of seconds to ms DB migration
+        # Value in DB is rounded version of Gstreamer value
+        duration //= 1000
+        values = (popularity, rate, ltime, mtime, loved, album_loved,
+                  album_popularity, album_rate, album_synced)
+        if self.__entries is not None:
+            self.__pending[(name, duration)] = values
+            return
         with SqlCursor(self, True) as sql:
-            # Needed because of seconds to ms DB migration
-            # Value in DB is rounded version of Gstreamer value
-            duration //= 1000
             if self.exists(name, duration):
                 sql.execute("UPDATE history\
                              SET popularity=?,rate=?,ltime=?,mtime=?,loved=?,\
                              album_loved=?,album_popularity=?,album_rate=?,\
                              album_synced=?\
                              WHERE name=? AND duration=?",
-                            (popularity, rate, ltime, mtime, loved,
-                             album_loved, album_popularity, album_rate,
-                             album_synced,
-                             name, duration))
+                            values + (name, duration))
             else:
                 sql.execute("INSERT INTO history\
-                             (name, duration, popularity, rate, ltime, mtime,\
+                             (popularity, rate, ltime, mtime,\
                              loved, album_loved, album_popularity, album_rate,\
-                             album_synced)\
+                             album_synced, name, duration)\
                              VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                            (name, duration, popularity, rate, ltime, mtime,
-                             loved, album_loved, album_popularity, album_rate,
-                             album_synced))
+                            values + (name, duration))
 
     def get(self, name, duration):
         """
@@ -112,8 +120,14 @@ class History:
                      loved album, album_popularity, album_synced)
              as (int, int, int, int, int, int)
         """
+        duration //= 1000
+        if self.__entries is not None:
+            key = (name, duration)
+            values = self.__pending.get(key, self.__entries.get(key))
+            if values is not None:
+                return values
+            return (0, 0, 0, 0, 0, 0, 0, 0, 0)
         with SqlCursor(self) as sql:
-            duration //= 1000
             result = sql.execute("SELECT popularity, rate, ltime, mtime,\
                                   loved, album_loved, album_popularity,\
                                   album_rate, album_synced\
@@ -126,6 +140,46 @@ class History:
                 return v
             return (0, 0, 0, 0, 0, 0, 0, 0, 0)
 
+    def load(self):
+        """
+            Load history in memory, changes are kept in memory until save()
+        """
+        entries = {}
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT name, duration, %s\
+                                  FROM history" % self.__FIELDS)
+            for row in result:
+                entries[(row[0], row[1])] = row[2:]
+        self.__pending = {}
+        self.__entries = entries
+
+    def save(self):
+        """
+            Write in memory changes to DB in one transaction and unload
+        """
+        if self.__entries is None:
+            return
+        updates = []
+        inserts = []
+        for (key, values) in self.__pending.items():
+            if key in self.__entries.keys():
+                updates.append(values + key)
+            else:
+                inserts.append(values + key)
+        self.__entries = None
+        self.__pending = {}
+        if not updates and not inserts:
+            return
+        with SqlCursor(self, True) as sql:
+            sql.executemany("UPDATE history\
+                             SET popularity=?,rate=?,ltime=?,mtime=?,loved=?,\
+                             album_loved=?,album_popularity=?,album_rate=?,\
+                             album_synced=?\
+                             WHERE name=? AND duration=?", updates)
+            sql.executemany("INSERT INTO history (%s, name, duration)\
+                             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)" %
+                            self.__FIELDS, inserts)
+
     def exists(self, name, duration):
         """
             Return True if entry exists
@@ -150,7 +204,7 @@ class History:
             Return a new sqlite cursor
         """
         try:
-            return sqlite3.connect(self.__DB_PATH, 600.0)
+            return App().sql_profiler.connect(self.__DB_PATH, 600.0)
         except:
             exit(-1)
 
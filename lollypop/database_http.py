@@ -0,0 +1,212 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import Gio
+
+from hashlib import sha1
+from threading import Lock
+from urllib.parse import urlparse
+from time import time
+
+from lollypop.define import App, CACHE_PATH
+from lollypop.sqlcursor import SqlCursor
+from lollypop.logger import Logger
+
+
+class HttpCacheDatabase:
+    """
+        Cache web services responses into database
+    """
+    DB_PATH = "%s/http_v1.db" % CACHE_PATH
+
+    # Default time to live in seconds, per host
+    __TTLS = {
+        "api.deezer.com": 86400,
+        "api.spotify.com": 86400,
+        "ws.audioscrobbler.com": 86400,
+        "musicbrainz.org": 2592000,
+        "webservice.fanart.tv": 604800,
+        "itunes.apple.com": 604800,
+        "theaudiodb.com": 604800,
+        "wikipedia.org": 604800,
+        "www.googleapis.com": 604800,
+        "www.startpage.com": 604800,
+        "duckduckgo.com": 604800,
+        "www.bing.com": 604800,
+        "www.metrolyrics.com": 2592000,
+        "genius.com": 2592000
+    }
+    __DEFAULT_TTL = 86400
+    # Not found and empty responses
+    __NEGATIVE_TTL = 21600
+    # Keep expired entries with an ETag this long for revalidation
+    __STALE_TTL = 2592000
+    # Only these request headers change the response
+    __KEY_HEADERS = ["accept", "accept-language"]
+
+    __create_responses = """CREATE TABLE responses (
+                            key TEXT PRIMARY KEY,
+                            uri TEXT NOT NULL,
+                            status INT NOT NULL,
+                            etag TEXT,
+                            expires INT NOT NULL,
+                            content BLOB NOT NULL)"""
+    __create_responses_idx = """CREATE INDEX idx_expires
+                                ON responses(expires)"""
+
+    def __init__(self):
+        """
+            Create database tables
+        """
+        self.thread_lock = Lock()
+        f = Gio.File.new_for_path(self.DB_PATH)
+        if not f.query_exists():
+            try:
+                d = Gio.File.new_for_path(CACHE_PATH)
+                if not d.query_exists():
+                    d.make_directory_with_parents()
+                # Create db schema
+                with SqlCursor(self, True) as sql:
+                    sql.execute(self.__create_responses)
+                    sql.execute(self.__create_responses_idx)
+            except Exception as e:
+                Logger.error("HttpCacheDatabase::__init__(): %s" % e)
+
+    def get_key(self, method, uri, headers):
+        """
+            Get cache key for request
+            @param method as str
+            @param uri as str
+            @param headers as [(str, str)]
+            @return str
+        """
+        key = "%s %s" % (method, uri)
+        for (name, value) in sorted(headers):
+            if name.lower() in self.__KEY_HEADERS:
+                key += "\n%s: %s" % (name.lower(), value)
+        return sha1(key.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+            Get cached response for key
+            @param key as str
+            @return (status, etag, content, fresh)
+                    as (int, str, bytes, bool)/None
+        """
+        try:
+            with SqlCursor(self) as sql:
+                result = sql.execute("SELECT status, etag, expires, content\
+                                      FROM responses\
+                                      WHERE key=?", (key,))
+                v = result.fetchone()
+                if v is not None:
+                    (status, etag, expires, content) = v
+                    return (status, etag, bytes(content), expires > time())
+        except Exception as e:
+            Logger.error("HttpCacheDatabase::get(): %s", e)
+        return None
+
+    def set(self, key, uri, status, content, cache_control=None, etag=None):
+        """
+            Cache response for key
+            @param key as str
+            @param uri as str
+            @param status as int
+            @param content as bytes
+            @param cache_control as str
+            @param etag as str
+        """
+        ttl = self.__get_ttl(uri, status, content, cache_control)
+        if ttl is None:
+            return
+        try:
+            with SqlCursor(self, True) as sql:
+                sql.execute("INSERT OR REPLACE INTO responses\
+                             (key, uri, status, etag, expires, content)\
+                             VALUES (?, ?, ?, ?, ?, ?)",
+                            (key, uri, status, etag, int(time()) + ttl,
+                             content))
+        except Exception as e:
+            Logger.error("HttpCacheDatabase::set(): %s", e)
+
+    def refresh(self, key, uri, cache_control=None):
+        """
+            Extend cached response lifetime (server answered 304)
+            @param key as str
+            @param uri as str
+            @param cache_control as str
+        """
+        ttl = self.__get_ttl(uri, 200, b" ", cache_control)
+        if ttl is None:
+            return
+        try:
+            with SqlCursor(self, True) as sql:
+                sql.execute("UPDATE responses SET expires=? WHERE key=?",
+                            (int(time()) + ttl, key))
+        except Exception as e:
+            Logger.error("HttpCacheDatabase::refresh(): %s", e)
+
+    def clean(self, commit=True):
+        """
+            Remove expired responses that can't be revalidated anymore
+            @param commit as bool
+        """
+        now = int(time())
+        with SqlCursor(self, commit) as sql:
+            sql.execute("DELETE FROM responses\
+                         WHERE (etag IS NULL AND expires<?)\
+                         OR expires<?",
+                        (now, now - self.__STALE_TTL))
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            c = App().sql_profiler.connect(self.DB_PATH, 600.0)
+            return c
+        except:
+            exit(-1)
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_ttl(self, uri, status, content, cache_control):
+        """
+            Get time to live for response
+            @param uri as str
+            @param status as int
+            @param content as bytes
+            @param cache_control as str
+            @return int/None (do not cache)
+        """
+        if status == 404 or (status == 200 and not content):
+            return self.__NEGATIVE_TTL
+        elif status != 200:
+            return None
+        if cache_control is not None:
+            for directive in cache_control.lower().split(","):
+                directive = directive.strip()
+                if directive == "no-store":
+                    return None
+                elif directive == "no-cache":
+                    return 0
+                elif directive.startswith("max-age="):
+                    try:
+                        return int(directive[8:])
+                    except:
+                        pass
+        netloc = urlparse(uri).netloc
+        for host in self.__TTLS.keys():
+            if netloc == host or netloc.endswith("." + host):
+                return self.__TTLS[host]
+        return self.__DEFAULT_TTL
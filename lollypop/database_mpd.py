@@ -0,0 +1,295 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import itertools
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.define import App, Type
+from lollypop.utils import make_subrequest
+
+
+class MpdDatabase:
+    """
+        Database requests for MPD server
+        Songs are returned as rows:
+        (id, uri, name, duration, tracknumber, discnumber, year,
+         album, artists, album_artists, genres)
+        Multiple values (artists, genres) are separated by SEPARATOR
+    """
+
+    SEPARATOR = "\x1f"
+    __SONG_COLUMNS = """tracks.rowid, tracks.uri, tracks.name,
+        tracks.duration, tracks.tracknumber, tracks.discnumber,
+        tracks.year, albums.name,
+        (SELECT group_concat(artists.name, char(31))
+         FROM track_artists, artists
+         WHERE track_artists.track_id=tracks.rowid
+         AND artists.rowid=track_artists.artist_id),
+        (SELECT group_concat(artists.name, char(31))
+         FROM album_artists, artists
+         WHERE album_artists.album_id=albums.rowid
+         AND artists.rowid=album_artists.artist_id),
+        (SELECT group_concat(genres.name, char(31))
+         FROM track_genres, genres
+         WHERE track_genres.track_id=tracks.rowid
+         AND genres.rowid=track_genres.genre_id)"""
+    # Filters: tag => (exact request, search request)
+    __FILTERS = {
+        "title": ("tracks.name=?", "tracks.name LIKE ?"),
+        "album": ("albums.name=?", "albums.name LIKE ?"),
+        "file": ("tracks.uri=?", "tracks.uri LIKE ?"),
+        "date": ("tracks.year=?", "tracks.year LIKE ?"),
+        "track": ("tracks.tracknumber=?", "tracks.tracknumber LIKE ?"),
+        "disc": ("tracks.discnumber=?", "tracks.discnumber LIKE ?"),
+        "artist": ("""EXISTS (SELECT 1 FROM track_artists, artists
+                    WHERE track_artists.track_id=tracks.rowid
+                    AND artists.rowid=track_artists.artist_id
+                    AND artists.name=?)""",
+                   """EXISTS (SELECT 1 FROM track_artists, artists
+                    WHERE track_artists.track_id=tracks.rowid
+                    AND artists.rowid=track_artists.artist_id
+                    AND artists.name LIKE ?)"""),
+        "albumartist": ("""EXISTS (SELECT 1 FROM album_artists, artists
+                         WHERE album_artists.album_id=albums.rowid
+                         AND artists.rowid=album_artists.artist_id
+                         AND artists.name=?)""",
+                        """EXISTS (SELECT 1 FROM album_artists, artists
+                         WHERE album_artists.album_id=albums.rowid
+                         AND artists.rowid=album_artists.artist_id
+                         AND artists.name LIKE ?)"""),
+        "genre": ("""EXISTS (SELECT 1 FROM track_genres, genres
+                   WHERE track_genres.track_id=tracks.rowid
+                   AND genres.rowid=track_genres.genre_id
+                   AND genres.name=?)""",
+                  """EXISTS (SELECT 1 FROM track_genres, genres
+                   WHERE track_genres.track_id=tracks.rowid
+                   AND genres.rowid=track_genres.genre_id
+                   AND genres.name LIKE ?)""")
+    }
+    # Tags listable with list command: tag => (column, joins, condition)
+    __TAGS = {
+        "artist": ("artists.name", ", track_artists, artists",
+                   " AND track_artists.track_id=tracks.rowid\
+                     AND artists.rowid=track_artists.artist_id"),
+        "albumartist": ("artists.name", ", album_artists, artists",
+                        " AND album_artists.album_id=albums.rowid\
+                          AND artists.rowid=album_artists.artist_id"),
+        "genre": ("genres.name", ", track_genres, genres",
+                  " AND track_genres.track_id=tracks.rowid\
+                    AND genres.rowid=track_genres.genre_id"),
+        "album": ("albums.name", "", ""),
+        "title": ("tracks.name", "", ""),
+        "date": ("tracks.year", "", ""),
+        "file": ("tracks.uri", "", "")
+    }
+
+    def get_tags(self):
+        """
+            Get tags usable in filters
+            @return [str]
+        """
+        return list(self.__FILTERS.keys())
+
+    def get_songs(self, storage_type, limit, album_ids=[], filters=[],
+                  after=None):
+        """
+            Get songs sorted as in albums
+            Pass returned key to get next songs, no request stays open
+            between calls
+            @param storage_type as StorageType
+            @param limit as int
+            @param album_ids as [int]
+            @param filters as [(str, str, bool)]: [(tag, value, exact)]
+            @param after as tuple/None: key of previous last song
+            @return ([row], tuple/None): songs, key of last song if more
+        """
+        sort = "albums.rowid, IFNULL(tracks.discnumber, 0),\
+                IFNULL(tracks.tracknumber, 0), tracks.rowid"
+        (request, args) = self.__get_request(
+            "SELECT %s, %s FROM tracks, albums" % (self.__SONG_COLUMNS,
+                                                   sort),
+            storage_type, album_ids, filters)
+        if after is not None:
+            request += " AND (%s) > (?, ?, ?, ?)" % sort
+            args += list(after)
+        request += " ORDER BY %s LIMIT ?" % sort
+        args.append(limit)
+        with SqlCursor(App().db) as sql:
+            result = sql.execute(request, args)
+            rows = list(result)
+        if len(rows) < limit:
+            key = None
+        else:
+            key = tuple(rows[-1][-4:])
+        return ([row[:-4] for row in rows], key)
+
+    def get_songs_for_ids(self, track_ids):
+        """
+            Get songs for track ids
+            @param track_ids as [int]
+            @return {int: row}
+        """
+        songs = {}
+        unique_ids = list(set(track_ids))
+        with SqlCursor(App().db) as sql:
+            # Stay under SQLite variables limit
+            for i in range(0, len(unique_ids), 500):
+                chunk = unique_ids[i:i + 500]
+                request = "SELECT %s FROM tracks, albums\
+                           WHERE albums.rowid=tracks.album_id AND (" %\
+                    self.__SONG_COLUMNS
+                request += make_subrequest("tracks.rowid=?", "OR", len(chunk))
+                request += ")"
+                for row in sql.execute(request, chunk):
+                    songs[row[0]] = row
+        return songs
+
+    def get_track_ids(self, storage_type, album_ids=[], filters=[]):
+        """
+            Get track ids, sorted as in albums
+            @param storage_type as StorageType
+            @param album_ids as [int]
+            @param filters as [(str, str, bool)]
+            @return [int]
+        """
+        (request, args) = self.__get_request(
+            "SELECT tracks.rowid FROM tracks, albums",
+            storage_type, album_ids, filters)
+        request += " ORDER BY albums.rowid, tracks.discnumber,\
+                     tracks.tracknumber"
+        with SqlCursor(App().db) as sql:
+            result = sql.execute(request, args)
+            return list(itertools.chain(*result))
+
+    def get_tag_values(self, tag, storage_type, filters=[]):
+        """
+            Get distinct values for tag
+            @param tag as str
+            @param storage_type as StorageType
+            @param filters as [(str, str, bool)]
+            @return [str]
+        """
+        if tag not in self.__TAGS.keys():
+            return []
+        (column, joins, condition) = self.__TAGS[tag]
+        (request, args) = self.__get_request(
+            "SELECT DISTINCT %s FROM tracks, albums%s" % (column, joins),
+            storage_type, [], filters)
+        request += condition
+        request += " ORDER BY %s COLLATE NOCASE" % column
+        with SqlCursor(App().db) as sql:
+            result = sql.execute(request, args)
+            return [str(v) for v in itertools.chain(*result)
+                    if v is not None]
+
+    def count(self, storage_type, filters=[]):
+        """
+            Count songs and play time
+            @param storage_type as StorageType
+            @param filters as [(str, str, bool)]
+            @return (int, int): (songs, duration in ms)
+        """
+        (request, args) = self.__get_request(
+            "SELECT COUNT(*), SUM(tracks.duration) FROM tracks, albums",
+            storage_type, [], filters)
+        with SqlCursor(App().db) as sql:
+            v = sql.execute(request, args).fetchone()
+            return (v[0] or 0, v[1] or 0)
+
+    def get_stats(self, storage_type):
+        """
+            Get collection statistics
+            @param storage_type as StorageType
+            @return (int, int, int, int):
+                    (artists, albums, songs, duration in ms)
+        """
+        with SqlCursor(App().db) as sql:
+            v = sql.execute("SELECT COUNT(DISTINCT track_artists.artist_id),\
+                             COUNT(DISTINCT tracks.album_id),\
+                             COUNT(DISTINCT tracks.rowid),\
+                             SUM(tracks.duration)\
+                             FROM tracks, track_artists\
+                             WHERE track_artists.track_id=tracks.rowid\
+                             AND tracks.storage_type & ?",
+                            (storage_type,)).fetchone()
+            return (v[0] or 0, v[1] or 0, v[2] or 0, v[3] or 0)
+
+    def get_artists(self, storage_type):
+        """
+            Get album artists
+            @param storage_type as StorageType
+            @return [str]
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT DISTINCT artists.name\
+                                  FROM artists, album_artists, albums\
+                                  WHERE album_artists.artist_id=artists.rowid\
+                                  AND albums.rowid=album_artists.album_id\
+                                  AND albums.loved != ?\
+                                  AND albums.storage_type & ?\
+                                  ORDER BY artists.sortname\
+                                  COLLATE NOCASE COLLATE LOCALIZED",
+                                 (Type.NONE, storage_type))
+            return list(itertools.chain(*result))
+
+    def get_albums(self, artist, storage_type):
+        """
+            Get albums for album artist
+            @param artist as str
+            @param storage_type as StorageType
+            @return [(int, str)]
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT albums.rowid, albums.name\
+                                  FROM albums, album_artists, artists\
+                                  WHERE artists.name=?\
+                                  AND album_artists.artist_id=artists.rowid\
+                                  AND albums.rowid=album_artists.album_id\
+                                  AND albums.loved != ?\
+                                  AND albums.storage_type & ?\
+                                  ORDER BY albums.year, albums.name\
+                                  COLLATE NOCASE COLLATE LOCALIZED",
+                                 (artist, Type.NONE, storage_type))
+            return list(result)
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_request(self, select, storage_type, album_ids, filters):
+        """
+            Build request with filters
+            @param select as str
+            @param storage_type as StorageType
+            @param album_ids as [int]
+            @param filters as [(str, str, bool)]
+            @return (str, [])
+        """
+        request = select
+        request += " WHERE albums.rowid=tracks.album_id\
+                     AND tracks.storage_type & ?"
+        args = [storage_type]
+        if album_ids:
+            request += " AND ("
+            request += make_subrequest("tracks.album_id=?", "OR",
+                                       len(album_ids))
+            request += ")"
+            args += album_ids
+        for (tag, value, exact) in filters:
+            if tag == "any":
+                request += " AND (%s)" % " OR ".join(
+                    self.__FILTERS[key][0 if exact else 1]
+                    for key in ["title", "album", "artist"])
+                args += [value if exact else "%%%s%%" % value] * 3
+            elif tag in self.__FILTERS.keys():
+                request += " AND %s" % self.__FILTERS[tag][0 if exact else 1]
+                args.append(value if exact else "%%%s%%" % value)
+        return (request, args)
@@ -0,0 +1,137 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from threading import Lock
+from time import time
+
+from lollypop.define import App, LOLLYPOP_DATA_PATH, TimeStamp
+from lollypop.sqlcursor import SqlCursor
+from lollypop.utils import make_subrequest
+
+
+class SimilarsDatabase:
+    """
+        Similar artists graph learned from web services
+        Artists are stored by name as ids are not stable across rescans
+    """
+    DB_PATH = "%s/similars.db" % LOLLYPOP_DATA_PATH
+    __create_similars = """CREATE TABLE similars (
+                            artist TEXT NOT NULL,
+                            similar TEXT NOT NULL,
+                            cover_uri TEXT,
+                            source TEXT NOT NULL,
+                            mtime INT NOT NULL)"""
+    __create_similars_idx = """CREATE UNIQUE INDEX idx_similars
+                                ON similars(artist, source, similar)"""
+    __create_refreshs = """CREATE TABLE refreshs (
+                            artist TEXT PRIMARY KEY,
+                            mtime INT NOT NULL)"""
+
+    def __init__(self):
+        """
+            Init similars graph
+        """
+        self.thread_lock = Lock()
+        # Create db schema
+        try:
+            with SqlCursor(self, True) as sql:
+                sql.execute(self.__create_similars)
+                sql.execute(self.__create_similars_idx)
+                sql.execute(self.__create_refreshs)
+        except:
+            pass
+
+    def add(self, artist, similars, source):
+        """
+            Replace edges from artist for source
+            @param artist as str
+            @param similars as [(str, str)]: [(artist_name, cover_uri)]
+            @param source as str
+            @thread safe
+        """
+        artist = artist.lower()
+        mtime = int(time())
+        with SqlCursor(self, True) as sql:
+            sql.execute("DELETE FROM similars WHERE artist=? AND source=?",
+                        (artist, source))
+            sql.executemany("INSERT OR IGNORE INTO similars\
+                             (artist, similar, cover_uri, source, mtime)\
+                             VALUES (?, ?, ?, ?, ?)",
+                            [(artist, name, cover_uri, source, mtime)
+                             for (name, cover_uri) in similars])
+
+    def get(self, artists):
+        """
+            Get similar artists for artists
+            @param artists as [str]
+            @return [(str, str)]: [(artist_name, cover_uri)]
+        """
+        if not artists:
+            return []
+        with SqlCursor(self) as sql:
+            request = "SELECT similar, cover_uri FROM similars WHERE "
+            request += make_subrequest("artist=?", "OR", len(artists))
+            request += " ORDER BY rowid"
+            result = sql.execute(request,
+                                 tuple(a.lower() for a in artists))
+            similars = []
+            names = set()
+            for (name, cover_uri) in result:
+                if name.lower() in names:
+                    continue
+                names.add(name.lower())
+                similars.append((name, cover_uri))
+            return similars
+
+    def get_mtime(self, artist):
+        """
+            Get last refresh time for artist
+            @param artist as str
+            @return int
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT mtime FROM refreshs WHERE artist=?",
+                                 (artist.lower(),))
+            v = result.fetchone()
+            if v is not None:
+                return v[0]
+            return 0
+
+    def set_mtime(self, artist):
+        """
+            Mark artist as refreshed now
+            @param artist as str
+            @thread safe
+        """
+        with SqlCursor(self, True) as sql:
+            sql.execute("INSERT OR REPLACE INTO refreshs (artist, mtime)\
+                         VALUES (?, ?)", (artist.lower(), int(time())))
+
+    def clean(self, commit=True):
+        """
+            Remove edges not refreshed for a long time
+            @param commit as bool
+        """
+        with SqlCursor(self, commit) as sql:
+            sql.execute("DELETE FROM similars WHERE mtime<?",
+                        (int(time()) - TimeStamp.ONE_YEAR,))
+            sql.execute("DELETE FROM refreshs WHERE mtime<?",
+                        (int(time()) - TimeStamp.ONE_YEAR,))
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            return App().sql_profiler.connect(self.DB_PATH, 600.0)
+        except:
+            exit(-1)
@@ -277,6 +277,22 @@ class TracksDatabase:
                          WHERE rowid=?",
                         (uri, track_id))
 
+    def move_uris(self, old_uri, new_uri):
+        """
+            Replace old uri with new uri, for uri and its children
+            @param old_uri as str
+            @param new_uri as str
+            @return moved tracks count as int
+        """
+        prefix = old_uri + "/"
+        with SqlCursor(self.__db, True) as sql:
+            result = sql.execute("UPDATE tracks\
+                                  SET uri=? || substr(uri, ?)\
+                                  WHERE uri=? OR substr(uri, 1, ?)=?",
+                                 (new_uri, len(old_uri) + 1, old_uri,
+                                  len(prefix), prefix))
+            return result.rowcount
+
     def set_storage_type(self, track_id, storage_type):
         """
             Set storage type
@@ -445,6 +461,15 @@ class TracksDatabase:
                 mtimes.update((row,))
             return mtimes
 
+    def get_uris_durations(self):
+        """
+            Get uri and duration for tracks
+            @return [(str, int, int)]: [(uri, duration, track id)]
+        """
+        with SqlCursor(self.__db) as sql:
+            result = sql.execute("SELECT uri, duration, rowid FROM tracks")
+            return list(result)
+
     def remove_album(self, album_id, commit=True):
         """
             Remove album
@@ -577,6 +602,21 @@ class TracksDatabase:
                          SET duration=?\
                          WHERE rowid=?", (duration, track_id,))
 
+    def get_tracks_duration(self, track_ids):
+        """
+            Get duration for tracks
+            @param track_ids as [int]
+            @return int
+        """
+        with SqlCursor(self.__db) as sql:
+            request = "SELECT SUM(duration) FROM tracks WHERE rowid IN (%s)"
+            result = sql.execute(request % ",".join("?" * len(track_ids)),
+                                 track_ids)
+            v = result.fetchone()
+            if v is not None and v[0] is not None:
+                return v[0]
+            return 0
+
     def set_mtime(self, track_id, mtime):
         """
             Set track_mtime
@@ -705,10 +745,11 @@ class TracksDatabase:
                 return v[0]
             return 5
 
-    def set_more_popular(self, track_id):
+    def set_more_popular(self, track_id, pop_to_add=1):
         """
             Increment popularity field
             @param track_id as int
+            @param pop_to_add as int
             @raise sqlite3.OperationalError on db update
         """
         with SqlCursor(self.__db, True) as sql:
@@ -719,7 +760,7 @@ class TracksDatabase:
                 current = pop[0]
             else:
                 current = 0
-            current += 1
+            current += pop_to_add
             sql.execute("UPDATE tracks set popularity=? WHERE rowid=?",
                         (current, track_id))
 
@@ -733,6 +774,20 @@ class TracksDatabase:
             sql.execute("UPDATE tracks set ltime=? WHERE rowid=?",
                         (time, track_id))
 
+    def get_listening_history(self):
+        """
+            Get tracks listening history ordered by time
+            @return [(int, int, int)]: [(ltime, album_id, artist_id)]
+        """
+        with SqlCursor(self.__db) as sql:
+            result = sql.execute("SELECT tracks.ltime, tracks.album_id,\
+                                  track_artists.artist_id\
+                                  FROM tracks, track_artists\
+                                  WHERE track_artists.track_id=tracks.rowid\
+                                  AND tracks.ltime>0\
+                                  ORDER BY tracks.ltime, tracks.rowid")
+            return list(result)
+
     def get_little_played(self, storage_type, skipped, limit):
         """
             Return random tracks little played
@@ -1039,6 +1094,26 @@ class TracksDatabase:
                          WHERE track_genres.track_id NOT IN (\
                             SELECT tracks.rowid FROM tracks)")
 
+    def get_search_entries(self, storage_type):
+        """
+            Get tracks for search index
+            @param storage_type as StorageType
+            @return [(int, str, str, int, str)]:
+                    [(id, name, artists, popularity, lp_album_id)]
+        """
+        with SqlCursor(self.__db) as sql:
+            result = sql.execute("SELECT tracks.rowid, tracks.name,\
+                                  (SELECT group_concat(artists.name, ', ')\
+                                   FROM track_artists, artists\
+                                   WHERE track_artists.track_id=tracks.rowid\
+                                   AND artists.rowid=track_artists.artist_id),\
+                                  tracks.popularity, albums.lp_album_id\
+                                  FROM tracks, albums\
+                                  WHERE albums.rowid=tracks.album_id\
+                                  AND tracks.storage_type & ?",
+                                 (storage_type,))
+            return list(result)
+
     def search(self, searched, storage_type):
         """
             Search for tracks that look like [searched]
@@ -175,6 +175,8 @@ class DatabaseAlbumsUpgrade(DatabaseUpgrade):
             46: self.__upgrade_46,
             47: self.__upgrade_47,
             48: self.__upgrade_48,
+            49: self.__upgrade_49,
+            50: "CREATE index idx_fa ON featuring(album_id)",
         }
 
 #######################
@@ -837,3 +839,29 @@ class DatabaseAlbumsUpgrade(DatabaseUpgrade):
             sql.execute("UPDATE albums set loved=2 where loved=1")
             sql.execute("UPDATE albums set loved=1 where loved=0")
             sql.execute("UPDATE albums set loved=4 where loved=-1")
+
+    def __upgrade_49(self, db):
+        """
+            Add album/disc durations aggregates
+        """
+        from lollypop.database import Database
+        with SqlCursor(db, True) as sql:
+            sql.execute("ALTER TABLE albums\
+                         ADD duration INT NOT NULL DEFAULT 0")
+            sql.execute("""CREATE TABLE album_discs (
+                                album_id INT NOT NULL,
+                                discnumber INT NOT NULL,
+                                duration INT NOT NULL,
+                                PRIMARY KEY (album_id, discnumber))""")
+            sql.execute("CREATE index idx_td ON tracks(album_id, discnumber)")
+            sql.execute("UPDATE albums SET duration=(\
+                            SELECT IFNULL(SUM(duration), 0) FROM tracks\
+                            WHERE tracks.album_id=albums.rowid)")
+            sql.execute("INSERT INTO album_discs\
+                            (album_id, discnumber, duration)\
+                         SELECT album_id, IFNULL(discnumber, 0),\
+                                IFNULL(SUM(duration), 0)\
+                         FROM tracks\
+                         GROUP BY album_id, IFNULL(discnumber, 0)")
+            for trigger in Database.DURATION_TRIGGERS:
+                sql.execute(trigger)
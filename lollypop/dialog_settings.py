@@ -173,6 +173,7 @@ class SettingsDialog:
             @param button as Gtk.Button
         """
         App().task_helper.run(App().art.clean_all_cache)
+        App().cache.clear_table("artwork_missing")
         button.set_sensitive(False)
 
     def _on_google_api_key_changed(self, entry):
@@ -12,6 +12,8 @@
 
 from gi.repository import GLib, Gtk
 
+from bisect import bisect_left, bisect_right
+
 from lollypop.define import ViewType, App
 from lollypop.utils import noaccents2
 from lollypop.utils_album import tracks_to_albums
@@ -28,63 +30,55 @@ class FilteringHelper():
             Init helper
         """
         self.__last_scrolled = None
+        self.__typeahead_child = None
+        # Typeahead index: children in filtered order, folded names and
+        # positions. Names are cached by child, so only new children are
+        # looked up when view content changes
+        self.__index_children = []
+        self.__index_names = []
+        self.__index_positions = {}
+        self.__index_names_by_child = {}
+        # Sorted positions matching text
+        self.__matches_text = None
+        self.__matches = []
 
     def search_for_child(self, text):
         """
             Search child and scroll
             @param text as str
         """
-        for child in self.filtered:
-            style_context = child.get_style_context()
-            style_context.remove_class("typeahead")
+        self.__set_typeahead_child(None)
         if not text:
             return
-        for child in self.filtered:
-            if noaccents2(child.name).find(noaccents2(text)) != -1:
-                style_context = child.get_style_context()
-                style_context.add_class("typeahead")
-                GLib.idle_add(self._scroll_to_child, child)
-                break
+        matches = self.__get_matches(text)
+        if matches:
+            self.__set_typeahead_child(self.__index_children[matches[0]])
 
     def search_prev(self, text):
         """
             Search previous child and scroll
             @param text as str
         """
-        previous_children = []
-        found_child = None
-        for child in self.filtered:
-            style_context = child.get_style_context()
-            if style_context.has_class("typeahead"):
-                found_child = child
-                break
-            previous_children.insert(0, child)
-        if previous_children and found_child is not None:
-            for child in previous_children:
-                if noaccents2(child.name).find(noaccents2(text)) != -1:
-                    found_child.get_style_context().remove_class("typeahead")
-                    child.get_style_context().add_class("typeahead")
-                    GLib.idle_add(self._scroll_to_child, child)
-                    break
+        matches = self.__get_matches(text)
+        position = self.__get_typeahead_position()
+        if position is None:
+            return
+        index = bisect_left(matches, position) - 1
+        if index >= 0:
+            self.__set_typeahead_child(self.__index_children[matches[index]])
 
     def search_next(self, text):
         """
-            Search previous child and scroll
+            Search next child and scroll
             @param text as str
         """
-        found = False
-        previous_style_context = None
-        for child in self.filtered:
-            style_context = child.get_style_context()
-            if style_context.has_class("typeahead"):
-                previous_style_context = style_context
-                found = True
-                continue
-            if found and noaccents2(child.name).find(noaccents2(text)) != -1:
-                previous_style_context.remove_class("typeahead")
-                style_context.add_class("typeahead")
-                GLib.idle_add(self._scroll_to_child, child)
-                break
+        matches = self.__get_matches(text)
+        position = self.__get_typeahead_position()
+        if position is None:
+            return
+        index = bisect_right(matches, position)
+        if index < len(matches):
+            self.__set_typeahead_child(self.__index_children[matches[index]])
 
     def activate_child(self):
         """
@@ -97,14 +91,10 @@ class FilteringHelper():
 
         try:
             # Search typeahead child
-            typeahead_child = None
-            for child in self.filtered:
-                style_context = child.get_style_context()
-                if style_context.has_class("typeahead"):
-                    typeahead_child = child
-                    break
-            if typeahead_child is None:
+            self.__update_index()
+            if self.__get_typeahead_position() is None:
                 return
+            typeahead_child = self.__typeahead_child
             from lollypop.view_current_albums import CurrentAlbumsView
             from lollypop.view_playlists import PlaylistsView
             # Play child without reseting player
@@ -188,3 +178,61 @@ class FilteringHelper():
 #######################
 # PRIVATE             #
 #######################
+    def __update_index(self):
+        """
+            Update typeahead index if filtered children changed
+        """
+        children = self.filtered
+        if children == self.__index_children:
+            return
+        names_by_child = {}
+        for child in children:
+            name = self.__index_names_by_child.get(child)
+            if name is None:
+                name = noaccents2(child.name or "")
+            names_by_child[child] = name
+        self.__index_children = children
+        self.__index_names = [names_by_child[child] for child in children]
+        self.__index_positions = {child: position
+                                  for (position, child) in enumerate(children)}
+        self.__index_names_by_child = names_by_child
+        self.__matches_text = None
+
+    def __get_matches(self, text):
+        """
+            Get positions of children matching text
+            @param text as str
+            @return [int]
+        """
+        self.__update_index()
+        text = noaccents2(text)
+        if text != self.__matches_text:
+            self.__matches = [position for (position, name)
+                              in enumerate(self.__index_names)
+                              if name.find(text) != -1]
+            self.__matches_text = text
+        return self.__matches
+
+    def __get_typeahead_position(self):
+        """
+            Get typeahead child position in index
+            @return int/None
+        """
+        child = self.__typeahead_child
+        if child is None or\
+                not child.get_style_context().has_class("typeahead"):
+            return None
+        return self.__index_positions.get(child)
+
+    def __set_typeahead_child(self, child):
+        """
+            Highlight child and scroll to it
+            @param child as Gtk.Widget/None
+        """
+        if self.__typeahead_child is not None:
+            self.__typeahead_child.get_style_context().remove_class(
+                "typeahead")
+        self.__typeahead_child = child
+        if child is not None:
+            child.get_style_context().add_class("typeahead")
+            GLib.idle_add(self._scroll_to_child, child)
@@ -12,11 +12,15 @@
 
 from gi.repository import Gio, GLib
 
+import re
+from bisect import bisect_left
+from collections import OrderedDict
+
 from lollypop.logger import Logger
 from lollypop.helper_task import TaskHelper
 from lollypop.utils import escape, get_network_available
 from lollypop.utils_file import create_dir
-from lollypop.define import LYRICS_PATH
+from lollypop.define import App, LYRICS_PATH
 
 
 class LyricsHelper:
@@ -24,40 +28,42 @@ class LyricsHelper:
         Sync lyrics helper
     """
 
+    # Parsed lyrics for recently played tracks, shared by all helpers
+    # {uri: (timestamps, lyrics, unsynced lyrics)}
+    __CACHE = OrderedDict()
+    __CACHE_SIZE = 10
+    __LRC_TIMESTAMP = re.compile(r"\[(\d+):(\d+)(?:[.:](\d+))?\]")
+    __LRC_OFFSET = re.compile(r"\[offset:\s*([+-]?\d+)\s*\]", re.IGNORECASE)
+    __LRC_WORD_TIMESTAMP = re.compile(r"<\d+:\d+(?:[.:]\d+)?>")
+
     def __init__(self):
         """
             Init helper
         """
-        self.__timestamps = {}
+        self.__track = None
+        self.__timestamps = []
+        self.__lyrics = []
+        self.__text = ""
         self.__cancellable = Gio.Cancellable.new()
         create_dir(LYRICS_PATH)
 
-    def load(self, track):
+    def load(self, track, callback, *args):
         """
             Load lyrics for track
             @param track as Track
+            @param callback as function
         """
         self.__track = track
-        self.__timestamps = {}
-        uri_no_ext = ".".join(track.uri.split(".")[:-1])
-        self.__lrc_file = Gio.File.new_for_uri(uri_no_ext + ".lrc")
-        if self.__lrc_file.query_exists():
-            self.__get_timestamps()
+        self.__timestamps = []
+        self.__lyrics = []
+        self.__text = ""
+        if track.uri in self.__CACHE.keys():
+            self.__CACHE.move_to_end(track.uri)
+            self.__on_load(self.__CACHE[track.uri], track, callback, *args)
         else:
-            from lollypop.tagreader import Discoverer, TagReader
-            discoverer = Discoverer()
-            tagreader = TagReader()
-            try:
-                info = discoverer.get_info(track.uri)
-            except:
-                info = None
-            if info is not None:
-                tags = info.get_tags()
-                for (lyrics, timestamp) in tagreader.get_synced_lyrics(tags):
-                    if timestamp in self.__timestamps.keys():
-                        self.__timestamps[timestamp] += "\n%s" % lyrics
-                    else:
-                        self.__timestamps[timestamp] = lyrics
+            App().task_helper.run(self.__load, track.uri,
+                                  callback=(self.__on_load, track,
+                                            callback, *args))
 
     def get_lyrics_for_timestamp(self, timestamp):
         """
@@ -65,24 +71,12 @@ class LyricsHelper:
             @param timestamp as int
             @return ([str], str, [str])
         """
-        previous = []
-        next = []
-        current = None
-        for key in self.__timestamps.keys():
-            if timestamp > key and current is None:
-                if len(previous) == 5:
-                    previous.pop(0)
-                previous.append(self.__timestamps[key])
-            elif current is None and previous:
-                current = previous.pop(-1)
-                next.append(self.__timestamps[key])
-            elif timestamp < key and len(next) != 5:
-                next.append(self.__timestamps[key])
-            else:
-                break
-        if current is None:
-            current = ""
-        return (previous, [" ", current, " "], next)
+        index = bisect_left(self.__timestamps, timestamp) - 1
+        if index < 0:
+            return ([], [" ", "", " "], self.__lyrics[:5])
+        return (self.__lyrics[max(0, index - 5):index],
+                [" ", self.__lyrics[index], " "],
+                self.__lyrics[index + 1:index + 6])
 
     def get_lyrics_from_web(self, track, callback, *args):
         """
@@ -115,49 +109,100 @@ class LyricsHelper:
             True if lyrics available
             @return bool
         """
-        return len(self.__timestamps.keys()) != 0
+        return len(self.__timestamps) != 0
+
+    @property
+    def text(self):
+        """
+            Get unsynced lyrics found in tags
+            @return str
+        """
+        return self.__text
 
 ############
 # PRIVATE  #
 ############
-    def __str_to_timestamp(self, srt_timestamp):
-        """
-            Convert timestamp to time
-            @timestamp as str [00:00.00]
-            @return int
-        """
-        timestamp = int(srt_timestamp.split(".")[-1])
-        seconds = int(srt_timestamp.split(".")[-2].split(":")[-1])
-        minutes = int(srt_timestamp.split(".")[-2].split(":")[0])
-        timestamp += seconds * 1000
-        timestamp += minutes * 60000
-        return timestamp
+    def __load(self, uri):
+        """
+            Load lyrics from LRC file or from tags
+            @param uri as str
+            @return ([int], [str], str): (timestamps, lyrics, unsynced lyrics)
+            @thread safe
+        """
+        timestamps = {}
+        text = ""
+        uri_no_ext = ".".join(uri.split(".")[:-1])
+        lrc_file = Gio.File.new_for_uri(uri_no_ext + ".lrc")
+        if lrc_file.query_exists():
+            self.__get_lrc_timestamps(lrc_file, timestamps)
+        else:
+            from lollypop.tagreader import Discoverer, TagReader
+            discoverer = Discoverer()
+            tagreader = TagReader()
+            try:
+                info = discoverer.get_info(uri)
+            except:
+                info = None
+            if info is not None:
+                tags = info.get_tags()
+                for (lyrics, timestamp) in tagreader.get_synced_lyrics(tags):
+                    self.__add_timestamp(timestamps, timestamp, lyrics)
+                if not timestamps:
+                    text = tagreader.get_lyrics(tags)
+        keys = sorted(timestamps.keys())
+        return (keys, [timestamps[key] for key in keys], text)
+
+    def __add_timestamp(self, timestamps, timestamp, lyrics):
+        """
+            Add lyrics at timestamp, merge lines with same timestamp
+            @param timestamps as {int: str}
+            @param timestamp as int
+            @param lyrics as str
+        """
+        if timestamp in timestamps.keys():
+            timestamps[timestamp] += "\n%s" % lyrics
+        else:
+            timestamps[timestamp] = lyrics
 
-    def __get_timestamps(self):
+    def __get_lrc_timestamps(self, lrc_file, timestamps):
         """
-            Get timestamps from file
+            Get timestamps from LRC file
+            A line may have many timestamps: [00:10.00][01:20.00]lyrics
+            @param lrc_file as Gio.File
+            @param timestamps as {int: str}
         """
         try:
-            status = False
-            if self.__lrc_file.query_exists():
-                (status, content, tag) = self.__lrc_file.load_contents()
-            if status:
-                data = content.decode("utf-8").split("\n")
-                for line in data:
-                    if line.find("length") != -1:
-                        continue
-                    try:
-                        str_timestamp = line.split("]")[0].split("[")[1]
-                        timestamp = self.__str_to_timestamp(str_timestamp)
-                        lyrics = " ".join(line.split("]")[1:])
-                        if timestamp in self.__timestamps.keys():
-                            self.__timestamps[timestamp] += "\n%s" % lyrics
-                        else:
-                            self.__timestamps[timestamp] = lyrics
-                    except:
-                        continue
+            (status, content, tag) = lrc_file.load_contents()
+            if not status:
+                return
+            lines = content.decode("utf-8", "replace").splitlines()
+            offset = 0
+            for line in lines:
+                match = self.__LRC_OFFSET.match(line.strip())
+                if match is not None:
+                    offset = int(match.group(1))
+            for line in lines:
+                line = line.strip()
+                line_timestamps = []
+                match = self.__LRC_TIMESTAMP.match(line)
+                while match is not None:
+                    (minutes, seconds, fraction) = match.groups()
+                    # Fraction is hundredths in most files, allow any
+                    # precision
+                    milliseconds = int((fraction or "0").ljust(3, "0")[:3])
+                    line_timestamps.append(int(minutes) * 60000 +
+                                           int(seconds) * 1000 +
+                                           milliseconds)
+                    line = line[match.end():]
+                    match = self.__LRC_TIMESTAMP.match(line)
+                lyrics = self.__LRC_WORD_TIMESTAMP.sub("", line).strip()
+                # Positive offset shows lyrics sooner
+                for timestamp in line_timestamps:
+                    self.__add_timestamp(timestamps,
+                                         max(0, timestamp - offset),
+                                         lyrics)
         except Exception as e:
-            Logger.error("SyncLyricsHelper::__get_timestamps(): %s", e)
+            Logger.error("LyricsHelper::__get_lrc_timestamps(): %s", e)
 
     def __get_lyrics_from_web(self, track, methods, callback, *args):
         """
@@ -224,7 +269,8 @@ class LyricsHelper:
                                 track,
                                 methods,
                                 callback,
-                                *args)
+                                *args,
+                                cache=True)
 
     def __download_metro_lyrics(self, track, methods, callback, *args):
         """
@@ -246,7 +292,8 @@ class LyricsHelper:
                                 track,
                                 methods,
                                 callback,
-                                *args)
+                                *args,
+                                cache=True)
 
     def __download_genius_lyrics(self, track, methods, callback, *args):
         """
@@ -270,7 +317,8 @@ class LyricsHelper:
                                 track,
                                 methods,
                                 callback,
-                                *args)
+                                *args,
+                                cache=True)
 
     def __on_lyrics_downloaded(self, uri, status, data, cls, separator,
                                track, methods, callback, *args):
@@ -297,3 +345,19 @@ class LyricsHelper:
             except Exception as e:
                 Logger.warning("LyricsHelper::__on_lyrics_downloaded(): %s", e)
         self.__get_lyrics_from_web(track, methods, callback, *args)
+
+    def __on_load(self, result, track, callback, *args):
+        """
+            Set lyrics if track still wanted and pass to callback
+            @param result as ([int], [str], str)
+            @param track as Track
+            @param callback as function
+        """
+        if track is not self.__track or result is None:
+            return
+        self.__CACHE[track.uri] = result
+        self.__CACHE.move_to_end(track.uri)
+        while len(self.__CACHE) > self.__CACHE_SIZE:
+            self.__CACHE.popitem(last=False)
+        (self.__timestamps, self.__lyrics, self.__text) = result
+        callback(*args)
@@ -0,0 +1,172 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+from threading import Lock
+
+from lollypop.define import App
+from lollypop.sqlcursor import SqlCursor
+from lollypop.logger import Logger
+
+
+class StatsHelper:
+    """
+        Write-behind queue for playback statistics
+        Updates are coalesced in memory and committed in one transaction
+    """
+    # Seconds before committing pending updates
+    __FLUSH_DELAY = 5
+
+    def __init__(self):
+        """
+            Init helper
+        """
+        self.__lock = Lock()
+        self.__timeout_id = None
+        self.__reset()
+
+    def add_play(self, track_id, album_id, album_pop, ltime):
+        """
+            Add a play for track
+            @param track_id as int
+            @param album_id as int
+            @param album_pop as int: album popularity to add
+            @param ltime as int
+        """
+        with self.__lock:
+            track_pops = self.__pending["track_pops"]
+            track_pops[track_id] = track_pops.get(track_id, 0) + 1
+            album_pops = self.__pending["album_pops"]
+            album_pops[album_id] = album_pops.get(album_id, 0) + album_pop
+            self.__pending["ltimes"][track_id] = ltime
+        self.__schedule()
+
+    def set_value(self, db, object_id, field, value):
+        """
+            Set a statistic value (popularity, rate, loved)
+            @param db as AlbumsDatabase/TracksDatabase
+            @param object_id as int
+            @param field as str
+            @param value as int
+        """
+        with self.__lock:
+            # Pending plays happened before value, apply them first
+            if field == "popularity":
+                pops = self.__pending["track_pops"] if db is App().tracks\
+                    else self.__pending["album_pops"]
+                count = pops.pop(object_id, 0)
+                if count:
+                    prior_pops = self.__pending["prior_pops"]
+                    prior_pops[(db, object_id)] =\
+                        prior_pops.get((db, object_id), 0) + count
+            self.__pending["values"][(db, object_id, field)] = value
+        self.__schedule()
+
+    def flush(self):
+        """
+            Commit pending updates, failed ones are kept for next flush
+            @thread safe
+        """
+        with self.__lock:
+            pending = self.__pending
+            self.__reset()
+        if not any(pending.values()):
+            return
+        failed = self.__get_empty()
+        SqlCursor.add(App().db)
+        for ((db, object_id), count) in pending["prior_pops"].items():
+            self.__update(failed["prior_pops"], (db, object_id), count,
+                          db.set_more_popular, object_id, count)
+        for ((db, object_id, field), value) in pending["values"].items():
+            self.__update(failed["values"], (db, object_id, field), value,
+                          getattr(db, "set_" + field), object_id, value)
+        for (track_id, count) in pending["track_pops"].items():
+            self.__update(failed["track_pops"], track_id, count,
+                          App().tracks.set_more_popular, track_id, count)
+        for (album_id, pop_to_add) in pending["album_pops"].items():
+            self.__update(failed["album_pops"], album_id, pop_to_add,
+                          App().albums.set_more_popular, album_id,
+                          pop_to_add)
+        for (track_id, ltime) in pending["ltimes"].items():
+            self.__update(failed["ltimes"], track_id, ltime,
+                          App().tracks.set_listened_at, track_id, ltime)
+        SqlCursor.remove(App().db)
+        if any(failed.values()):
+            self.__restore(failed)
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_empty(self):
+        """
+            Get empty pending updates
+            @return {str: {}}
+        """
+        # prior_pops: {(db, object id): popularity to add before values}
+        # values: {(db, object id, field): value}
+        # track_pops/album_pops: {object id: popularity to add}
+        # ltimes: {track id: ltime}
+        return {"prior_pops": {}, "values": {}, "track_pops": {},
+                "album_pops": {}, "ltimes": {}}
+
+    def __reset(self):
+        """
+            Clear pending updates
+        """
+        self.__pending = self.__get_empty()
+
+    def __update(self, failed, key, value, method, *args):
+        """
+            Run update method, remember value in failed on error
+            @param failed as {}
+            @param key as object
+            @param value as int
+            @param method as function
+            @param args as method args
+        """
+        try:
+            method(*args)
+        except Exception as e:
+            Logger.error("StatsHelper::flush(): %s", e)
+            failed[key] = value
+
+    def __restore(self, failed):
+        """
+            Merge failed updates back into pending ones
+            @param failed as {str: {}}
+        """
+        with self.__lock:
+            for name in ["prior_pops", "track_pops", "album_pops"]:
+                pops = self.__pending[name]
+                for (key, count) in failed[name].items():
+                    pops[key] = pops.get(key, 0) + count
+            # Newer values win
+            for name in ["values", "ltimes"]:
+                for (key, value) in failed[name].items():
+                    self.__pending[name].setdefault(key, value)
+        GLib.idle_add(self.__schedule)
+
+    def __schedule(self):
+        """
+            Commit pending updates later
+        """
+        if self.__timeout_id is None:
+            self.__timeout_id = GLib.timeout_add_seconds(
+                self.__FLUSH_DELAY, self.__on_flush_timeout)
+
+    def __on_flush_timeout(self):
+        """
+            Commit pending updates in background
+        """
+        self.__timeout_id = None
+        App().task_helper.run(self.flush)
@@ -14,6 +14,7 @@ import gi
 gi.require_version("Soup", "3.0")
 from gi.repository import GLib, Soup
 
+import json
 from threading import Thread
 from urllib.parse import urlparse
 from time import time, sleep
@@ -48,78 +49,69 @@ class TaskHelper:
         thread.start()
         return thread
 
-    def load_uri_content(self, uri, cancellable, callback, *args):
+    def load_uri_content(self, uri, cancellable, callback, *args,
+                         cache=False):
         """
             Load uri content async
             @param uri as str
             @param cancellable as Gio.Cancellable
             @param callback as a function
+            @param cache as bool: use web services cache
             @callback (uri as str, status as bool, content as bytes, args)
         """
         self.load_uri_content_with_headers(uri, [], cancellable,
-                                           callback, *args)
+                                           callback, *args, cache=cache)
 
     def load_uri_content_with_headers(self, uri, headers, cancellable,
-                                      callback, *args):
+                                      callback, *args, cache=False):
         """
             Load uri content async with headers
             @param uri as str
             @param headers as []
             @param cancellable as Gio.Cancellable
             @param callback as a function
+            @param cache as bool: use web services cache
             @callback (uri as str, status as bool, content as bytes, args)
         """
         if cancellable is not None and cancellable.is_cancelled():
             callback(uri, False, b"", *args)
-        try:
-            delay = self.__get_delay_for_uri(uri)
-            if delay > 0:
-                GLib.timeout_add_seconds(
-                                 delay,
-                                 self.load_uri_content_with_headers,
-                                 uri, headers, cancellable,
-                                 callback, *args)
-                return
-
-            session = Soup.Session.new()
-            session.set_property('accept-language-auto', True)
-            session.set_property(
-                "user-agent",
-                "Lollypop/%s (cedric.bellegarde@adishatz.org)" % App().version)
-            msg = Soup.Message.new("GET", uri)
-            if headers:
-                headers = msg.get_property("request-headers")
-                for header in headers:
-                    headers.append(header[0],
-                                   header[1])
-            session.send_and_read_async(
-                               msg, 0, cancellable,
-                               self.__on_load_uri_content, msg, headers,
-                               callback, cancellable, uri, *args)
-        except Exception as e:
-            Logger.warning(
-                "HelperTask::load_uri_content_with_headers(): %s" % e)
-            callback(uri, False, b"", *args)
+        if cache:
+            # Do not query cache database from main thread
+            self.run(self.__load_uri_content_from_cache, uri, headers,
+                     cancellable, callback, *args)
+        else:
+            self.__load_uri_content(uri, headers, None, cancellable,
+                                    callback, *args)
 
-    def load_uri_content_sync(self, uri, cancellable=None):
+    def load_uri_content_sync(self, uri, cancellable=None, cache=False):
         """
             Load uri
             @param uri as str
             @param cancellable as Gio.Cancellable
+            @param cache as bool: use web services cache
             @return (loaded as bool, content as bytes)
         """
-        return self.load_uri_content_sync_with_headers(uri, [], cancellable)
+        return self.load_uri_content_sync_with_headers(uri, [], cancellable,
+                                                       cache)
 
     def load_uri_content_sync_with_headers(self, uri, headers,
-                                           cancellable=None):
+                                           cancellable=None, cache=False):
         """
             Load uri
             @param uri as str
             @param headers as []
             @param cancellable as Gio.Cancellable
+            @param cache as bool: use web services cache
             @return (loaded as bool, content as bytes)
         """
         try:
+            cache_entry = None
+            if cache:
+                key = App().http_cache.get_key("GET", uri, headers)
+                cached = App().http_cache.get(key)
+                if cached is not None and cached[3]:
+                    return self.__get_cached_result(cached)
+                cache_entry = (key, cached)
             delay = self.__get_delay_for_uri(uri)
             if delay > 0:
                 sleep(delay)
@@ -132,11 +124,12 @@ class TaskHelper:
                 "user-agent",
                 "Lollypop/%s (cedric.bellegarde@adishatz.org)" % App().version)
             msg = Soup.Message.new("GET", uri)
-            if headers:
-                request_headers = msg.get_property("request-headers")
-                for header in headers:
-                    request_headers.append(header[0], header[1])
+            self.__set_request_headers(msg, headers, cache_entry)
             bytes = session.send_and_read(msg, cancellable).get_data()
+            if cache_entry is not None:
+                result = self.__cache_response(msg, uri, bytes, cache_entry)
+                if result is not None:
+                    return result
             if bytes is None:
                 response_headers = msg.get_property("response-headers")
                 wait = self.__handle_ratelimit(response_headers, uri)
@@ -146,7 +139,7 @@ class TaskHelper:
                         parsed = urlparse(uri)
                         self.__ratelimit[parsed.netloc] = wait
                         return self.load_uri_content_sync_with_headers(
-                            uri, headers, cancellable)
+                            uri, headers, cancellable, cache)
                     else:
                         del self.__retries[uri]
             else:
@@ -225,6 +218,168 @@ class TaskHelper:
 #######################
 # PRIVATE             #
 #######################
+    def __load_uri_content_from_cache(self, uri, headers, cancellable,
+                                      callback, *args):
+        """
+            Load uri content from cache, from network if not fresh
+            @param uri as str
+            @param headers as []
+            @param cancellable as Gio.Cancellable
+            @param callback as a function
+            @thread safe
+        """
+        try:
+            key = App().http_cache.get_key("GET", uri, headers)
+            cached = App().http_cache.get(key)
+            if cached is not None and cached[3]:
+                (status, content) = self.__get_cached_result(cached)
+                GLib.idle_add(self.__call_callback, callback,
+                              uri, status, content, *args)
+            else:
+                GLib.idle_add(self.__load_uri_content, uri, headers,
+                              (key, cached), cancellable, callback, *args)
+        except Exception as e:
+            Logger.warning(
+                "HelperTask::__load_uri_content_from_cache(): %s" % e)
+            GLib.idle_add(self.__call_callback, callback,
+                          uri, False, b"", *args)
+
+    def __load_uri_content(self, uri, headers, cache_entry, cancellable,
+                           callback, *args):
+        """
+            Load uri content async from network
+            @param uri as str
+            @param headers as []
+            @param cache_entry as (str, tuple)/None
+            @param cancellable as Gio.Cancellable
+            @param callback as a function
+        """
+        try:
+            delay = self.__get_delay_for_uri(uri)
+            if delay > 0:
+                GLib.timeout_add_seconds(
+                    delay,
+                    lambda: self.__load_uri_content(
+                        uri, headers, cache_entry, cancellable,
+                        callback, *args))
+                return
+
+            session = Soup.Session.new()
+            session.set_property('accept-language-auto', True)
+            session.set_property(
+                "user-agent",
+                "Lollypop/%s (cedric.bellegarde@adishatz.org)" % App().version)
+            msg = Soup.Message.new("GET", uri)
+            self.__set_request_headers(msg, headers, cache_entry)
+            session.send_and_read_async(
+                               msg, 0, cancellable,
+                               self.__on_load_uri_content, msg, headers,
+                               cache_entry, callback, cancellable, uri, *args)
+        except Exception as e:
+            Logger.warning(
+                "HelperTask::__load_uri_content(): %s" % e)
+            callback(uri, False, b"", *args)
+
+    def __cache_response_async(self, msg, uri, bytes, cache_entry,
+                               callback, *args):
+        """
+            Store response in cache then call callback from main loop
+            @param msg as Soup.Message
+            @param uri as str
+            @param bytes as bytes
+            @param cache_entry as (str, tuple)
+            @param callback as a function
+            @thread safe
+        """
+        try:
+            cached = self.__cache_response(msg, uri, bytes, cache_entry)
+            if cached is not None:
+                GLib.idle_add(self.__call_callback, callback,
+                              uri, cached[0], cached[1], *args)
+                return
+        except Exception as e:
+            Logger.warning("TaskHelper::__cache_response_async(): %s" % e)
+        GLib.idle_add(self.__call_callback, callback, uri, True, bytes, *args)
+
+    def __call_callback(self, callback, uri, status, content, *args):
+        """
+            Call load callback, for GLib.idle_add()
+            @param callback as a function
+            @param uri as str
+            @param status as bool
+            @param content as bytes
+        """
+        callback(uri, status, content, *args)
+
+    def __set_request_headers(self, msg, headers, cache_entry):
+        """
+            Add headers to request, plus cache validator if any
+            @param msg as Soup.Message
+            @param headers as []
+            @param cache_entry as (str, tuple)/None
+        """
+        request_headers = msg.get_property("request-headers")
+        for header in headers:
+            request_headers.append(header[0], header[1])
+        if cache_entry is not None and cache_entry[1] is not None:
+            etag = cache_entry[1][1]
+            if etag is not None:
+                request_headers.append("If-None-Match", etag)
+
+    def __get_cached_result(self, cached):
+        """
+            Get load result from cached response
+            @param cached as (int, str, bytes, bool)
+            @return (loaded as bool, content as bytes)
+        """
+        (status, etag, content, fresh) = cached
+        if status == 200 and content:
+            return (True, content)
+        return (False, b"")
+
+    def __cache_response(self, msg, uri, bytes, cache_entry):
+        """
+            Store response in cache
+            @param msg as Soup.Message
+            @param uri as str
+            @param bytes as bytes
+            @param cache_entry as (str, tuple)
+            @return (loaded as bool, content as bytes) if response
+                    should be replaced, None otherwise
+        """
+        (key, cached) = cache_entry
+        status = msg.get_status()
+        response_headers = msg.get_property("response-headers")
+        cache_control = response_headers.get_one("Cache-Control")
+        if status == Soup.Status.NOT_MODIFIED and cached is not None:
+            App().http_cache.refresh(key, uri, cache_control)
+            return self.__get_cached_result(cached)
+        elif status in [Soup.Status.OK, Soup.Status.NOT_FOUND]:
+            content = b"" if bytes is None else bytes
+            # Web services may answer errors with 200, do not replay them
+            if status == Soup.Status.OK and\
+                    self.__is_error_payload(content):
+                return None
+            App().http_cache.set(key, uri, status, content, cache_control,
+                                 response_headers.get_one("ETag"))
+            if status == Soup.Status.NOT_FOUND or not content:
+                return (False, b"")
+        return None
+
+    def __is_error_payload(self, content):
+        """
+            True if content is a JSON error object
+            @param content as bytes
+            @return bool
+        """
+        if not content.lstrip().startswith(b"{"):
+            return False
+        try:
+            decode = json.loads(content.decode("utf-8"))
+            return isinstance(decode, dict) and "error" in decode.keys()
+        except:
+            return False
+
     def __get_delay_for_uri(self, uri):
         """
             Get delay for last ratelimit
@@ -353,14 +508,15 @@ class TaskHelper:
             Logger.warning("TaskHelper::__on_soup_msg_finished(): %s" % e)
             callback(uri, False, b"", *args)
 
-    def __on_load_uri_content(self, source, result, msg, headers, callback,
-                              cancellable, uri, *args):
+    def __on_load_uri_content(self, source, result, msg, headers,
+                              cache_entry, callback, cancellable, uri, *args):
         """
             Get stream and start reading from it
             @param source as Soup.Session
             @param result as Gio.AsyncResult
             @param msg as Soup.Message
             @param headers as []
+            @param cache_entry as (str, tuple)/None
             @param cancellable as Gio.Cancellable
             @param callback as a function
             @param uri as str
@@ -370,6 +526,11 @@ class TaskHelper:
             wait = self.__handle_ratelimit(response_headers, uri)
             if wait is None:
                 bytes = source.send_and_read_finish(result).get_data()
+                if cache_entry is not None:
+                    # Do not write cache database from main thread
+                    self.run(self.__cache_response_async, msg, uri,
+                             bytes, cache_entry, callback, *args)
+                    return
                 callback(uri, True, bytes, *args)
             else:
                 parsed = urlparse(uri)
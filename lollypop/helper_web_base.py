@@ -75,7 +75,8 @@ class BaseWebHelper(GObject.Object):
               "type=video&key=%s&cx=%s" % (key, GOOGLE_API_ID)
         App().task_helper.load_uri_content(uri, cancellable,
                                            self.__on_get_youtube_id,
-                                           track, cancellable, methods)
+                                           track, cancellable, methods,
+                                           cache=True)
 
     def __get_youtube_id_start(self, track, cancellable, methods):
         """
@@ -94,7 +95,8 @@ class BaseWebHelper(GObject.Object):
         uri = "https://www.startpage.com/do/search?query=%s" % search
         App().task_helper.load_uri_content(uri, cancellable,
                                            self.__on_get_youtube_id_start,
-                                           track, cancellable, methods)
+                                           track, cancellable, methods,
+                                           cache=True)
 
     def __get_youtube_id_duckduck(self, track, cancellable, methods):
         """
@@ -113,7 +115,8 @@ class BaseWebHelper(GObject.Object):
         uri = "https://duckduckgo.com/lite/?q=%s" % search
         App().task_helper.load_uri_content(uri, cancellable,
                                            self.__on_get_youtube_id_duckduck,
-                                           track, cancellable, methods)
+                                           track, cancellable, methods,
+                                           cache=True)
 
     def __emit_uri_loaded(self, youtube_id, track, cancellable, methods):
         """
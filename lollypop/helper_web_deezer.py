@@ -37,7 +37,7 @@ class DeezerWebHelper:
         try:
             uri = "https://api.deezer.com/search/artist?q=%s" % artist_name
             (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
+                uri, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 for artist in decode["data"]:
@@ -56,7 +56,7 @@ class DeezerWebHelper:
         try:
             uri = "https://api.deezer.com/album/%s" % album_id
             (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
+                uri, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 return decode
@@ -74,7 +74,7 @@ class DeezerWebHelper:
         try:
             uri = "https://api.deezer.com/track/%s" % track_id
             (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
+                uri, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 return decode
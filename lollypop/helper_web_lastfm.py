@@ -43,7 +43,8 @@ class LastFMWebHelper:
             uri = "http://ws.audioscrobbler.com/2.0/?method=artist.getinfo"
             uri += "&artist=%s&api_key=%s&format=json" % (
                 artist_name, LASTFM_API_KEY)
-            (status, data) = App().task_helper.load_uri_content_sync(uri, None)
+            (status, data) = App().task_helper.load_uri_content_sync(
+                uri, None, cache=True)
             if status:
                 content = json.loads(data.decode("utf-8"))
                 return content["artist"]["mbid"]
@@ -66,7 +67,8 @@ class LastFMWebHelper:
             uri += "?method=artist.gettopalbums"
             uri += "&artist=%s&api_key=%s&format=json" % (
                 artist, LASTFM_API_KEY)
-            (status, data) = App().task_helper.load_uri_content_sync(uri, None)
+            (status, data) = App().task_helper.load_uri_content_sync(
+                uri, None, cache=True)
             if status:
                 content = json.loads(data.decode("utf-8"))
                 for album in content["topalbums"]["album"]:
@@ -91,7 +93,8 @@ class LastFMWebHelper:
             uri += "?method=album.getInfo"
             uri += "&album=%s&artist=%s&api_key=%s&format=json" % (
                 album, artist, LASTFM_API_KEY)
-            (status, data) = App().task_helper.load_uri_content_sync(uri, None)
+            (status, data) = App().task_helper.load_uri_content_sync(
+                uri, None, cache=True)
             if status:
                 return json.loads(data.decode("utf-8"))["album"]
         except:
@@ -111,7 +114,8 @@ class LastFMWebHelper:
             uri += "?method=track.getInfo"
             uri += "&mbid=%s&api_key=%s&format=json" % (
                 mbid, LASTFM_API_KEY)
-            (status, data) = App().task_helper.load_uri_content_sync(uri, None)
+            (status, data) = App().task_helper.load_uri_content_sync(
+                uri, None, cache=True)
             if status:
                 return json.loads(data.decode("utf-8"))["track"]
         except:
@@ -133,7 +137,8 @@ class LastFMWebHelper:
             uri = "http://ws.audioscrobbler.com/2.0/?method=artist.getinfo"
             uri += "&artist=%s&api_key=%s&format=json&lang=%s" % (
                 artist, LASTFM_API_KEY, language)
-            (status, data) = App().task_helper.load_uri_content_sync(uri, None)
+            (status, data) = App().task_helper.load_uri_content_sync(
+                uri, None, cache=True)
             if status:
                 content = json.loads(data.decode("utf-8"))
                 bio = content["artist"]["bio"]["content"]
@@ -21,6 +21,7 @@ from lollypop.utils import get_lollypop_album_id, get_lollypop_track_id
 from lollypop.objects_album import Album
 from lollypop.define import App, Type
 from lollypop.collection_item import CollectionItem
+from lollypop.sqlcursor import SqlCursor
 
 
 class SaveWebHelper(GObject.Object):
@@ -88,6 +89,67 @@ class SaveWebHelper(GObject.Object):
             emit_signal(self, "match-album", album.id, storage_type)
         return item
 
+    def save_album_payloads_to_db(self, payloads, storage_type,
+                                  notify, cancellable):
+        """
+            Save albums to DB in one transaction, nothing is saved on error
+            Artists are resolved once per payloads
+            @param payloads as [{}]
+            @param storage_type as StorageType
+            @param notify as bool
+            @param cancellable as Gio.Cancellable
+            @return [CollectionItem]
+        """
+        lp_album_ids = [get_lollypop_album_id(payload["name"],
+                                              payload["artists"])
+                        for payload in payloads]
+        items = []
+        new_items = []
+        SqlCursor.add(App().db)
+        try:
+            album_ids = App().albums.get_ids_for_lp_album_ids(lp_album_ids)
+            # {artists: artist ids}
+            artist_ids = {}
+            dates = []
+            for (payload, lp_album_id) in zip(payloads, lp_album_ids):
+                if cancellable.is_cancelled():
+                    break
+                if lp_album_id in album_ids.keys():
+                    items.append(Album(album_ids[lp_album_id]).collection_item)
+                    continue
+                artists = payload["artists"]
+                if artists not in artist_ids.keys():
+                    artist_ids[artists] = App().scanner.add_artists(
+                        artists, "")[1]
+                item = self.__add_album(payload, artist_ids[artists],
+                                        storage_type)
+                if item.year is not None:
+                    dates.append((item.album_id, item.year, item.timestamp))
+                album_ids[lp_album_id] = item.album_id
+                items.append(item)
+                new_items.append((item, payload))
+            App().albums.set_dates(dates)
+            App().albums.add_genre_to_albums(
+                [item.album_id for (item, payload) in new_items], Type.WEB)
+            SqlCursor.commit(App().db)
+        except Exception as e:
+            Logger.error("SaveWebHelper::save_album_payloads_to_db(): %s", e)
+            # Keep DB as before run, only already known albums are valid
+            SqlCursor.rollback(App().db)
+            new_album_ids = [item.album_id for (item, payload) in new_items]
+            items = [item for item in items
+                     if item.album_id not in new_album_ids]
+            new_items = []
+        SqlCursor.remove(App().db)
+        if notify:
+            for (item, payload) in new_items:
+                App().album_art.add_from_uri(Album(item.album_id),
+                                             payload["artwork-uri"],
+                                             cancellable)
+            for item in items:
+                emit_signal(self, "match-album", item.album_id, storage_type)
+        return items
+
 #######################
 # PRIVATE             #
 #######################
@@ -151,6 +213,43 @@ class SaveWebHelper(GObject.Object):
         App().albums.add_genre(item.album_id, Type.WEB)
         return item
 
+    def __add_album(self, payload, artist_ids, storage_type):
+        """
+            Add album payload to DB, year/genres are not set
+            @param payload as {}
+            @param artist_ids as [int]
+            @param storage_type as StorageType
+            @return CollectionItem
+        """
+        (timestamp, year) = self.__get_date_from_payload(payload)
+        item = CollectionItem(uri=payload["uri"],
+                              album_artists=payload["artists"],
+                              album_artist_ids=artist_ids,
+                              album_name=payload["name"],
+                              album_mtime=int(time()),
+                              year=year,
+                              timestamp=timestamp,
+                              mb_album_id=payload["mbid"],
+                              album_synced=payload["track-count"],
+                              storage_type=storage_type)
+        item.lp_album_id = get_lollypop_album_id(item.album_name,
+                                                 item.album_artists,
+                                                 item.year,
+                                                 item.mb_album_id)
+        (item.new_album, item.album_id) = App().scanner.add_album(
+                                               item.album_name,
+                                               item.mb_album_id,
+                                               item.lp_album_id,
+                                               item.album_artist_ids,
+                                               item.uri,
+                                               item.album_loved,
+                                               item.album_pop,
+                                               item.album_rate,
+                                               item.album_synced,
+                                               item.album_mtime,
+                                               item.storage_type)
+        return item
+
     def __save_track(self, payload, item, storage_type):
         """
             Save track payload to DB
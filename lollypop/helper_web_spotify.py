@@ -48,7 +48,7 @@ class SpotifyWebHelper:
                 artist_name
             (status,
              data) = App().task_helper.load_uri_content_sync_with_headers(
-                    uri, headers, cancellable)
+                    uri, headers, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 for item in decode["artists"]["items"]:
@@ -72,7 +72,7 @@ class SpotifyWebHelper:
             uri = "https://api.spotify.com/v1/tracks/%s" % spotify_id
             (status,
              data) = App().task_helper.load_uri_content_sync_with_headers(
-                    uri, headers, cancellable)
+                    uri, headers, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 return decode
@@ -99,7 +99,7 @@ class SpotifyWebHelper:
             uri += "?country=%s" % locale
             (status,
              data) = App().task_helper.load_uri_content_sync_with_headers(
-                    uri, headers, cancellable)
+                    uri, headers, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 for item in decode["tracks"]:
@@ -57,7 +57,8 @@ class InformationDownloader:
             artist = GLib.uri_escape_string(artist, None, True)
             uri = "https://theaudiodb.com/api/v1/json/"
             uri += "%s/search.php?s=%s" % (AUDIODB_CLIENT_ID, artist)
-            (status, data) = App().task_helper.load_uri_content_sync(uri, None)
+            (status, data) = App().task_helper.load_uri_content_sync(
+                uri, None, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 language = getdefaultlocale()[0][-2:]
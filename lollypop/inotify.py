@@ -10,122 +10,463 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gio, GLib
-from gi.repository.Gio import FILE_ATTRIBUTE_STANDARD_TYPE,\
-    FILE_ATTRIBUTE_STANDARD_FAST_CONTENT_TYPE
+from gi.repository import GLib
 
-from lollypop.define import App, ScanType
-from lollypop.utils_file import is_audio
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+from errno import ENOSPC
+from threading import Thread, Lock
+from time import time, sleep
+
+from lollypop.define import App, ScanType, FileType
+from lollypop.utils_file import get_file_type
 from lollypop.logger import Logger
 
 
-SCAN_QUERY_INFO = "{},{}".format(FILE_ATTRIBUTE_STANDARD_TYPE,
-                                 FILE_ATTRIBUTE_STANDARD_FAST_CONTENT_TYPE)
+class InotifyBackend:
+    """
+        Raw inotify, one file descriptor for all watches
+    """
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    __MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |\
+        IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+    __EVENT = "iIII"
+
+    def __init__(self):
+        """
+            Init backend
+            @raise OSError if inotify is not available
+        """
+        self.__libc = ctypes.CDLL(ctypes.util.find_library("c"),
+                                  use_errno=True)
+        self.__fd = self.__libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.__fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1() failed")
+
+    def add_watch(self, path):
+        """
+            Watch directory
+            @param path as str
+            @return watch descriptor as int
+            @raise OSError
+        """
+        wd = self.__libc.inotify_add_watch(self.__fd,
+                                           os.fsencode(path),
+                                           self.__MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        return wd
+
+    def rm_watch(self, wd):
+        """
+            Stop watching directory
+            @param wd as int
+        """
+        self.__libc.inotify_rm_watch(self.__fd, wd)
+
+    def read(self, timeout):
+        """
+            Read pending events
+            @param timeout as float
+            @return [(int, int, int, str)]: [(wd, mask, cookie, name)]
+        """
+        events = []
+        (readable, writable, error) = select.select([self.__fd], [], [],
+                                                    timeout)
+        if not readable:
+            return events
+        try:
+            data = os.read(self.__fd, 65536)
+        except BlockingIOError:
+            return events
+        size = struct.calcsize(self.__EVENT)
+        offset = 0
+        while offset + size <= len(data):
+            (wd, mask, cookie, length) = struct.unpack_from(self.__EVENT,
+                                                            data, offset)
+            name = data[offset + size:offset + size + length].rstrip(b"\0")
+            events.append((wd, mask, cookie, os.fsdecode(name)))
+            offset += size + length
+        return events
 
 
 class Inotify:
     """
-        Inotify support
+        Collection watcher
+        Changes are read by one thread and coalesced, then changed files
+        are sent to the scanner. Moves are paired to keep tracks stats.
+        Directories that can't be watched are polled and rescanned.
     """
-    # 2 seconds before updating database
-    __TIMEOUT = 2000
+    # Wait for 2 seconds without events before updating database
+    __TIMEOUT = 2
+    # But do not wait more than 30 seconds
+    __MAX_DELAY = 30
+    # Polling interval for unwatched directories
+    __POLL_INTERVAL = 60
 
     def __init__(self):
         """
-            Init inode notification
+            Init collection watcher
         """
-        self.__monitors = {}
-        self.__collection_timeout_id = None
-        self.__disable_timeout_id = None
+        self.__lock = Lock()
+        self.__thread = None
+        self.__backend = None
+        # Watched directories: {wd: path} and {path: wd}
+        self.__wds = {}
+        self.__paths = {}
+        # Polled directories: {path: mtime}
+        self.__polled = {}
+        # Changed directories waiting for a rescan
+        self.__changed = set()
+        # Changed files waiting for an update
+        self.__modified = set()
+        self.__removed = set()
+        # Moves: {old path: new path}, unpaired: {cookie: (path, is_dir)}
+        self.__moved = {}
+        self.__moves_from = {}
+        self.__first_change = 0
+        self.__last_change = 0
+        self.__last_poll = time()
+        self.__disabled_until = 0
+        try:
+            self.__backend = InotifyBackend()
+        except Exception as e:
+            Logger.warning("Inotify: polling collection, %s", e)
 
     def add_monitor(self, uri):
         """
             Add a monitor for uri
             @param uri as string
         """
-        # Check if there is already a monitor for this uri
-        if uri in self.__monitors.keys():
-            return
-        try:
-            f = Gio.File.new_for_uri(uri)
-            monitor = f.monitor_directory(Gio.FileMonitorFlags.NONE,
-                                          None)
-            if monitor is not None:
-                monitor.connect("changed", self.__on_dir_changed)
-                self.__monitors[uri] = monitor
-        except Exception as e:
-            Logger.error("Inotify::add_monitor(): %s" % e)
+        self.add_monitors([uri])
+
+    def add_monitors(self, uris):
+        """
+            Add monitors for directory uris
+            @param uris as [str]
+            @thread safe
+        """
+        for uri in uris:
+            try:
+                path = GLib.filename_from_uri(uri)[0]
+                self.__add_watch(path)
+            except Exception as e:
+                Logger.error("Inotify::add_monitors(): %s", e)
+        with self.__lock:
+            if self.__thread is None:
+                self.__thread = Thread(target=self.__run)
+                self.__thread.daemon = True
+                self.__thread.start()
 
     def disable(self, timeout=10000):
         """
             Disable inotify for timeout
             @param timeout as int
         """
-        def on_timeout():
-            self.__disable_timeout_id = None
-        if self.__collection_timeout_id is not None:
-            GLib.source_remove(self.__collection_timeout_id)
-        if self.__disable_timeout_id is not None:
-            GLib.source_remove(self.__disable_timeout_id)
-        self.__disable_timeout_id = GLib.timeout_add(timeout, on_timeout)
+        self.__disabled_until = time() + timeout / 1000
 
 #######################
 # PRIVATE             #
 #######################
-    def __on_dir_changed(self, monitor, changed_file, other_file, event):
+    def __add_watch(self, path):
         """
-            Stop collection scanner if running
-            Delayed update by default
-            @param monitor as Gio.FileMonitor
-            @param changed_file as Gio.File/None
-            @param other_file as Gio.File/None
-            @param event as Gio.FileMonitorEvent
+            Watch directory, poll it if not possible
+            @param path as str
         """
-        if self.__disable_timeout_id is not None:
-            return
-        try:
-            changed_uri = changed_file.get_uri()
-            # Do not monitor our self
-            if changed_uri in self.__monitors.keys() and\
-                    self.__monitors[changed_uri] == monitor:
+        with self.__lock:
+            if path in self.__paths.keys() or path in self.__polled.keys():
                 return
-
-            if changed_file.query_exists():
-                # Ignore non audio
-                info = changed_file.query_info(SCAN_QUERY_INFO,
-                                               Gio.FileQueryInfoFlags.NONE)
-                if info.get_file_type() != Gio.FileType.DIRECTORY and\
-                        is_audio(info):
+            if self.__backend is not None:
+                try:
+                    wd = self.__backend.add_watch(path)
+                    self.__wds[wd] = path
+                    self.__paths[path] = wd
                     return
+                except OSError as e:
+                    if e.errno == ENOSPC and not self.__polled:
+                        Logger.warning("Inotify: watches limit reached, "
+                                       "polling remaining directories")
+                    elif e.errno != ENOSPC:
+                        return
+            try:
+                self.__polled[path] = os.stat(path).st_mtime
+            except OSError:
+                pass
 
-            # Stop collection scanner and wait
-            if App().scanner.is_locked():
-                App().scanner.stop()
-                GLib.timeout_add(self.__TIMEOUT,
-                                 self.__on_dir_changed,
-                                 monitor,
-                                 changed_file,
-                                 other_file,
-                                 event)
-            # Run update delayed
-            else:
-                if self.__collection_timeout_id is not None:
-                    GLib.source_remove(self.__collection_timeout_id)
-                if changed_file.has_parent():
-                    uris = [changed_file.get_parent().get_uri()]
+    def __add_watches(self, path):
+        """
+            Watch directory and its sub directories
+            @param path as str
+        """
+        for (root, dirs, files) in os.walk(path):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            self.__add_watch(root)
+
+    def __remove_watches(self, path):
+        """
+            Stop watching directory and its sub directories
+            @param path as str
+        """
+        prefix = os.path.join(path, "")
+        with self.__lock:
+            for watched in list(self.__paths.keys()):
+                if watched == path or watched.startswith(prefix):
+                    wd = self.__paths.pop(watched)
+                    del self.__wds[wd]
+                    self.__backend.rm_watch(wd)
+            for polled in list(self.__polled.keys()):
+                if polled == path or polled.startswith(prefix):
+                    del self.__polled[polled]
+
+    def __run(self):
+        """
+            Read events until application quits
+        """
+        while True:
+            try:
+                if self.__backend is not None:
+                    events = self.__backend.read(self.__TIMEOUT / 2)
+                    for event in events:
+                        self.__handle_event(*event)
                 else:
-                    uris = [changed_uri]
-                self.__collection_timeout_id = GLib.timeout_add(
-                                                 self.__TIMEOUT,
-                                                 self.__run_collection_update,
-                                                 uris)
-        except Exception as e:
-            Logger.error("Inotify::__on_dir_changed()", e)
+                    sleep(self.__TIMEOUT / 2)
+                now = time()
+                if self.__polled and\
+                        now - self.__last_poll > self.__POLL_INTERVAL:
+                    self.__last_poll = now
+                    self.__poll()
+                if self.__has_changes() and\
+                        (now - self.__last_change > self.__TIMEOUT or
+                         now - self.__first_change > self.__MAX_DELAY):
+                    self.__flush()
+            except Exception as e:
+                Logger.error("Inotify::__run(): %s", e)
+
+    def __handle_event(self, wd, mask, cookie, name):
+        """
+            Handle an inotify event
+            @param wd as int
+            @param mask as int
+            @param cookie as int
+            @param name as str
+        """
+        backend = InotifyBackend
+        if mask & backend.IN_Q_OVERFLOW:
+            # Events lost, rescan all watched directories
+            with self.__lock:
+                paths = list(self.__paths.keys())
+            for path in paths:
+                self.__add_change(path)
+            return
+        with self.__lock:
+            path = self.__wds.get(wd, None)
+            if mask & backend.IN_IGNORED and path is not None:
+                del self.__wds[wd]
+                del self.__paths[path]
+        if path is None or mask & (backend.IN_IGNORED |
+                                   backend.IN_DELETE_SELF):
+            return
+        if name.startswith("."):
+            return
+        child = os.path.join(path, name)
+        is_dir = mask & backend.IN_ISDIR != 0
+        if not is_dir and get_file_type(name) == FileType.OTHER:
+            return
+        if mask & backend.IN_MOVED_FROM:
+            # Paired with IN_MOVED_TO or handled as a removal on flush
+            self.__moves_from[cookie] = (child, is_dir)
+        elif mask & backend.IN_MOVED_TO:
+            move = self.__moves_from.pop(cookie, None)
+            if is_dir:
+                if move is not None:
+                    self.__remove_watches(move[0])
+                self.__add_watches(child)
+            if move is not None:
+                self.__add_move(move[0], child)
+            elif is_dir:
+                self.__add_change(child)
+            else:
+                self.__add_file(child)
+        elif is_dir:
+            if mask & backend.IN_CREATE:
+                self.__add_watches(child)
+                self.__add_change(child)
+            elif mask & backend.IN_DELETE:
+                self.__remove_watches(child)
+                self.__add_removed(child)
+        # Files are complete on close
+        elif mask & backend.IN_CLOSE_WRITE:
+            self.__add_file(child)
+        elif mask & backend.IN_DELETE:
+            self.__add_removed(child)
+
+    def __has_changes(self):
+        """
+            True if changes are waiting for an update
+            @return bool
+        """
+        return bool(self.__changed or self.__modified or self.__removed or
+                    self.__moved or self.__moves_from)
+
+    def __touch(self):
+        """
+            Delay update for new change
+            @return False if disabled
+        """
+        now = time()
+        if now < self.__disabled_until:
+            return False
+        if not self.__has_changes():
+            self.__first_change = now
+        self.__last_change = now
+        return True
+
+    def __add_change(self, path):
+        """
+            Mark directory as changed
+            @param path as str
+        """
+        if self.__touch():
+            self.__changed.add(path)
+
+    def __add_file(self, path):
+        """
+            Mark file as created or modified
+            @param path as str
+        """
+        if self.__touch():
+            self.__removed.discard(path)
+            self.__modified.add(path)
+
+    def __add_removed(self, path):
+        """
+            Mark file or directory as removed
+            @param path as str
+        """
+        if self.__touch():
+            self.__modified.discard(path)
+            self.__removed.add(path)
+
+    def __add_move(self, old_path, new_path):
+        """
+            Mark file or directory as moved
+            @param old_path as str
+            @param new_path as str
+        """
+        if not self.__touch():
+            return
+        self.__removed.discard(new_path)
+        # File modified before being moved, read tags from new path
+        if old_path in self.__modified:
+            self.__modified.remove(old_path)
+            self.__modified.add(new_path)
+        # Merge successive moves
+        for (path, moved_path) in self.__moved.items():
+            if moved_path == old_path:
+                self.__moved[path] = new_path
+                return
+        self.__moved[old_path] = new_path
+
+    def __poll(self):
+        """
+            Check polled directories mtime
+        """
+        with self.__lock:
+            polled = list(self.__polled.items())
+        for (path, mtime) in polled:
+            try:
+                new_mtime = os.stat(path).st_mtime
+            except OSError:
+                with self.__lock:
+                    self.__polled.pop(path, None)
+                self.__add_change(os.path.dirname(path))
+                continue
+            if new_mtime != mtime:
+                with self.__lock:
+                    self.__polled[path] = new_mtime
+                self.__add_watches(path)
+                self.__add_change(path)
+
+    def __flush(self):
+        """
+            Send changes to scanner
+            Sub directories and files of changed directories are ignored
+        """
+        # Moved out of collection
+        for (path, is_dir) in self.__moves_from.values():
+            if is_dir:
+                self.__remove_watches(path)
+            self.__removed.add(path)
+        self.__moves_from = {}
+        paths = set()
+        for path in self.__changed:
+            # Directory may have been removed, use first existing parent
+            while not os.path.isdir(path) and os.path.dirname(path) != path:
+                path = os.path.dirname(path)
+            paths.add(path)
+        self.__changed = set()
+        dir_paths = []
+        for path in sorted(paths):
+            if dir_paths and\
+                    path.startswith(os.path.join(dir_paths[-1], "")):
+                continue
+            dir_paths.append(path)
+        prefixes = tuple(os.path.join(path, "") for path in dir_paths)
+        dir_uris = [GLib.filename_to_uri(path) for path in dir_paths]
+        uris = [GLib.filename_to_uri(path) for path in self.__modified
+                if not path.startswith(prefixes)]
+        removed_paths = []
+        for path in sorted(self.__removed):
+            if path.startswith(prefixes) or (
+                    removed_paths and
+                    path.startswith(os.path.join(removed_paths[-1], ""))):
+                continue
+            removed_paths.append(path)
+        removed_uris = [GLib.filename_to_uri(path) for path in removed_paths]
+        moved_uris = [(GLib.filename_to_uri(old_path),
+                       GLib.filename_to_uri(new_path))
+                      for (old_path, new_path) in self.__moved.items()]
+        self.__modified = set()
+        self.__removed = set()
+        self.__moved = {}
+        GLib.idle_add(self.__run_collection_update,
+                      dir_uris, uris, removed_uris, moved_uris)
 
-    def __run_collection_update(self, uris=[]):
+    def __run_collection_update(self, dir_uris, uris,
+                                removed_uris, moved_uris):
         """
-            Run a collection update
+            Run a collection update, wait for running scan
+            Files are updated first, then directories are rescanned
+            @param dir_uris as [str]
             @param uris as [str]
+            @param removed_uris as [str]
+            @param moved_uris as [(str, str)]
         """
-        self.__collection_timeout_id = None
-        App().scanner.update(ScanType.NEW_FILES, uris)
+        if App().scanner.is_locked():
+            GLib.timeout_add(self.__TIMEOUT * 1000,
+                             self.__run_collection_update,
+                             dir_uris, uris, removed_uris, moved_uris)
+        elif uris or removed_uris or moved_uris:
+            Logger.info("Inotify: updating %s, removing %s, moving %s",
+                        uris, removed_uris, moved_uris)
+            App().scanner.update_files(uris, removed_uris, moved_uris)
+            if dir_uris:
+                GLib.timeout_add(self.__TIMEOUT * 1000,
+                                 self.__run_collection_update,
+                                 dir_uris, [], [], [])
+        elif dir_uris:
+            Logger.info("Inotify: updating %s", dir_uris)
+            App().scanner.update(ScanType.NEW_FILES, dir_uris)
@@ -0,0 +1,1482 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib, Gst
+
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+from time import time
+
+from lollypop.define import App, Repeat, ScanType
+from lollypop.database_mpd import MpdDatabase
+from lollypop.objects_track import Track
+from lollypop.sqlcursor import SqlCursor
+from lollypop.utils import get_default_storage_type
+from lollypop.utils_album import tracks_to_albums
+from lollypop.logger import Logger
+
+
+class MpdError(Exception):
+    """
+        Error sent to client as an ACK
+    """
+    NOT_LIST = 1
+    ARG = 2
+    PASSWORD = 3
+    PERMISSION = 4
+    UNKNOWN = 5
+    NO_EXIST = 50
+    SYSTEM = 52
+
+    def __init__(self, code, message):
+        """
+            Init error
+            @param code as int
+            @param message as str
+        """
+        Exception.__init__(self, message)
+        self.code = code
+        self.message = message
+
+
+class MpdClient:
+    """
+        A connected MPD client
+    """
+
+    def __init__(self, reader, writer):
+        """
+            Init client
+            @param reader as asyncio.StreamReader
+            @param writer as asyncio.StreamWriter
+        """
+        self.reader = reader
+        self.writer = writer
+        # Subscribed subsystems while idle, None if not idle
+        self.idle = None
+        # Subsystems changed since last idle
+        self.events = set()
+
+    def send(self, lines):
+        """
+            Send lines to client
+            @param lines as [str]
+        """
+        data = "".join("%s\n" % line.replace("\n", " ") for line in lines)
+        self.writer.write(data.encode("utf-8"))
+
+
+class MpdServer:
+    """
+        MPD protocol server
+        Clients are handled by an asyncio loop in a dedicated thread
+        Player is only used from main loop, DB from a dedicated thread
+    """
+
+    __VERSION = "0.23.0"
+    # Songs sent per batch when streaming big responses
+    __BATCH_SIZE = 500
+    # Coalesce player/playlist signals before waking idle clients
+    __IDLE_DELAY = 0.05
+    # Max songs kept in cache
+    __CACHE_SIZE = 10000
+    __SUBSYSTEMS = ["database", "update", "stored_playlist", "playlist",
+                    "player", "mixer", "output", "options"]
+    __COMMANDS = ["add", "addid", "clear", "close", "commands", "count",
+                  "currentsong", "decoders", "delete", "deleteid", "find",
+                  "findadd", "getvol", "idle", "list", "listall",
+                  "listallinfo", "listplaylist", "listplaylistinfo",
+                  "listplaylists", "load", "lsinfo", "next", "noidle",
+                  "notcommands", "outputs", "pause", "ping", "play",
+                  "playid", "playlistadd", "playlistclear", "playlistid",
+                  "playlistinfo", "plchanges", "plchangesposid", "previous",
+                  "random", "repeat", "replay_gain_status", "rescan", "rm",
+                  "save", "search", "searchadd", "seek", "seekcur", "seekid",
+                  "setvol", "single", "consume", "stats", "status", "stop",
+                  "tagtypes", "update", "urlhandlers"]
+    __TAG_NAMES = {"artist": "Artist", "albumartist": "AlbumArtist",
+                   "album": "Album", "title": "Title", "genre": "Genre",
+                   "date": "Date", "track": "Track", "disc": "Disc",
+                   "file": "file"}
+
+    def __init__(self):
+        """
+            Init server
+        """
+        self.__loop = None
+        self.__server = None
+        self.__clients = set()
+        self.__events = set()
+        self.__flush_handle = None
+        self.__signal_ids = []
+        self.__start_time = int(time())
+        # Only changed from main loop, reset on playback changes
+        self.__playlist = None
+        self.__playlist_version = 1
+        self.__db = MpdDatabase()
+        # Songs rows by track id, only used from asyncio loop
+        self.__songs = {}
+        # sqlite objects are bound to their thread, keep a thread cursor
+        self.__executor = ThreadPoolExecutor(max_workers=1,
+                                             initializer=SqlCursor.add,
+                                             initargs=(App().db,))
+
+    def start(self):
+        """
+            Start server in a new thread
+        """
+        self.__connect_signals()
+        thread = Thread(target=self.__run)
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        """
+            Stop server
+        """
+        self.__disconnect_signals()
+        if self.__loop is not None:
+            self.__loop.call_soon_threadsafe(self.__shutdown)
+
+#######################
+# PROTECTED           #
+#######################
+    async def _add(self, client, args):
+        """
+            Add uri to playback
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        track_ids = await self.__run_in_db(self.__get_track_ids_for_uri,
+                                           args[0])
+        await self.__run_in_main(self.__add_tracks, track_ids)
+
+    async def _addid(self, client, args):
+        """
+            Add uri to playback and return track id
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        track_ids = await self.__run_in_db(self.__get_track_ids_for_uri,
+                                           args[0])
+        if len(track_ids) != 1:
+            raise MpdError(MpdError.NO_EXIST, "No such song")
+        await self.__run_in_main(self.__add_tracks, track_ids)
+        client.send(["Id: %s" % track_ids[0]])
+
+    async def _clear(self, client, args):
+        """
+            Clear playback
+            @param client as MpdClient
+            @param args as [str]
+        """
+        def clear():
+            App().player.stop()
+            App().player.clear_albums()
+        await self.__run_in_main(clear)
+
+    async def _commands(self, client, args):
+        """
+            Send available commands
+            @param client as MpdClient
+            @param args as [str]
+        """
+        client.send(["command: %s" % command
+                     for command in sorted(self.__COMMANDS)])
+
+    async def _consume(self, client, args):
+        """
+            Consume mode is not supported
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        if args[0] != "0":
+            raise MpdError(MpdError.ARG, "Consume mode is not supported")
+
+    async def _count(self, client, args):
+        """
+            Count songs matching filters
+            @param client as MpdClient
+            @param args as [str]
+        """
+        filters = self.__get_filters(args, True)
+        (songs, playtime) = await self.__run_in_db(
+            self.__db.count, get_default_storage_type(), filters)
+        client.send(["songs: %s" % songs,
+                     "playtime: %s" % (playtime // 1000)])
+
+    async def _currentsong(self, client, args):
+        """
+            Send current song
+            @param client as MpdClient
+            @param args as [str]
+        """
+        (track_id, playlist) = await self.__run_in_main(
+            lambda: (App().player.current_track.id, self.__get_playlist()))
+        if track_id is None:
+            return
+        pos = playlist.index(track_id) if track_id in playlist else None
+        songs = await self.__get_songs([track_id])
+        if track_id in songs.keys():
+            client.send(self.__get_song_lines(songs[track_id], pos))
+
+    async def _decoders(self, client, args):
+        """
+            Decoders are handled by GStreamer
+            @param client as MpdClient
+            @param args as [str]
+        """
+        pass
+
+    async def _delete(self, client, args):
+        """
+            Delete songs from playback
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        (start, end) = self.__get_range(args[0])
+        await self.__run_in_main(self.__delete_tracks, start, end)
+
+    async def _deleteid(self, client, args):
+        """
+            Delete song from playback
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        track_id = self.__get_int(args[0])
+
+        def delete():
+            playlist = self.__get_playlist()
+            if track_id not in playlist:
+                raise MpdError(MpdError.NO_EXIST, "No such song")
+            pos = playlist.index(track_id)
+            self.__delete_tracks(pos, pos + 1)
+        await self.__run_in_main(delete)
+
+    async def _find(self, client, args):
+        """
+            Send songs matching filters
+            @param client as MpdClient
+            @param args as [str]
+        """
+        filters = self.__get_filters(args, True)
+        await self.__send_collection_songs(client, [], filters, True)
+
+    async def _findadd(self, client, args):
+        """
+            Add songs matching filters to playback
+            @param client as MpdClient
+            @param args as [str]
+        """
+        filters = self.__get_filters(args, True)
+        track_ids = await self.__run_in_db(self.__db.get_track_ids,
+                                           get_default_storage_type(),
+                                           [], filters)
+        await self.__run_in_main(self.__add_tracks, track_ids)
+
+    async def _getvol(self, client, args):
+        """
+            Send volume
+            @param client as MpdClient
+            @param args as [str]
+        """
+        volume = await self.__run_in_main(lambda: App().player.volume)
+        client.send(["volume: %s" % int(volume * 100)])
+
+    async def _list(self, client, args):
+        """
+            Send tag values
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        tag = args[0].lower()
+        if tag not in self.__TAG_NAMES.keys():
+            raise MpdError(MpdError.ARG, "Unknown tag type")
+        args = args[1:]
+        # Grouping is not supported
+        for (i, arg) in enumerate(args):
+            if arg.lower() == "group":
+                args = args[:i]
+                break
+        # Old syntax: list album <artist>
+        if tag == "album" and len(args) == 1 and not args[0].startswith("("):
+            filters = [("artist", args[0], True)]
+        else:
+            filters = self.__get_filters(args, True)
+        values = await self.__run_in_db(self.__db.get_tag_values, tag,
+                                        get_default_storage_type(), filters)
+        name = self.__TAG_NAMES[tag]
+        for i in range(0, len(values), self.__BATCH_SIZE):
+            client.send(["%s: %s" % (name, value)
+                         for value in values[i:i + self.__BATCH_SIZE]])
+            await client.writer.drain()
+
+    async def _listall(self, client, args):
+        """
+            Send songs uri for path
+            @param client as MpdClient
+            @param args as [str]
+        """
+        album_ids = await self.__get_album_ids_for_path(args)
+        if album_ids is not None:
+            await self.__send_collection_songs(client, album_ids, [], False)
+
+    async def _listallinfo(self, client, args):
+        """
+            Send songs for path
+            @param client as MpdClient
+            @param args as [str]
+        """
+        album_ids = await self.__get_album_ids_for_path(args)
+        if album_ids is not None:
+            await self.__send_collection_songs(client, album_ids, [], True)
+
+    async def _listplaylist(self, client, args):
+        """
+            Send playlist uris
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        playlist_id = await self.__get_playlist_id(args[0])
+        uris = await self.__run_in_db(App().playlists.get_track_uris,
+                                      playlist_id)
+        client.send(["file: %s" % uri for uri in uris])
+
+    async def _listplaylistinfo(self, client, args):
+        """
+            Send playlist songs
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        playlist_id = await self.__get_playlist_id(args[0])
+        track_ids = await self.__run_in_db(App().playlists.get_track_ids,
+                                           playlist_id)
+        await self.__send_songs(client, track_ids, None)
+
+    async def _listplaylists(self, client, args):
+        """
+            Send stored playlists
+            @param client as MpdClient
+            @param args as [str]
+        """
+        playlists = await self.__run_in_db(App().playlists.get)
+        client.send(["playlist: %s" % name for (playlist_id, name)
+                     in playlists])
+
+    async def _load(self, client, args):
+        """
+            Load playlist into playback
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        playlist_id = await self.__get_playlist_id(args[0])
+        track_ids = await self.__run_in_db(App().playlists.get_track_ids,
+                                           playlist_id)
+        await self.__run_in_main(self.__add_tracks, track_ids)
+
+    async def _lsinfo(self, client, args):
+        """
+            Send path content, path is "artist/album"
+            @param client as MpdClient
+            @param args as [str]
+        """
+        path = args[0].strip("/") if args else ""
+        storage_type = get_default_storage_type()
+        if not path:
+            artists = await self.__run_in_db(self.__db.get_artists,
+                                             storage_type)
+            client.send(["directory: %s" % self.__escape(artist)
+                         for artist in artists])
+            playlists = await self.__run_in_db(App().playlists.get)
+            client.send(["playlist: %s" % name for (playlist_id, name)
+                         in playlists])
+        elif path.find("/") == -1:
+            artist = await self.__run_in_db(self.__get_artist_for_path,
+                                            path)
+            albums = await self.__run_in_db(self.__db.get_albums, artist,
+                                            storage_type)
+            client.send(["directory: %s/%s" % (path, self.__escape(name))
+                         for (album_id, name) in albums])
+        else:
+            album_ids = await self.__get_album_ids_for_path(args)
+            await self.__send_collection_songs(client, album_ids, [], True)
+
+    async def _next(self, client, args):
+        """
+            Play next song
+            @param client as MpdClient
+            @param args as [str]
+        """
+        await self.__run_in_main(App().player.next)
+
+    async def _noidle(self, client, args):
+        """
+            Do nothing, client is not idle
+            @param client as MpdClient
+            @param args as [str]
+        """
+        pass
+
+    async def _notcommands(self, client, args):
+        """
+            All commands are allowed
+            @param client as MpdClient
+            @param args as [str]
+        """
+        pass
+
+    async def _outputs(self, client, args):
+        """
+            Send outputs
+            @param client as MpdClient
+            @param args as [str]
+        """
+        client.send(["outputid: 0",
+                     "outputname: Lollypop",
+                     "plugin: gstreamer",
+                     "outputenabled: 1"])
+
+    async def _pause(self, client, args):
+        """
+            Pause or resume playback
+            @param client as MpdClient
+            @param args as [str]
+        """
+        def pause():
+            if not args:
+                App().player.play_pause()
+            elif args[0] == "1":
+                App().player.pause()
+            else:
+                App().player.play()
+        await self.__run_in_main(pause)
+
+    async def _ping(self, client, args):
+        """
+            Do nothing
+            @param client as MpdClient
+            @param args as [str]
+        """
+        pass
+
+    async def _play(self, client, args):
+        """
+            Play song at position
+            @param client as MpdClient
+            @param args as [str]
+        """
+        pos = self.__get_int(args[0]) if args else None
+
+        def play():
+            if pos is None or pos < 0:
+                App().player.play()
+            else:
+                (album, track) = self.__get_playback_item(pos)
+                App().player.load(track)
+        await self.__run_in_main(play)
+
+    async def _playid(self, client, args):
+        """
+            Play song with id
+            @param client as MpdClient
+            @param args as [str]
+        """
+        track_id = self.__get_int(args[0]) if args else None
+
+        def play():
+            if track_id is None:
+                App().player.play()
+            else:
+                playlist = self.__get_playlist()
+                if track_id not in playlist:
+                    raise MpdError(MpdError.NO_EXIST, "No such song")
+                (album, track) = self.__get_playback_item(
+                    playlist.index(track_id))
+                App().player.load(track)
+        await self.__run_in_main(play)
+
+    async def _playlistadd(self, client, args):
+        """
+            Add uri to stored playlist, create it if needed
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 2)
+        track_ids = await self.__run_in_db(self.__get_track_ids_for_uri,
+                                           args[1])
+        songs = await self.__get_songs(track_ids)
+        uris = [songs[track_id][1] for track_id in track_ids
+                if track_id in songs.keys()]
+
+        def add():
+            playlist_id = App().playlists.get_id(args[0])
+            if playlist_id is None:
+                playlist_id = App().playlists.add(args[0])
+            App().playlists.add_uris(playlist_id, uris, True)
+            App().playlists.sync_to_disk(playlist_id)
+        await self.__run_in_main(add)
+
+    async def _playlistclear(self, client, args):
+        """
+            Clear stored playlist
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        playlist_id = await self.__get_playlist_id(args[0])
+        await self.__run_in_main(App().playlists.clear, playlist_id)
+
+    async def _playlistid(self, client, args):
+        """
+            Send playback songs
+            @param client as MpdClient
+            @param args as [str]
+        """
+        playlist = await self.__run_in_main(self.__get_playlist)
+        if args:
+            track_id = self.__get_int(args[0])
+            if track_id not in playlist:
+                raise MpdError(MpdError.NO_EXIST, "No such song")
+            pos = playlist.index(track_id)
+            await self.__send_songs(client, [track_id], pos)
+        else:
+            await self.__send_songs(client, playlist, 0)
+
+    async def _playlistinfo(self, client, args):
+        """
+            Send playback songs
+            @param client as MpdClient
+            @param args as [str]
+        """
+        playlist = await self.__run_in_main(self.__get_playlist)
+        if args:
+            (start, end) = self.__get_range(args[0])
+            if start >= len(playlist):
+                raise MpdError(MpdError.ARG, "Bad song index")
+            await self.__send_songs(client, playlist[start:end], start)
+        else:
+            await self.__send_songs(client, playlist, 0)
+
+    async def _plchanges(self, client, args):
+        """
+            Send playback songs if changed since version
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        version = self.__get_int(args[0])
+        playlist = await self.__run_in_main(self.__get_playlist)
+        # We do not keep a playlist history, send everything
+        if version != self.__playlist_version:
+            await self.__send_songs(client, playlist, 0)
+
+    async def _plchangesposid(self, client, args):
+        """
+            Send playback positions if changed since version
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        version = self.__get_int(args[0])
+        playlist = await self.__run_in_main(self.__get_playlist)
+        if version != self.__playlist_version:
+            lines = []
+            for (pos, track_id) in enumerate(playlist):
+                lines += ["cpos: %s" % pos, "Id: %s" % track_id]
+            client.send(lines)
+
+    async def _previous(self, client, args):
+        """
+            Play previous song
+            @param client as MpdClient
+            @param args as [str]
+        """
+        await self.__run_in_main(App().player.prev)
+
+    async def _random(self, client, args):
+        """
+            Set shuffle
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        shuffle = args[0] == "1"
+        await self.__run_in_main(App().settings.set_value, "shuffle",
+                                 GLib.Variant("b", shuffle))
+
+    async def _repeat(self, client, args):
+        """
+            Set repeat
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        repeat = Repeat.ALL if args[0] == "1" else Repeat.NONE
+        await self.__run_in_main(App().settings.set_enum, "repeat", repeat)
+
+    async def _replay_gain_status(self, client, args):
+        """
+            Send replay gain status
+            @param client as MpdClient
+            @param args as [str]
+        """
+        client.send(["replay_gain_mode: off"])
+
+    async def _rescan(self, client, args):
+        """
+            Update collection
+            @param client as MpdClient
+            @param args as [str]
+        """
+        await self._update(client, args)
+
+    async def _rm(self, client, args):
+        """
+            Remove stored playlist
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        playlist_id = await self.__get_playlist_id(args[0])
+        await self.__run_in_main(App().playlists.remove, playlist_id)
+
+    async def _save(self, client, args):
+        """
+            Save playback as a stored playlist
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+
+        def save():
+            if App().playlists.get_id(args[0]) is not None:
+                raise MpdError(MpdError.SYSTEM, "Playlist already exists")
+            playlist_id = App().playlists.add(args[0])
+            tracks = [track for album in App().player.albums
+                      for track in album.tracks]
+            App().playlists.add_tracks(playlist_id, tracks, True)
+            App().playlists.sync_to_disk(playlist_id)
+        await self.__run_in_main(save)
+
+    async def _search(self, client, args):
+        """
+            Send songs matching filters, case insensitive
+            @param client as MpdClient
+            @param args as [str]
+        """
+        filters = self.__get_filters(args, False)
+        await self.__send_collection_songs(client, [], filters, True)
+
+    async def _searchadd(self, client, args):
+        """
+            Add songs matching filters to playback, case insensitive
+            @param client as MpdClient
+            @param args as [str]
+        """
+        filters = self.__get_filters(args, False)
+        track_ids = await self.__run_in_db(self.__db.get_track_ids,
+                                           get_default_storage_type(),
+                                           [], filters)
+        await self.__run_in_main(self.__add_tracks, track_ids)
+
+    async def _seek(self, client, args):
+        """
+            Seek song at position
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 2)
+        pos = self.__get_int(args[0])
+        position = self.__get_position(args[1])
+        await self.__run_in_main(self.__seek, pos, position)
+
+    async def _seekcur(self, client, args):
+        """
+            Seek current song, relative if starting with +/-
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        position = self.__get_position(args[0])
+
+        def seek():
+            if args[0][0] in ["+", "-"]:
+                App().player.seek(max(0, App().player.position + position))
+            else:
+                App().player.seek(position)
+        await self.__run_in_main(seek)
+
+    async def _seekid(self, client, args):
+        """
+            Seek song with id
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 2)
+        track_id = self.__get_int(args[0])
+        position = self.__get_position(args[1])
+
+        def seek():
+            playlist = self.__get_playlist()
+            if track_id not in playlist:
+                raise MpdError(MpdError.NO_EXIST, "No such song")
+            self.__seek(playlist.index(track_id), position)
+        await self.__run_in_main(seek)
+
+    async def _setvol(self, client, args):
+        """
+            Set volume
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+        volume = self.__get_int(args[0])
+        await self.__run_in_main(App().player.set_volume, volume / 100)
+
+    async def _single(self, client, args):
+        """
+            Set repeat track
+            @param client as MpdClient
+            @param args as [str]
+        """
+        self.__check_args(args, 1)
+
+        def single():
+            if args[0] == "1":
+                App().settings.set_enum("repeat", Repeat.TRACK)
+            elif App().settings.get_enum("repeat") == Repeat.TRACK:
+                App().settings.set_enum("repeat", Repeat.NONE)
+        await self.__run_in_main(single)
+
+    async def _stats(self, client, args):
+        """
+            Send collection statistics
+            @param client as MpdClient
+            @param args as [str]
+        """
+        (artists, albums, songs, duration) = await self.__run_in_db(
+            self.__db.get_stats, get_default_storage_type())
+        client.send(["artists: %s" % artists,
+                     "albums: %s" % albums,
+                     "songs: %s" % songs,
+                     "uptime: %s" % (int(time()) - self.__start_time),
+                     "playtime: 0",
+                     "db_playtime: %s" % (duration // 1000),
+                     "db_update: %s" % self.__start_time])
+
+    async def _status(self, client, args):
+        """
+            Send player status
+            @param client as MpdClient
+            @param args as [str]
+        """
+        lines = await self.__run_in_main(self.__get_status)
+        client.send(lines)
+
+    async def _stop(self, client, args):
+        """
+            Stop playback
+            @param client as MpdClient
+            @param args as [str]
+        """
+        await self.__run_in_main(App().player.stop)
+
+    async def _tagtypes(self, client, args):
+        """
+            Send supported tags
+            @param client as MpdClient
+            @param args as [str]
+        """
+        # Tags can't be disabled, accept subcommands
+        if not args:
+            client.send(["tagtype: %s" % name
+                         for name in self.__TAG_NAMES.values()
+                         if name != "file"])
+
+    async def _update(self, client, args):
+        """
+            Update collection
+            @param client as MpdClient
+            @param args as [str]
+        """
+        await self.__run_in_main(App().scanner.update, ScanType.NEW_FILES)
+        client.send(["updating_db: 1"])
+
+    async def _urlhandlers(self, client, args):
+        """
+            Only collection uris are handled
+            @param client as MpdClient
+            @param args as [str]
+        """
+        pass
+
+#######################
+# PRIVATE             #
+#######################
+    def __run(self):
+        """
+            Run asyncio loop
+        """
+        try:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            address = App().settings.get_value("mpd-address").get_string()
+            port = App().settings.get_value("mpd-port").get_int32()
+            self.__server = loop.run_until_complete(
+                asyncio.start_server(self.__on_client_connected,
+                                     address or None, port))
+            self.__loop = loop
+            Logger.info("MpdServer: listening on %s:%s", address, port)
+            loop.run_forever()
+            loop.run_until_complete(self.__server.wait_closed())
+            loop.close()
+        except Exception as e:
+            Logger.error("MpdServer::__run(): %s", e)
+        self.__executor.submit(SqlCursor.remove, App().db)
+        self.__executor.shutdown(False)
+
+    def __shutdown(self):
+        """
+            Close server and clients
+        """
+        self.__server.close()
+        for client in list(self.__clients):
+            client.writer.close()
+        self.__loop.stop()
+
+    async def __on_client_connected(self, reader, writer):
+        """
+            Handle client commands
+            @param reader as asyncio.StreamReader
+            @param writer as asyncio.StreamWriter
+        """
+        client = MpdClient(reader, writer)
+        self.__clients.add(client)
+        command_list = None
+        list_ok = False
+        try:
+            client.send(["OK MPD %s" % self.__VERSION])
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.decode("utf-8", "replace").strip()
+                if client.idle is not None:
+                    # Only noidle is allowed while idle
+                    if line != "noidle":
+                        break
+                    client.idle = None
+                    client.send(["OK"])
+                elif command_list is not None:
+                    if line == "command_list_end":
+                        if not await self.__execute(client, command_list,
+                                                    list_ok):
+                            break
+                        command_list = None
+                    else:
+                        command_list.append(line)
+                elif line in ["command_list_begin", "command_list_ok_begin"]:
+                    command_list = []
+                    list_ok = line == "command_list_ok_begin"
+                elif line == "noidle":
+                    continue
+                elif not await self.__execute(client, [line], False):
+                    break
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            Logger.error("MpdServer::__on_client_connected(): %s", e)
+        finally:
+            self.__clients.discard(client)
+            writer.close()
+
+    async def __execute(self, client, lines, list_ok):
+        """
+            Execute command list
+            @param client as MpdClient
+            @param lines as [str]
+            @param list_ok as bool
+            @return False if connection should be closed
+        """
+        for (index, line) in enumerate(lines):
+            command = ""
+            try:
+                args = self.__split(line)
+                if not args:
+                    raise MpdError(MpdError.UNKNOWN, "No command given")
+                command = args[0]
+                if command not in self.__COMMANDS:
+                    raise MpdError(MpdError.UNKNOWN,
+                                   "unknown command \"%s\"" % command)
+                elif command == "close":
+                    return False
+                elif command == "idle":
+                    self.__idle(client, args[1:])
+                    return True
+                await getattr(self, "_%s" % command)(client, args[1:])
+                if list_ok:
+                    client.send(["list_OK"])
+            except MpdError as e:
+                client.send(["ACK [%s@%s] {%s} %s" % (e.code, index,
+                                                      command, e.message)])
+                return True
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception as e:
+                Logger.error("MpdServer::__execute(): %s, %s", line, e)
+                client.send(["ACK [%s@%s] {%s} %s" % (MpdError.SYSTEM, index,
+                                                      command, e)])
+                return True
+        client.send(["OK"])
+        return True
+
+    def __idle(self, client, args):
+        """
+            Wait for subsystems changes
+            @param client as MpdClient
+            @param args as [str]
+        """
+        subsystems = set(args) & set(self.__SUBSYSTEMS)
+        client.idle = subsystems if subsystems else set(self.__SUBSYSTEMS)
+        self.__send_events(client)
+
+    def __send_events(self, client):
+        """
+            Send changed subsystems to client if idle
+            @param client as MpdClient
+        """
+        if client.idle is None:
+            return
+        changed = client.events & client.idle
+        if changed:
+            client.events -= changed
+            client.idle = None
+            client.send(["changed: %s" % subsystem
+                         for subsystem in sorted(changed)] + ["OK"])
+
+    def __add_event(self, subsystem):
+        """
+            Queue event, clients are woken up once per delay
+            @param subsystem as str
+        """
+        if subsystem == "database":
+            self.__songs = {}
+        self.__events.add(subsystem)
+        if self.__flush_handle is None:
+            self.__flush_handle = self.__loop.call_later(
+                self.__IDLE_DELAY, self.__flush_events)
+
+    def __flush_events(self):
+        """
+            Send queued events to clients
+        """
+        self.__flush_handle = None
+        events = self.__events
+        self.__events = set()
+        for client in self.__clients:
+            client.events |= events
+            self.__send_events(client)
+
+    def __notify(self, subsystem):
+        """
+            Notify clients about subsystem change
+            @param subsystem as str
+            @thread safe
+        """
+        if self.__loop is not None and self.__loop.is_running():
+            self.__loop.call_soon_threadsafe(self.__add_event, subsystem)
+
+    async def __run_in_main(self, function, *args):
+        """
+            Run function in main loop and wait for result
+            @param function as function
+            @param args as *
+            @return function result
+        """
+        future = self.__loop.create_future()
+
+        def set_result(result, exception):
+            if future.done():
+                return
+            elif exception is None:
+                future.set_result(result)
+            else:
+                future.set_exception(exception)
+
+        def run():
+            (result, exception) = (None, None)
+            try:
+                result = function(*args)
+            except Exception as e:
+                exception = e
+            self.__loop.call_soon_threadsafe(set_result, result, exception)
+        GLib.idle_add(run)
+        return await future
+
+    async def __run_in_db(self, function, *args):
+        """
+            Run function in DB thread and wait for result
+            @param function as function
+            @param args as *
+            @return function result
+        """
+        return await self.__loop.run_in_executor(self.__executor,
+                                                 function, *args)
+
+    async def __send_songs(self, client, track_ids, start):
+        """
+            Send songs by batch
+            @param client as MpdClient
+            @param track_ids as [int]
+            @param start as int/None: position of first song
+        """
+        for i in range(0, len(track_ids), self.__BATCH_SIZE):
+            batch = track_ids[i:i + self.__BATCH_SIZE]
+            songs = await self.__get_songs(batch)
+            lines = []
+            for (j, track_id) in enumerate(batch):
+                if track_id in songs.keys():
+                    pos = None if start is None else start + i + j
+                    lines += self.__get_song_lines(songs[track_id], pos)
+            client.send(lines)
+            await client.writer.drain()
+
+    async def __get_songs(self, track_ids):
+        """
+            Get songs for track ids, cached
+            @param track_ids as [int]
+            @return {int: row}
+        """
+        missing = [track_id for track_id in track_ids
+                   if track_id not in self.__songs.keys()]
+        if missing:
+            songs = await self.__run_in_db(self.__db.get_songs_for_ids,
+                                           missing)
+            if len(self.__songs) + len(songs) > self.__CACHE_SIZE:
+                self.__songs = {}
+            self.__songs.update(songs)
+        return {track_id: self.__songs[track_id] for track_id in track_ids
+                if track_id in self.__songs.keys()}
+
+    async def __send_collection_songs(self, client, album_ids, filters,
+                                      info):
+        """
+            Stream songs from DB by batch, DB is not locked while waiting
+            for client
+            @param client as MpdClient
+            @param album_ids as [int]
+            @param filters as [(str, str, bool)]
+            @param info as bool: send all tags
+        """
+        storage_type = get_default_storage_type()
+        after = None
+        while True:
+            (rows, after) = await self.__run_in_db(self.__db.get_songs,
+                                                   storage_type,
+                                                   self.__BATCH_SIZE,
+                                                   album_ids, filters,
+                                                   after)
+            lines = []
+            for row in rows:
+                if info:
+                    lines += self.__get_song_lines(row, None)
+                else:
+                    lines.append("file: %s" % row[1])
+            client.send(lines)
+            await client.writer.drain()
+            if after is None:
+                break
+
+    async def __get_album_ids_for_path(self, args):
+        """
+            Get album ids for path
+            @param args as [str]
+            @return [int]/None, empty list for the whole collection
+        """
+        path = args[0].strip("/") if args else ""
+        if not path:
+            return []
+        storage_type = get_default_storage_type()
+        split = path.split("/")
+        artist = await self.__run_in_db(self.__get_artist_for_path, split[0])
+        albums = await self.__run_in_db(self.__db.get_albums, artist,
+                                        storage_type)
+        if not albums:
+            raise MpdError(MpdError.NO_EXIST, "No such directory")
+        elif len(split) == 1:
+            return [album_id for (album_id, name) in albums]
+        for (album_id, name) in albums:
+            if self.__escape(name) == split[1]:
+                return [album_id]
+        raise MpdError(MpdError.NO_EXIST, "No such directory")
+
+    async def __get_playlist_id(self, name):
+        """
+            Get stored playlist id for name
+            @param name as str
+            @return int
+        """
+        playlist_id = await self.__run_in_db(App().playlists.get_id, name)
+        if playlist_id is None:
+            raise MpdError(MpdError.NO_EXIST, "No such playlist")
+        return playlist_id
+
+    def __get_artist_for_path(self, path):
+        """
+            Get artist name for path
+            @param path as str
+            @return str
+            @thread DB
+        """
+        for artist in self.__db.get_artists(get_default_storage_type()):
+            if self.__escape(artist) == path:
+                return artist
+        raise MpdError(MpdError.NO_EXIST, "No such directory")
+
+    def __get_track_ids_for_uri(self, uri):
+        """
+            Get track ids for song uri or directory
+            @param uri as str
+            @return [int]
+            @thread DB
+        """
+        storage_type = get_default_storage_type()
+        if uri.startswith("/"):
+            uri = GLib.filename_to_uri(uri)
+        if uri.find("://") != -1:
+            track_id = App().tracks.get_id_by_uri(uri)
+            if track_id is None:
+                raise MpdError(MpdError.NO_EXIST, "No such song")
+            return [track_id]
+        path = uri.strip("/")
+        album_ids = []
+        if path:
+            split = path.split("/")
+            artist = self.__get_artist_for_path(split[0])
+            for (album_id, name) in self.__db.get_albums(artist,
+                                                         storage_type):
+                if len(split) == 1 or self.__escape(name) == split[1]:
+                    album_ids.append(album_id)
+            if not album_ids:
+                raise MpdError(MpdError.NO_EXIST, "No such directory")
+        return self.__db.get_track_ids(storage_type, album_ids)
+
+    def __get_song_lines(self, row, pos):
+        """
+            Get protocol lines for song
+            @param row as MpdDatabase row
+            @param pos as int/None
+            @return [str]
+        """
+        (track_id, uri, name, duration, tracknumber, discnumber, year,
+         album, artists, album_artists, genres) = row
+        duration = (duration or 0) / 1000
+        lines = ["file: %s" % uri]
+        for artist in (artists or "").split(self.__db.SEPARATOR):
+            if artist:
+                lines.append("Artist: %s" % artist)
+        for artist in (album_artists or "").split(self.__db.SEPARATOR):
+            if artist:
+                lines.append("AlbumArtist: %s" % artist)
+        lines += ["Title: %s" % name, "Album: %s" % album]
+        for genre in (genres or "").split(self.__db.SEPARATOR):
+            if genre:
+                lines.append("Genre: %s" % genre)
+        if year is not None:
+            lines.append("Date: %s" % year)
+        if tracknumber:
+            lines.append("Track: %s" % tracknumber)
+        if discnumber:
+            lines.append("Disc: %s" % discnumber)
+        lines += ["Time: %s" % int(duration), "duration: %.3f" % duration]
+        if pos is not None:
+            lines += ["Pos: %s" % pos, "Id: %s" % track_id]
+        return lines
+
+    def __get_status(self):
+        """
+            Get player status lines
+            @return [str]
+            @thread main
+        """
+        player = App().player
+        playlist = self.__get_playlist()
+        status = player.get_status()
+        if status == Gst.State.PLAYING:
+            state = "play"
+        elif status == Gst.State.PAUSED:
+            state = "pause"
+        else:
+            state = "stop"
+        repeat = App().settings.get_enum("repeat")
+        shuffle = App().settings.get_value("shuffle") or player.is_party
+        lines = ["volume: %s" % int(player.volume * 100),
+                 "repeat: %s" % int(repeat in [Repeat.ALL, Repeat.TRACK]),
+                 "random: %s" % int(shuffle),
+                 "single: %s" % int(repeat == Repeat.TRACK),
+                 "consume: 0",
+                 "playlist: %s" % self.__playlist_version,
+                 "playlistlength: %s" % len(playlist),
+                 "state: %s" % state]
+        track_id = player.current_track.id
+        if state != "stop" and track_id in playlist:
+            elapsed = player.position / 1000
+            duration = player.current_track.duration / 1000
+            lines += ["song: %s" % playlist.index(track_id),
+                      "songid: %s" % track_id,
+                      "time: %s:%s" % (int(elapsed), int(duration)),
+                      "elapsed: %.3f" % elapsed,
+                      "duration: %.3f" % duration]
+        next_id = player.next_track.id
+        if next_id in playlist:
+            lines += ["nextsong: %s" % playlist.index(next_id),
+                      "nextsongid: %s" % next_id]
+        return lines
+
+    def __get_playlist(self):
+        """
+            Get playback track ids
+            @return [int]
+            @thread main
+        """
+        if self.__playlist is None:
+            self.__playlist = [track.id for album in App().player.albums
+                               for track in album.tracks]
+        return self.__playlist
+
+    def __get_playback_item(self, pos):
+        """
+            Get album and track at position in playback
+            @param pos as int
+            @return (Album, Track)
+            @thread main
+        """
+        for album in App().player.albums:
+            tracks = album.tracks
+            if pos < len(tracks):
+                return (album, tracks[pos])
+            pos -= len(tracks)
+        raise MpdError(MpdError.ARG, "Bad song index")
+
+    def __add_tracks(self, track_ids):
+        """
+            Add tracks to playback
+            @param track_ids as [int]
+            @thread main
+        """
+        if track_ids:
+            tracks = [Track(track_id) for track_id in track_ids]
+            App().player.add_albums(tracks_to_albums(tracks))
+
+    def __delete_tracks(self, start, end):
+        """
+            Remove tracks from playback
+            @param start as int
+            @param end as int/None
+            @thread main
+        """
+        items = [self.__get_playback_item(pos)
+                 for pos in range(start, end or start + 1)]
+        for (album, track) in reversed(items):
+            App().player.remove_track_from_album(track, album)
+
+    def __seek(self, pos, position):
+        """
+            Seek song at position
+            @param pos as int
+            @param position as int (ms)
+            @thread main
+        """
+        (album, track) = self.__get_playback_item(pos)
+        if track.id == App().player.current_track.id:
+            App().player.seek(position)
+        else:
+            App().player.load(track)
+            GLib.timeout_add(100, App().player.seek, position)
+
+    def __get_filters(self, args, exact):
+        """
+            Get filters from args
+            Handle old "tag value" syntax and simple expressions
+            @param args as [str]
+            @param exact as bool
+            @return [(str, str, bool)]
+        """
+        filters = []
+        tags = self.__db.get_tags() + ["any"]
+        # Ignore sort and window
+        for (i, arg) in enumerate(args):
+            if arg.lower() in ["sort", "window"]:
+                args = args[:i]
+                break
+        if len(args) == 1 and args[0].startswith("("):
+            expression = r"\(\s*(\w+)\s+(==|contains)\s+" +\
+                r"(?:'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\")\s*\)"
+            for match in re.finditer(expression, args[0]):
+                (tag, operator, single, double) = match.groups()
+                value = re.sub(r"\\(.)", r"\1", single or double or "")
+                if tag.lower() not in tags:
+                    raise MpdError(MpdError.ARG, "Unknown filter type")
+                filters.append((tag.lower(), value,
+                                exact and operator == "=="))
+            if not filters:
+                raise MpdError(MpdError.ARG, "Unsupported filter expression")
+        elif len(args) % 2 != 0:
+            raise MpdError(MpdError.ARG, "Incorrect arguments")
+        else:
+            for i in range(0, len(args), 2):
+                if args[i].lower() not in tags:
+                    raise MpdError(MpdError.ARG, "Unknown filter type")
+                filters.append((args[i].lower(), args[i + 1], exact))
+        return filters
+
+    def __get_range(self, arg):
+        """
+            Get range from "start:end" or "pos"
+            @param arg as str
+            @return (int, int/None)
+        """
+        if arg.find(":") == -1:
+            start = self.__get_int(arg)
+            return (start, start + 1)
+        (start, end) = arg.split(":", 1)
+        return (self.__get_int(start), self.__get_int(end) if end else None)
+
+    def __get_position(self, arg):
+        """
+            Get position in ms from seconds
+            @param arg as str
+            @return int
+        """
+        try:
+            return int(float(arg) * 1000)
+        except:
+            raise MpdError(MpdError.ARG, "Number expected: %s" % arg)
+
+    def __get_int(self, arg):
+        """
+            Get int from arg
+            @param arg as str
+            @return int
+        """
+        try:
+            return int(arg)
+        except:
+            raise MpdError(MpdError.ARG, "Integer expected: %s" % arg)
+
+    def __check_args(self, args, count):
+        """
+            Check args count
+            @param args as [str]
+            @param count as int
+        """
+        if len(args) < count:
+            raise MpdError(MpdError.ARG, "Wrong number of arguments")
+
+    def __split(self, line):
+        """
+            Split command line, handle quoted args
+            @param line as str
+            @return [str]
+        """
+        args = []
+        i = 0
+        while i < len(line):
+            if line[i].isspace():
+                i += 1
+            elif line[i] == "\"":
+                arg = ""
+                i += 1
+                while i < len(line) and line[i] != "\"":
+                    if line[i] == "\\" and i + 1 < len(line):
+                        i += 1
+                    arg += line[i]
+                    i += 1
+                if i >= len(line):
+                    raise MpdError(MpdError.ARG, "Missing closing '\"'")
+                args.append(arg)
+                i += 1
+            else:
+                start = i
+                while i < len(line) and not line[i].isspace():
+                    i += 1
+                args.append(line[start:i])
+        return args
+
+    def __escape(self, name):
+        """
+            Escape name for a path
+            @param name as str
+            @return str
+        """
+        return name.replace("/", "-")
+
+    def __connect_signals(self):
+        """
+            Connect player, playlists and settings signals
+            @thread main
+        """
+        for (obj, signal, subsystem) in [
+                (App().player, "current-changed", "player"),
+                (App().player, "status-changed", "player"),
+                (App().player, "seeked", "player"),
+                (App().player, "volume-changed", "mixer"),
+                (App().player, "playback-added", "playlist"),
+                (App().player, "playback-updated", "playlist"),
+                (App().player, "playback-setted", "playlist"),
+                (App().player, "playback-removed", "playlist"),
+                (App().playlists, "playlists-added", "stored_playlist"),
+                (App().playlists, "playlists-removed", "stored_playlist"),
+                (App().playlists, "playlists-renamed", "stored_playlist"),
+                (App().playlists, "playlists-updated", "stored_playlist"),
+                (App().playlists, "playlist-track-added", "stored_playlist"),
+                (App().playlists, "playlist-track-removed",
+                 "stored_playlist"),
+                (App().scanner, "scan-finished", "database"),
+                (App().settings, "changed::shuffle", "options"),
+                (App().settings, "changed::repeat", "options")]:
+            signal_id = obj.connect(signal, self.__on_signal, subsystem)
+            self.__signal_ids.append((obj, signal_id))
+
+    def __disconnect_signals(self):
+        """
+            Disconnect signals
+            @thread main
+        """
+        for (obj, signal_id) in self.__signal_ids:
+            obj.disconnect(signal_id)
+        self.__signal_ids = []
+
+    def __on_signal(self, *args):
+        """
+            Notify clients, last arg is subsystem
+            @param args as *
+        """
+        subsystem = args[-1]
+        if subsystem == "playlist":
+            self.__playlist = None
+            self.__playlist_version += 1
+        elif subsystem == "database":
+            self.__notify("update")
+        self.__notify(subsystem)
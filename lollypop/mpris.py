@@ -180,6 +180,9 @@ class MPRIS(Server):
             "o",
             "/org/mpris/MediaPlayer2/TrackList/NoTrack")}
         self.__track_id = self.__get_media_id(0)
+        self.__stopped = True
+        # Last emitted values, only changed ones are emitted
+        self.__properties = {}
         self.__bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
         Gio.bus_own_name_on_connection(self.__bus,
                                        self.__MPRIS_LOLLYPOP,
@@ -194,6 +197,9 @@ class MPRIS(Server):
         App().player.connect("rate-changed", self.__on_rate_changed)
         App().settings.connect("changed::shuffle", self.__on_shuffle_changed)
         App().settings.connect("changed::repeat", self.__on_repeat_changed)
+        # Player may have been restored before
+        if App().player.current_track.id is not None:
+            self.__on_current_changed(App().player)
 
     def Raise(self):
         self.__app.window.present_with_time(Gtk.get_current_event_time())
@@ -378,64 +384,75 @@ class MPRIS(Server):
             return "Stopped"
 
     def __update_metadata(self):
-        self.__metadata = {}
-        if App().player.current_track.id is None or\
-                self.__get_status() == "Stopped":
-            self.__metadata = {"mpris:trackid": GLib.Variant(
+        """
+            Update metadata snapshot for current track in background
+        """
+        track = App().player.current_track
+        stopped = track.id is None or self.__get_status() == "Stopped"
+        self.__stopped = stopped
+        App().task_helper.run(self.__get_metadata, track, self.__track_id,
+                              stopped,
+                              callback=(self.__on_metadata, self.__track_id))
+
+    def __get_metadata(self, track, track_id, stopped):
+        """
+            Get metadata for track
+            @param track as Track
+            @param track_id as GLib.Variant
+            @param stopped as bool
+            @return {str: GLib.Variant}
+            @thread safe
+        """
+        if stopped:
+            return {"mpris:trackid": GLib.Variant(
                 "o",
                 "/org/mpris/MediaPlayer2/TrackList/NoTrack")}
-        else:
-            self.__metadata["mpris:trackid"] = self.__track_id
-            track_number = App().player.current_track.number
-            if track_number is None:
-                track_number = 1
-            self.__metadata["xesam:trackNumber"] = GLib.Variant(
-                "i",
-                track_number)
-            self.__metadata["xesam:title"] = GLib.Variant(
-                "s",
-                App().player.current_track.name)
-            self.__metadata["xesam:album"] = GLib.Variant(
-                "s",
-                App().player.current_track.album.name)
-            self.__metadata["xesam:artist"] = GLib.Variant(
-                "as",
-                App().player.current_track.artists)
-            self.__metadata["xesam:albumArtist"] = GLib.Variant(
-                "as",
-                App().player.current_track.album_artists)
-            self.__metadata["mpris:length"] = GLib.Variant(
-                "x",
-                App().player.current_track.duration * 1000)
-            self.__metadata["xesam:genre"] = GLib.Variant(
-                "as",
-                App().player.current_track.genres)
-            self.__metadata["xesam:url"] = GLib.Variant(
-                "s",
-                App().player.current_track.uri)
-            self.__metadata["xesam:userRating"] = GLib.Variant(
-                "d",
-                App().player.current_track.rate / 5)
-            cover_path = App().album_art.get_cache_path(
-                    App().player.current_track.album,
-                    ArtSize.MPRIS, ArtSize.MPRIS)
-            if cover_path is not None:
-                self.__metadata["mpris:artUrl"] = GLib.Variant(
-                    "s",
-                    "file://" + cover_path)
+        metadata = {}
+        metadata["mpris:trackid"] = track_id
+        track_number = track.number
+        if track_number is None:
+            track_number = 1
+        metadata["xesam:trackNumber"] = GLib.Variant("i", track_number)
+        metadata["xesam:title"] = GLib.Variant("s", track.name)
+        metadata["xesam:album"] = GLib.Variant("s", track.album.name)
+        metadata["xesam:artist"] = GLib.Variant("as", track.artists)
+        metadata["xesam:albumArtist"] = GLib.Variant("as",
+                                                     track.album_artists)
+        metadata["mpris:length"] = GLib.Variant("x", track.duration * 1000)
+        metadata["xesam:genre"] = GLib.Variant("as", track.genres)
+        metadata["xesam:url"] = GLib.Variant("s", track.uri)
+        metadata["xesam:userRating"] = GLib.Variant("d", track.rate / 5)
+        cover_path = App().album_art.get_cache_path(track.album,
+                                                    ArtSize.MPRIS,
+                                                    ArtSize.MPRIS)
+        if cover_path is not None:
+            metadata["mpris:artUrl"] = GLib.Variant("s",
+                                                    "file://" + cover_path)
+        return metadata
+
+    def __properties_changed(self, properties):
+        """
+            Emit PropertiesChanged for properties with a new value
+            @param properties as {str: GLib.Variant}
+        """
+        changed = {}
+        for (key, value) in properties.items():
+            if self.__properties.get(key, None) != value:
+                self.__properties[key] = value
+                changed[key] = value
+        if changed:
+            self.PropertiesChanged(self.__MPRIS_PLAYER_IFACE, changed, [])
 
     def __on_seeked(self, player, position):
         self.Seeked(position * 1000)
 
     def __on_volume_changed(self, player, data=None):
-        self.PropertiesChanged(self.__MPRIS_PLAYER_IFACE,
-                               {"Volume": GLib.Variant("d",
-                                                       App().player.volume), },
-                               [])
+        self.__properties_changed(
+            {"Volume": GLib.Variant("d", App().player.volume)})
 
     def __on_shuffle_changed(self, settings, value):
         properties = {"Shuffle": App().settings.get_value("shuffle")}
-        self.PropertiesChanged(self.__MPRIS_PLAYER_IFACE, properties, [])
+        self.__properties_changed(properties)
 
     def __on_repeat_changed(self, settings, value):
         repeat = App().settings.get_enum("repeat")
@@ -446,15 +463,18 @@ class MPRIS(Server):
         else:
             value = "None"
         properties = {"LoopStatus": GLib.Variant("s", value)}
-        self.PropertiesChanged(self.__MPRIS_PLAYER_IFACE, properties, [])
+        self.__properties_changed(properties)
 
     def __on_rate_changed(self, player, rated_track_id, rating):
         # We only care about the current Track's rating.
-        if rated_track_id == self.__lollypop_id:
+        if rated_track_id == self.__lollypop_id and\
+                "xesam:userRating" in self.__metadata.keys():
             self.__rating = rating
-            self.__update_metadata()
-            properties = {"Metadata": GLib.Variant("a{sv}", self.__metadata)}
-            self.PropertiesChanged(self.__MPRIS_PLAYER_IFACE, properties, [])
+            self.__metadata = dict(self.__metadata)
+            self.__metadata["xesam:userRating"] = GLib.Variant("d",
+                                                               rating / 5)
+            self.__properties_changed(
+                {"Metadata": GLib.Variant("a{sv}", self.__metadata)})
 
     def __on_current_changed(self, player):
         if App().player.current_track.id is None:
@@ -465,16 +485,32 @@ class MPRIS(Server):
         self.__track_id = self.__get_media_id(self.__lollypop_id)
         self.__rating = None
         self.__update_metadata()
+
+    def __on_metadata(self, metadata, track_id):
+        """
+            Set metadata snapshot and notify
+            @param metadata as {str: GLib.Variant}
+            @param track_id as GLib.Variant
+        """
+        # Track changed while loading
+        if track_id is not self.__track_id:
+            return
+        self.__metadata = metadata
         properties = {"Metadata": GLib.Variant("a{sv}", self.__metadata),
                       "CanPlay": GLib.Variant("b", True),
                       "CanPause": GLib.Variant("b", True),
                       "CanGoNext": GLib.Variant("b", True),
                       "CanGoPrevious": GLib.Variant("b", True)}
         try:
-            self.PropertiesChanged(self.__MPRIS_PLAYER_IFACE, properties, [])
+            self.__properties_changed(properties)
         except Exception as e:
-            Logger.error("MPRIS::__on_current_changed(): %s" % e)
+            Logger.error("MPRIS::__on_metadata(): %s" % e)
 
     def __on_status_changed(self, data=None):
-        properties = {"PlaybackStatus": GLib.Variant("s", self.__get_status())}
-        self.PropertiesChanged(self.__MPRIS_PLAYER_IFACE, properties, [])
+        status = self.__get_status()
+        # Metadata is empty while stopped
+        if self.__stopped != (status == "Stopped" or
+                              App().player.current_track.id is None):
+            self.__update_metadata()
+        properties = {"PlaybackStatus": GLib.Variant("s", status)}
+        self.__properties_changed(properties)
@@ -84,8 +84,9 @@ class Base:
             best_popularity = self.db.get_higher_popularity()
             if new_rate == 5:
                 popularity = (popularity + best_popularity) / 2
-            self.db.set_popularity(self.id, popularity)
-            self.reset("popularity")
+            App().stats_helper.set_value(self.db, self.id,
+                                         "popularity", popularity)
+            self._popularity = popularity
         except Exception as e:
             Logger.error("Base::set_popularity(): %s" % e)
 
@@ -94,6 +95,6 @@ class Base:
             Set rate
             @param rate as int between -1 and 5
         """
-        self.db.set_rate(self.id, rate)
-        self.reset("rate")
+        App().stats_helper.set_value(self.db, self.id, "rate", rate)
+        self._rate = rate
         emit_signal(App().player, "rate-changed", self.id, rate)
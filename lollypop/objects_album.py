@@ -11,8 +11,6 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from hashlib import md5
-
 from lollypop.define import App, StorageType, ScanUpdate, Type
 from lollypop.objects_track import Track
 from lollypop.objects import Base
@@ -266,7 +264,7 @@ class Album(Base):
             @param loved as bool
         """
         if self.id >= 0:
-            self.db.set_loved(self.id, loved)
+            App().stats_helper.set_value(self.db, self.id, "loved", loved)
             self.loved = loved
 
     def set_uri(self, uri):
@@ -378,6 +376,22 @@ class Album(Base):
         disc.set_tracks(tracks)
         self.__discs = [disc]
 
+    @property
+    def skipped(self):
+        """
+            True if skipped tracks are allowed
+            @return bool
+        """
+        return self.__skipped
+
+    @property
+    def loaded_tracks(self):
+        """
+            Get tracks without loading them from DB
+            @return [Track]
+        """
+        return self.__tracks
+
     @property
     def original_year(self):
         """
@@ -503,33 +517,19 @@ class Album(Base):
     @property
     def duration(self):
         """
-            Get album duration and handle caching
+            Get album duration
             @return int
         """
         if self.__tracks:
-            track_ids = [track.lp_track_id for track in self.tracks]
-            track_str = "%s" % sorted(track_ids)
-            track_hash = md5(track_str.encode("utf-8")).hexdigest()
-            album_hash = "%s-%s-%s" % (
-                self.lp_album_id, track_hash, self.__disc_number)
-        else:
-            album_hash = "%s-%s-%s-%s" % (self.lp_album_id,
-                                          self.genre_ids,
-                                          self.artist_ids,
-                                          self.__disc_number)
-        duration = App().cache.get_duration(album_hash)
-        if duration is None:
-            if self.__tracks:
-                duration = 0
-                for track in self.__tracks:
-                    duration += track.duration
-            else:
-                duration = self.db.get_duration(self.id,
-                                                self.genre_ids,
-                                                self.artist_ids,
-                                                self.__disc_number)
-            App().cache.set_duration(self.id, album_hash, duration)
-        return duration
+            track_ids = [track.id for track in self.__tracks
+                         if track.id is not None and track.id >= 0]
+            if len(track_ids) == len(self.__tracks):
+                return App().tracks.get_tracks_duration(track_ids)
+            return sum(track.duration for track in self.__tracks)
+        return self.db.get_duration(self.id,
+                                    self.genre_ids,
+                                    self.artist_ids,
+                                    self.__disc_number)
 
 #######################
 # PRIVATE             #
@@ -111,7 +111,7 @@ class Track(Base):
             @param loved as bool
         """
         if self.id >= 0:
-            App().tracks.set_loved(self.id, loved)
+            App().stats_helper.set_value(self.db, self.id, "loved", loved)
             self.loved = loved
 
     def get_featuring_artist_ids(self, album_artist_ids):
@@ -12,7 +12,6 @@
 
 from gi.repository import GLib, GObject
 
-from pickle import load
 from time import time
 
 from lollypop.player_albums import AlbumsPlayer
@@ -25,7 +24,8 @@ from lollypop.player_shuffle import ShufflePlayer
 from lollypop.player_transitions import TransitionsPlayer
 from lollypop.logger import Logger
 from lollypop.objects_track import Track
-from lollypop.define import App, Type, LOLLYPOP_DATA_PATH
+from lollypop.player_state import PlayerState
+from lollypop.define import App, Type
 from lollypop.utils import emit_signal
 
 
@@ -131,40 +131,45 @@ class Player(GObject.GObject, AlbumsPlayer, BinPlayer, AutoRandomPlayer,
     def restore_state(self):
         """
             Restore player state
+            Only current album is loaded, others are loaded in background
         """
         try:
-            if App().settings.get_value("save-state"):
-                self._current_track = Track(
-                    load(open(LOLLYPOP_DATA_PATH + "/track_id.bin", "rb")))
-                self.set_queue(load(open(LOLLYPOP_DATA_PATH +
-                                         "/queue.bin", "rb")))
-                albums = load(open(LOLLYPOP_DATA_PATH + "/Albums.bin", "rb"))
-                (is_playing, was_party) = load(open(LOLLYPOP_DATA_PATH +
-                                                    "/player.bin", "rb"))
-                if self._current_track.uri:
-                    if albums:
-                        if was_party:
-                            # Tips: prevents player from loading albums
-                            self._is_party = True
-                            App().lookup_action("party").change_state(
-                                GLib.Variant("b", True))
-                        self.set_albums(albums)
-                        # Load track from player albums
-                        index = self.album_ids.index(
-                            self._current_track.album.id)
-                        for track in self._albums[index].tracks:
-                            if track.id == self._current_track.id:
-                                self._load_track(track)
-                                break
-                    if is_playing:
-                        self.play()
-                    else:
-                        self.pause()
-                    position = load(open(LOLLYPOP_DATA_PATH + "/position.bin",
-                                    "rb"))
-                    self.seek(position)
+            state = PlayerState()
+            if not App().settings.get_value("save-state") or\
+                    not state.load() or state.track_id is None:
+                return
+            self._current_track = Track(state.track_id)
+            self.set_queue(state.queue)
+            if not self._current_track.uri:
+                Logger.debug("Player::restore_state(): track missing")
+                return
+            album_ids = state.album_ids
+            if self._current_track.album.id in album_ids:
+                if state.is_party:
+                    # Tips: prevents player from loading albums
+                    self._is_party = True
+                    App().lookup_action("party").change_state(
+                        GLib.Variant("b", True))
+                index = album_ids.index(self._current_track.album.id)
+                album = state.get_album(index)
+                self._albums = [album]
+                # Load track from player albums
+                for track in album.tracks:
+                    if track.id == self._current_track.id:
+                        self._load_track(track)
+                        break
+                if len(album_ids) > 1:
+                    App().task_helper.run(state.get_albums,
+                                          callback=(self.__on_albums_restored,
+                                                    state, index, album))
                 else:
-                    Logger.debug("Player::restore_state(): track missing")
+                    self.set_albums([album])
+                    self.set_shuffle_played(state.shuffle_played)
+            if state.is_playing:
+                self.play()
+            else:
+                self.pause()
+            self.seek(state.position)
         except Exception as e:
             Logger.error("Player::restore_state(): %s" % e)
 
@@ -271,9 +276,6 @@ class Player(GObject.GObject, AlbumsPlayer, BinPlayer, AutoRandomPlayer,
         if played >= track.duration / 2000 or played >= 240:
             self.__scrobble(track, self._start_time)
             if track.id >= 0:
-                App().tracks.set_listened_at(track.id, int(time()))
-                # Increment popularity
-                App().tracks.set_more_popular(track.id)
                 # In party mode, linear popularity
                 if self.is_party:
                     pop_to_add = 1
@@ -281,7 +283,11 @@ class Player(GObject.GObject, AlbumsPlayer, BinPlayer, AutoRandomPlayer,
                 else:
                     count = track.album.tracks_count
                     pop_to_add = int(App().albums.max_count / count)
-                App().albums.set_more_popular(track.album_id, pop_to_add)
+                # Increment popularity, written in background
+                App().stats_helper.add_play(track.id, track.album_id,
+                                            pop_to_add, int(time()))
+                App().colistening.add_play(track.artist_ids, track.album_id,
+                                           int(time()))
 
     def _on_stream_start(self, bus, message):
         """
@@ -309,3 +315,17 @@ class Player(GObject.GObject, AlbumsPlayer, BinPlayer, AutoRandomPlayer,
             return
         for scrobbler in App().ws_director.scrobblers:
             scrobbler.listen(track, int(finished_start_time))
+
+    def __on_albums_restored(self, albums, state, index, album):
+        """
+            Set restored albums if playback did not change
+            @param albums as [Album]
+            @param state as PlayerState
+            @param index as int
+            @param album as Album: already restored album
+        """
+        if self._albums != [album]:
+            return
+        albums[index] = album
+        self.set_albums(albums)
+        self.set_shuffle_played(state.shuffle_played)
@@ -56,12 +56,28 @@ class AutoSimilarPlayer:
             Play a radio from collection for artist ids
             @param artist_ids as [int]
         """
-        genre_ids = App().artists.get_genre_ids(artist_ids,
-                                                StorageType.COLLECTION)
-        track_ids = App().tracks.get_randoms(genre_ids,
-                                             StorageType.COLLECTION,
-                                             False,
-                                             100)
+        # Prefer artists learned from web services
+        artist_names = [App().artists.get_name(artist_id)
+                        for artist_id in artist_ids]
+        similar_artist_ids = []
+        for (artist, cover_uri) in App().similars.get(artist_names):
+            similar_artist_id = App().artists.get_id_for_escaped_string(
+                sql_escape(artist.lower()))
+            if similar_artist_id is not None:
+                similar_artist_ids.append(similar_artist_id)
+        track_ids = []
+        if similar_artist_ids:
+            track_ids = App().tracks.get_populars(
+                artist_ids + similar_artist_ids,
+                StorageType.COLLECTION, False, 100)
+            shuffle(track_ids)
+        if not track_ids:
+            genre_ids = App().artists.get_genre_ids(artist_ids,
+                                                    StorageType.COLLECTION)
+            track_ids = App().tracks.get_randoms(genre_ids,
+                                                 StorageType.COLLECTION,
+                                                 False,
+                                                 100)
         albums = tracks_to_albums(
             [Track(track_id) for track_id in track_ids], False)
         self.play_albums(albums)
@@ -222,7 +238,7 @@ class AutoSimilarPlayer:
             similars = LocalSimilars()
             App().task_helper.run(
                 similars.get_similar_artists,
-                App().player.current_track.artist_ids,
+                App().player.current_track.artists,
                 self.__next_cancellable,
                 callback=(self.__on_get_local_similar_artists,))
 
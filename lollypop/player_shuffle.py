@@ -121,6 +121,21 @@ class ShufflePlayer:
             self._albums.append(album)
         emit_signal(self, "playback-setted", list(self._albums))
 
+    def set_shuffle_played(self, played):
+        """
+            Set tracks already played in shuffle mode
+            @param played as {int: [int]}: {album id: track ids}
+        """
+        self.__already_played_tracks = played
+
+    @property
+    def shuffle_played(self):
+        """
+            Get tracks already played in shuffle mode
+            @return {int: [int]}: {album id: track ids}
+        """
+        return self.__already_played_tracks
+
     @property
     def is_party(self):
         """
@@ -0,0 +1,219 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib, Gio
+
+from array import array
+from struct import pack, unpack, calcsize
+
+from lollypop.define import LOLLYPOP_DATA_PATH, StorageType
+from lollypop.objects_album import Album
+from lollypop.objects_track import Track
+from lollypop.logger import Logger
+
+
+class PlayerState:
+    """
+        Saved player state, only ids are stored
+        Albums and tracks are materialized on demand
+    """
+
+    __PATH = "%s/player_state.bin" % LOLLYPOP_DATA_PATH
+    # Pickled state of previous versions
+    __LEGACY_FILES = ["Albums.bin", "track_id.bin", "player.bin",
+                      "queue.bin", "position.bin"]
+    # magic, version, track id, is playing, is party, position,
+    # albums count, queue count, shuffle albums count
+    __HEADER = "<4sIi??qIII"
+    __MAGIC = b"LPPS"
+    __VERSION = 1
+
+    def __init__(self):
+        """
+            Init empty state
+        """
+        self.track_id = None
+        self.is_playing = False
+        self.is_party = False
+        self.position = 0
+        self.queue = []
+        # {album id: [track ids]}
+        self.shuffle_played = {}
+        # [(album id, genre ids, artist ids, skipped, track ids)]
+        self.__albums = []
+
+    def save(self, player):
+        """
+            Save player state to disk, atomically
+            @param player as Player
+        """
+        track = player.current_track
+        self.__albums = []
+        if track.id is None or track.storage_type & StorageType.EPHEMERAL:
+            self.track_id = None
+            self.shuffle_played = {}
+        else:
+            self.track_id = track.id
+            for album in player.albums:
+                if album.id is None:
+                    continue
+                # Not loaded tracks will be loaded from DB again
+                track_ids = [t.id for t in album.loaded_tracks]
+                self.__albums.append((album.id, album.genre_ids,
+                                      album.artist_ids, album.skipped,
+                                      track_ids))
+            self.shuffle_played = {
+                album_id: track_ids
+                for (album_id, track_ids) in player.shuffle_played.items()
+                if album_id is not None}
+        self.is_playing = player.is_playing
+        self.is_party = player.is_party
+        self.queue = player.queue
+        self.position = int(player.position) if track.id is not None else 0
+        try:
+            tmp_path = self.__PATH + ".tmp"
+            with open(tmp_path, "wb") as f:
+                self.__write(f)
+            GLib.rename(tmp_path, self.__PATH)
+            self.__remove_legacy_files()
+        except Exception as e:
+            Logger.error("PlayerState::save(): %s", e)
+
+    def load(self):
+        """
+            Load player state from disk
+            @return True if loaded
+        """
+        try:
+            if GLib.file_test(self.__PATH, GLib.FileTest.EXISTS):
+                with open(self.__PATH, "rb") as f:
+                    self.__read(f)
+                return True
+        except Exception as e:
+            Logger.error("PlayerState::load(): %s", e)
+        return False
+
+    def get_album(self, index):
+        """
+            Materialize album at index
+            @param index as int
+            @return Album
+        """
+        (album_id, genre_ids, artist_ids,
+         skipped, track_ids) = self.__albums[index]
+        album = Album(album_id, genre_ids, artist_ids, skipped)
+        if track_ids:
+            album.set_tracks([Track(track_id, album)
+                              for track_id in track_ids], False)
+        return album
+
+    def get_albums(self):
+        """
+            Materialize all albums
+            @return [Album]
+            @thread safe
+        """
+        return [self.get_album(i) for i in range(len(self.__albums))]
+
+    @property
+    def album_ids(self):
+        """
+            Get saved album ids
+            @return [int]
+        """
+        return [album[0] for album in self.__albums]
+
+#######################
+# PRIVATE             #
+#######################
+    def __write(self, f):
+        """
+            Write state to file
+            @param f as file
+        """
+        f.write(pack(self.__HEADER, self.__MAGIC, self.__VERSION,
+                     -1 if self.track_id is None else self.track_id,
+                     self.is_playing, self.is_party, self.position,
+                     len(self.__albums), len(self.queue),
+                     len(self.shuffle_played)))
+        album_ids = array("i")
+        skipped = array("B")
+        counts = (array("I"), array("I"), array("I"))
+        ids = (array("i"), array("i"), array("i"))
+        for album in self.__albums:
+            album_ids.append(album[0])
+            skipped.append(album[3])
+            for (i, values) in enumerate(
+                    [album[1], album[2], album[4]]):
+                counts[i].append(len(values))
+                ids[i].extend(values)
+        played_album_ids = array("i", self.shuffle_played.keys())
+        played_counts = array("I", [len(v) for v in
+                                    self.shuffle_played.values()])
+        played_ids = array("i")
+        for track_ids in self.shuffle_played.values():
+            played_ids.extend(track_ids)
+        for a in [album_ids, skipped, *counts, *ids, array("i", self.queue),
+                  played_album_ids, played_counts, played_ids]:
+            a.tofile(f)
+
+    def __read(self, f):
+        """
+            Read state from file
+            @param f as file
+            @raise Exception if file is invalid
+        """
+        header = f.read(calcsize(self.__HEADER))
+        (magic, version, track_id, self.is_playing, self.is_party,
+         self.position, albums_count, queue_count,
+         played_count) = unpack(self.__HEADER, header)
+        if magic != self.__MAGIC or version != self.__VERSION:
+            raise Exception("Invalid state version")
+        self.track_id = None if track_id == -1 else track_id
+
+        def read_array(typecode, count):
+            a = array(typecode)
+            a.fromfile(f, count)
+            return a
+
+        album_ids = read_array("i", albums_count)
+        skipped = read_array("B", albums_count)
+        counts = [read_array("I", albums_count) for i in range(3)]
+        ids = [iter(read_array("i", sum(c))) for c in counts]
+        self.__albums = []
+        for (index, album_id) in enumerate(album_ids):
+            (genre_ids, artist_ids, track_ids) = [
+                [next(ids[i]) for j in range(counts[i][index])]
+                for i in range(3)]
+            self.__albums.append((album_id, genre_ids, artist_ids,
+                                  bool(skipped[index]), track_ids))
+        self.queue = read_array("i", queue_count).tolist()
+        played_album_ids = read_array("i", played_count)
+        played_counts = read_array("I", played_count)
+        played_ids = iter(read_array("i", sum(played_counts)))
+        self.shuffle_played = {}
+        for (album_id, count) in zip(played_album_ids, played_counts):
+            self.shuffle_played[album_id] = [next(played_ids)
+                                             for i in range(count)]
+
+    def __remove_legacy_files(self):
+        """
+            Remove pickled state of previous versions
+        """
+        for name in self.__LEGACY_FILES:
+            try:
+                f = Gio.File.new_for_path("%s/%s" % (LOLLYPOP_DATA_PATH,
+                                                     name))
+                if f.query_exists():
+                    f.delete(None)
+            except Exception as e:
+                Logger.error("PlayerState::__remove_legacy_files(): %s", e)
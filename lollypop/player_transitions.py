@@ -10,27 +10,45 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gst, GLib, GstAudio
-
-from time import sleep
+from gi.repository import Gst, GLib, GstAudio, GstController
 
 from lollypop.define import App
+from lollypop.logger import Logger
 
 
 class TransitionsPlayer:
     """
         Handle track transitions
+        Fades are volume control points on stream time, interpolated by
+        the volume element itself. A single timeout starts the crossfade,
+        it is scheduled again on status, track and position changes.
     """
     __PADDING = 250
+    # Allowed timeout drift before scheduling again
+    __TOLERANCE = 100
 
     def __init__(self):
         """
             Init playbin
         """
-        self.__crossfading_id = None
-        self.__crossfade_up = False
-        self.__crossfade_down = False
+        self.__crossfading = False
+        self.__crossfade_id = None
+        self.__fade_out_id = None
+        self.__fading_playbin = None
+        # {PluginsPlayer: (volume element, control binding)}
+        self.__bindings = {}
+        self.__transition_duration = 0
         self.update_crossfading()
+        for key in ["transitions", "transitions-party-only",
+                    "transitions-duration"]:
+            App().settings.connect("changed::%s" % key,
+                                   lambda x, y: self.update_crossfading())
+        for signal in ["status-changed", "current-changed", "seeked"]:
+            self.connect(signal, self.__schedule_crossfade)
+        # Position is only reliable once seeks/state changes are done
+        for playbin in [self._playbin1, self._playbin2]:
+            playbin.get_bus().connect("message::async-done",
+                                      self.__schedule_crossfade)
 
     def load(self, track):
         """
@@ -41,9 +59,7 @@ class TransitionsPlayer:
         if self.crossfading and\
            self._current_track.id is not None and\
            self.is_playing:
-            transition_duration = App().settings.get_value(
-                    "transitions-duration").get_int32()
-            self.__do_crossfade(transition_duration, track)
+            self.__do_crossfade(self.__transition_duration, track)
             return True
         return False
 
@@ -52,15 +68,8 @@ class TransitionsPlayer:
             Set crossfading on/off
             @param status as bool
         """
-        if status and self.__crossfading_id is None:
-            transition_duration = App().settings.get_value(
-                "transitions-duration").get_int32()
-            timemout = min(transition_duration, 500)
-            self.__crossfading_id = GLib.timeout_add(
-                timemout, self.__check_for_crossfading)
-        elif not status and self.__crossfading_id is not None:
-            GLib.source_remove(self.__crossfading_id)
-            self.__crossfading_id = None
+        self.__crossfading = status
+        self.__schedule_crossfade()
 
     def update_crossfading(self):
         """
@@ -68,6 +77,8 @@ class TransitionsPlayer:
         """
         transitions = App().settings.get_value("transitions")
         party_only = App().settings.get_value("transitions-party-only")
+        self.__transition_duration = App().settings.get_value(
+            "transitions-duration").get_int32()
         self.set_crossfading((transitions and not party_only) or
                              (transitions and party_only and self.is_party))
 
@@ -77,58 +88,72 @@ class TransitionsPlayer:
             True if crossfading is on
             @return bool
         """
-        return self.__crossfading_id is not None
+        return self.__crossfading
 
 #######################
 # PRIVATE             #
 #######################
-    def __check_for_crossfading(self):
+    def __schedule_crossfade(self, *ignore):
         """
-            Check if we need to do crossfading
+            Start crossfade timeout for current track
         """
-        if self._current_track.duration > 0:
-            remaining = self.remaining
-            transition_duration = App().settings.get_value(
-                    "transitions-duration").get_int32()
-            if remaining < transition_duration + self.__PADDING:
-                self.__do_crossfade(transition_duration,
-                                    self._next_track)
-        return True
+        if self.__crossfade_id is not None:
+            GLib.source_remove(self.__crossfade_id)
+            self.__crossfade_id = None
+        if not self.__crossfading or\
+                self._current_track.id is None or\
+                self._current_track.duration <= 0 or\
+                not self.is_playing:
+            return
+        delay = self.remaining - self.__transition_duration - self.__PADDING
+        self.__crossfade_id = GLib.timeout_add(max(0, delay),
+                                               self.__on_crossfade_timeout)
 
-    def __volume_up(self, playbin, plugins, duration):
+    def __set_fade(self, plugins, start, end, start_volume, end_volume):
         """
-            Make volume going up smoothly
-            @param playbin as Gst.Bin
+            Fade plugins volume between stream times
+            @param plugins as PluginsPlayer
+            @param start as int (ns)
+            @param end as int (ns)
+            @param start_volume as float
+            @param end_volume as float
+        """
+        self.__remove_fade(plugins)
+        try:
+            source = GstController.InterpolationControlSource.new()
+            source.props.mode = GstController.InterpolationMode.LINEAR
+            source.set(0, start_volume)
+            source.set(start, start_volume)
+            source.set(end, end_volume)
+            binding = GstController.DirectControlBinding.new_absolute(
+                plugins.volume, "volume", source)
+            plugins.volume.add_control_binding(binding)
+            self.__bindings[plugins] = (plugins.volume, binding)
+        except Exception as e:
+            Logger.error("TransitionsPlayer::__set_fade(): %s", e)
+
+    def __remove_fade(self, plugins):
+        """
+            Remove fade from plugins volume
             @param plugins as PluginsPlayer
-            @param duration as int
         """
-        plugins.volume.props.volume = 0.0
-        self.__crossfade_up = True
-        # We add padding because user will not hear track around 0.2
-        sleep_ms = (duration + self.__PADDING) / 10
-        while plugins.volume.props.volume < 1.0:
-            vol = round(plugins.volume.props.volume + 0.1, 1)
-            plugins.volume.props.volume = vol
-            sleep(sleep_ms / 1000)
-        self.__crossfade_up = False
+        if plugins in self.__bindings.keys():
+            (volume, binding) = self.__bindings.pop(plugins)
+            volume.remove_control_binding(binding)
+        plugins.volume.props.volume = 1.0
 
-    def __volume_down(self, playbin, plugins, duration):
+    def __stop_fading_out(self):
         """
-            Make volume going down smoothly
-            @param playbin as Gst.Bin
-            @param plugins as PluginsPlayer
-            @param duration as int
+            Stop playbin fading out, if any
         """
-        plugins.volume.props.volume = 1.0
-        self.__crossfade_down = True
-        # We add padding because user will not hear track around 0.2
-        sleep_ms = (duration + self.__PADDING) / 10
-        while plugins.volume.props.volume > 0:
-            vol = round(plugins.volume.props.volume - 0.1, 1)
-            plugins.volume.props.volume = vol
-            sleep(sleep_ms / 1000)
-        playbin.set_state(Gst.State.NULL)
-        self.__crossfade_down = False
+        if self.__fade_out_id is not None:
+            GLib.source_remove(self.__fade_out_id)
+            self.__fade_out_id = None
+        if self.__fading_playbin is not None:
+            (playbin, plugins) = self.__fading_playbin
+            self.__fading_playbin = None
+            playbin.set_state(Gst.State.NULL)
+            self.__remove_fade(plugins)
 
     def __do_crossfade(self, duration, track):
         """
@@ -141,15 +166,16 @@ class TransitionsPlayer:
         if track.id is None:
             return
 
-        # If some crossfade already running, just switch to track
-        if self.__crossfade_up or self.__crossfade_down:
-            self._playbin.set_state(Gst.State.NULL)
-            if self._load_track(track):
-                self.play()
-            return
-
-        App().task_helper.run(self.__volume_down, self._playbin,
-                              self._plugins, duration)
+        # If some crossfade already running, stop previous track now
+        self.__stop_fading_out()
+        # We add padding because user will not hear track around 0.2
+        fade_duration = (duration + self.__PADDING) * Gst.MSECOND
+        position = self._playbin.query_position(Gst.Format.TIME)[1]
+        self.__set_fade(self._plugins, position, position + fade_duration,
+                        self._plugins.volume.props.volume, 0.0)
+        self.__fading_playbin = (self._playbin, self._plugins)
+        self.__fade_out_id = GLib.timeout_add(duration + self.__PADDING,
+                                              self.__on_faded_out)
         if self._playbin == self._playbin2:
             self._playbin = self._playbin1
             self._plugins = self._plugins1
@@ -158,9 +184,44 @@ class TransitionsPlayer:
             self._plugins = self._plugins2
         rate = App().settings.get_value("volume-rate").get_double()
         self._playbin.set_volume(GstAudio.StreamVolumeFormat.CUBIC, rate)
-        if track.id is not None:
-            self._playbin.set_state(Gst.State.NULL)
-            if self._load_track(track):
-                self._playbin.set_state(Gst.State.PLAYING)
-            App().task_helper.run(self.__volume_up, self._playbin,
-                                  self._plugins, duration)
+        self._playbin.set_state(Gst.State.NULL)
+        self.__set_fade(self._plugins, 0, fade_duration, 0.0, 1.0)
+        GLib.timeout_add(duration + self.__PADDING, self.__on_faded_in,
+                         self._plugins, fade_duration)
+        if self._load_track(track):
+            self._playbin.set_state(Gst.State.PLAYING)
+
+    def __on_crossfade_timeout(self):
+        """
+            Crossfade to next track if current one is ending
+        """
+        self.__crossfade_id = None
+        remaining = self.remaining
+        if remaining > self.__transition_duration + self.__PADDING +\
+                self.__TOLERANCE:
+            self.__schedule_crossfade()
+        else:
+            self.__do_crossfade(self.__transition_duration,
+                                self._next_track)
+
+    def __on_faded_out(self):
+        """
+            Stop faded out playbin
+        """
+        self.__fade_out_id = None
+        self.__stop_fading_out()
+
+    def __on_faded_in(self, plugins, end):
+        """
+            Remove fade once done, else track would fade in on next stream
+            @param plugins as PluginsPlayer
+            @param end as int (ns)
+        """
+        if plugins != self._plugins or plugins not in self.__bindings.keys():
+            return
+        (status, position) = self._playbin.query_position(Gst.Format.TIME)
+        if status and position < end:
+            GLib.timeout_add((end - position) // Gst.MSECOND,
+                             self.__on_faded_in, plugins, end)
+        else:
+            self.__remove_fade(plugins)
@@ -14,7 +14,6 @@ from gi.repository import GObject, GLib, Gio, TotemPlParser
 
 from gettext import gettext as _
 import itertools
-import sqlite3
 from datetime import datetime
 from threading import Lock
 import json
@@ -699,7 +698,7 @@ class Playlists(GObject.GObject):
             Return a new sqlite cursor
         """
         try:
-            sql = sqlite3.connect(self._DB_PATH, 600.0)
+            sql = App().sql_profiler.connect(self._DB_PATH, 600.0)
             sql.execute('ATTACH DATABASE "%s" AS music' % Database.DB_PATH)
             sql.create_collation("LOCALIZED", LocalizedCollation())
             return sql
@@ -0,0 +1,289 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+import mmap
+import os
+import re
+from struct import Struct
+
+from lollypop.define import App, CACHE_PATH, StorageType, ArtSize
+from lollypop.utils import noaccents2
+from lollypop.logger import Logger
+
+
+class SearchIndex:
+    """
+        Read only search index for the GNOME Shell search provider
+        Built by Lollypop after each scan, memory mapped by the provider.
+        Entries are sorted by (kind, id), keys (normalized words) are
+        sorted for prefix searches.
+    """
+
+    ALBUM = 0
+    TRACK = 1
+    PATH = "%s/search_index.bin" % CACHE_PATH
+    # magic, version, entries count, keys count
+    __HEADER = Struct("<4sIII")
+    # kind, id, popularity, (offset, length) for name, description, icon
+    __ENTRY = Struct("<BiIIIIIII")
+    # key offset, key length, entry index
+    __KEY = Struct("<III")
+    __MAGIC = b"LPSI"
+    __VERSION = 1
+    # Stop scanning a prefix after this count of keys
+    __MAX_KEYS = 10000
+    __WORDS = re.compile(r"\w+")
+
+    def __init__(self):
+        """
+            Init index, not loaded
+        """
+        self.__mmap = None
+        self.__mtime = 0
+        self.__entries_count = 0
+        self.__keys_count = 0
+        self.__entries_offset = 0
+        self.__keys_offset = 0
+        self.__blob_offset = 0
+
+    def update(self):
+        """
+            Build index from collection
+            @thread safe
+        """
+        storage_type = StorageType.COLLECTION | StorageType.SAVED
+        (albums, tracks) = [
+            [(object_id, name, artists, popularity,
+              self.__get_icon_path(lp_album_id))
+             for (object_id, name, artists, popularity, lp_album_id) in rows]
+            for rows in [App().albums.get_search_entries(storage_type),
+                         App().tracks.get_search_entries(storage_type)]]
+        self.build(albums, tracks)
+
+    def build(self, albums, tracks):
+        """
+            Write index, atomically
+            @param albums as [(int, str, str, int, str)]:
+                   [(id, name, artists, popularity, icon path)]
+            @param tracks as [(int, str, str, int, str)]
+            @thread safe
+        """
+        try:
+            blob = bytearray()
+            entries = []
+            keys = []
+
+            def add_string(string):
+                data = string.encode("utf-8")
+                offset = len(blob)
+                blob.extend(data)
+                return (offset, len(data))
+
+            rows = [(self.ALBUM, row) for row in albums] +\
+                [(self.TRACK, row) for row in tracks]
+            rows.sort(key=lambda row: (row[0], row[1][0]))
+            for (kind, (object_id, name, artists,
+                        popularity, icon)) in rows:
+                index = len(entries)
+                if kind == self.ALBUM:
+                    (title, description) = (artists or " ", name)
+                else:
+                    (title, description) = ("♫ " + name, artists or " ")
+                entries.append((kind, object_id, max(0, popularity or 0),
+                                *add_string(title),
+                                *add_string(description),
+                                *add_string(icon or "")))
+                for word in self.get_words("%s %s" % (name, artists or "")):
+                    keys.append((word.encode("utf-8"), index))
+            keys.sort()
+            key_offsets = {}
+            tmp_path = self.PATH + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(self.__HEADER.pack(self.__MAGIC, self.__VERSION,
+                                           len(entries), len(keys)))
+                for entry in entries:
+                    f.write(self.__ENTRY.pack(*entry))
+                for (key, index) in keys:
+                    if key not in key_offsets.keys():
+                        key_offsets[key] = add_string(key.decode("utf-8"))
+                    f.write(self.__KEY.pack(*key_offsets[key], index))
+                f.write(blob)
+            GLib.rename(tmp_path, self.PATH)
+            Logger.info("SearchIndex::build(): %s entries, %s keys",
+                        len(entries), len(keys))
+        except Exception as e:
+            Logger.error("SearchIndex::build(): %s", e)
+
+    def search(self, terms, limit=20):
+        """
+            Search for entries matching all terms
+            @param terms as [str]
+            @param limit as int
+            @return [(int, int)]: [(kind, id)]
+        """
+        if not self.__load():
+            return []
+        words = self.get_words(" ".join(terms))
+        if not words:
+            return []
+        matches = None
+        exact = {}
+        for word in words:
+            found = self.__get_prefix_matches(word.encode("utf-8"), exact)
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+        ranked = []
+        for index in matches:
+            entry = self.__get_entry(index)
+            # Exact words first, then albums, then popular
+            ranked.append((-exact.get(index, 0), entry[0], -entry[2],
+                           entry[0], entry[1]))
+        ranked.sort()
+        return [(kind, object_id)
+                for (e, k, p, kind, object_id) in ranked[:limit]]
+
+    def get_meta(self, kind, object_id):
+        """
+            Get meta for entry
+            @param kind as int
+            @param object_id as int
+            @return (str, str, str): (name, description, icon path)
+        """
+        if not self.__load():
+            return None
+        (low, high) = (0, self.__entries_count)
+        while low < high:
+            middle = (low + high) // 2
+            entry = self.__get_entry(middle)
+            if (entry[0], entry[1]) < (kind, object_id):
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.__entries_count:
+            entry = self.__get_entry(low)
+            if (entry[0], entry[1]) == (kind, object_id):
+                return (self.__get_string(entry[3], entry[4]),
+                        self.__get_string(entry[5], entry[6]),
+                        self.__get_string(entry[7], entry[8]))
+        return None
+
+    def get_words(self, string):
+        """
+            Split string in normalized words
+            @param string as str
+            @return [str]
+        """
+        return list(set(self.__WORDS.findall(noaccents2(string))))
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_icon_path(self, lp_album_id):
+        """
+            Get artwork cache path as used by AlbumArtwork
+            @param lp_album_id as str
+            @return str
+        """
+        return App().album_art.add_extension(
+            "%s/%s_%s_%s" % (CACHE_PATH, lp_album_id,
+                             ArtSize.BIG, ArtSize.BIG))
+
+    def __load(self):
+        """
+            Map index file, map it again if updated
+            @return True if loaded
+        """
+        try:
+            mtime = os.stat(self.PATH).st_mtime
+            if self.__mmap is not None and mtime == self.__mtime:
+                return True
+            with open(self.PATH, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            (magic, version, entries_count,
+             keys_count) = self.__HEADER.unpack_from(data, 0)
+            if magic != self.__MAGIC or version != self.__VERSION:
+                raise Exception("Invalid index version")
+            if self.__mmap is not None:
+                self.__mmap.close()
+            self.__mmap = data
+            self.__mtime = mtime
+            self.__entries_count = entries_count
+            self.__keys_count = keys_count
+            self.__entries_offset = self.__HEADER.size
+            self.__keys_offset = self.__entries_offset +\
+                entries_count * self.__ENTRY.size
+            self.__blob_offset = self.__keys_offset +\
+                keys_count * self.__KEY.size
+            return True
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            Logger.error("SearchIndex::__load(): %s", e)
+        return False
+
+    def __get_entry(self, index):
+        """
+            Get entry at index
+            @param index as int
+            @return tuple
+        """
+        return self.__ENTRY.unpack_from(
+            self.__mmap, self.__entries_offset + index * self.__ENTRY.size)
+
+    def __get_key(self, index):
+        """
+            Get key at index
+            @param index as int
+            @return (bytes, int): (key, entry index)
+        """
+        (offset, length, entry_index) = self.__KEY.unpack_from(
+            self.__mmap, self.__keys_offset + index * self.__KEY.size)
+        start = self.__blob_offset + offset
+        return (self.__mmap[start:start + length], entry_index)
+
+    def __get_string(self, offset, length):
+        """
+            Get string from blob
+            @param offset as int
+            @param length as int
+            @return str
+        """
+        start = self.__blob_offset + offset
+        return self.__mmap[start:start + length].decode("utf-8")
+
+    def __get_prefix_matches(self, prefix, exact):
+        """
+            Get entries with a key starting with prefix
+            @param prefix as bytes
+            @param exact as {int: int}: exact matches count by entry
+            @return set(int)
+        """
+        (low, high) = (0, self.__keys_count)
+        while low < high:
+            middle = (low + high) // 2
+            if self.__get_key(middle)[0] < prefix:
+                low = middle + 1
+            else:
+                high = middle
+        matches = set()
+        for index in range(low, min(low + self.__MAX_KEYS,
+                                    self.__keys_count)):
+            (key, entry_index) = self.__get_key(index)
+            if not key.startswith(prefix):
+                break
+            matches.add(entry_index)
+            if key == prefix:
+                exact[entry_index] = exact.get(entry_index, 0) + 1
+        return matches
@@ -32,6 +32,7 @@ class Settings(Gio.Settings):
         """
         settings = Gio.Settings.new("org.gnome.Lollypop")
         settings.__class__ = Settings
+        settings.snapshot = SettingsSnapshot(settings)
         return settings
 
     def reset_all_settings(settings):
@@ -56,3 +57,74 @@ class Settings(Gio.Settings):
                 Logger.info("You need to add a music uri"
                             " to org.gnome.Lollypop in dconf")
         return list(uris)
+
+
+class SettingsSnapshot:
+    """
+        Typed cache for settings read in hot paths (loops, SQLite functions)
+        Values are updated on changes
+    """
+
+    def __init__(self, settings):
+        """
+            Init snapshot
+            @param settings as Settings
+        """
+        self.__getters = {
+            "case-sensitive-search":
+                lambda: settings.get_value(
+                    "case-sensitive-search").get_boolean(),
+            "regexp-search":
+                lambda: settings.get_value("regexp-search").get_boolean(),
+            "max-search-results":
+                lambda: settings.get_value("max-search-results").get_int32(),
+            "orderby": lambda: settings.get_enum("orderby"),
+        }
+        self.__values = {}
+        # Connect before reading, GSettings only notifies read keys
+        for key in self.__getters.keys():
+            settings.connect("changed::%s" % key, self.__on_changed)
+            self.__values[key] = self.__getters[key]()
+
+    @property
+    def case_sensitive_search(self):
+        """
+            True if case-sensitive search is enabled
+            @return bool
+        """
+        return self.__values["case-sensitive-search"]
+
+    @property
+    def regexp_search(self):
+        """
+            True if regexp search is enabled
+            @return bool
+        """
+        return self.__values["regexp-search"]
+
+    @property
+    def max_search_results(self):
+        """
+            Get maximum count of search results
+            @return int
+        """
+        return self.__values["max-search-results"]
+
+    @property
+    def orderby(self):
+        """
+            Get albums order
+            @return OrderBy
+        """
+        return self.__values["orderby"]
+
+#######################
+# PRIVATE             #
+#######################
+    def __on_changed(self, settings, key):
+        """
+            Update value
+            @param settings as Settings
+            @param key as str
+        """
+        self.__values[key] = self.__getters[key]()
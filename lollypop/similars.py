@@ -10,7 +10,12 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+from gi.repository import Gio
+
+from time import time
+
 from lollypop.define import App
+from lollypop.logger import Logger
 from lollypop.utils import get_network_available
 from lollypop.similars_local import LocalSimilars
 from lollypop.similars_spotify import SpotifySimilars
@@ -21,7 +26,12 @@ from lollypop.similars_deezer import DeezerSimilars
 class Similars():
     """
         Search similar artists
+        Web results are learned in a local graph, queried first
     """
+
+    # Delay before refreshing graph from web, in seconds
+    __REFRESH_DELAY = 604800
+
     def __init__(self):
         """
             Init similars
@@ -39,20 +49,51 @@ class Similars():
             @return [(str, None)]
         """
         artist_names = []
-        result = []
         for artist_id in artist_ids:
             artist_names.append(App().artists.get_name(artist_id))
-
-        if get_network_available("DEEZER"):
-            result = self.__deezer_helper.get_similar_artists(
-                artist_names, cancellable)
-        if not result and get_network_available("SPOTIFY"):
-            result = self.__spotify_helper.get_similar_artists(
-                artist_names, cancellable)
-        if not result and get_network_available("LASTFM"):
-            result = self.__lastfm_helper.get_similar_artists(
-                artist_names, cancellable)
+        outdated = [name for name in artist_names
+                    if App().similars.get_mtime(name) +
+                    self.__REFRESH_DELAY < time()]
+        result = App().similars.get(artist_names)
+        if result:
+            Logger.info("Found similar artists in local graph")
+            # Refresh in background, do not use caller cancellable
+            if outdated:
+                App().task_helper.run(self.learn_similar_artists,
+                                      outdated, Gio.Cancellable())
+        else:
+            result = self.learn_similar_artists(outdated, cancellable)
         if not result:
             result = self.__local_helper.get_similar_artists(
                 artist_names, cancellable)
         return result
+
+    def learn_similar_artists(self, artist_names, cancellable):
+        """
+            Get similar artists from web and save them in local graph
+            @param artist_names as [str]
+            @param cancellable as Gio.Cancellable
+            @return [(str, str)]
+        """
+        providers = [(self.__deezer_helper, "DEEZER"),
+                     (self.__spotify_helper, "SPOTIFY"),
+                     (self.__lastfm_helper, "LASTFM")]
+        providers = [(helper, source) for (helper, source) in providers
+                     if get_network_available(source)]
+        result = []
+        if not providers:
+            return result
+        for artist_name in artist_names:
+            for (helper, source) in providers:
+                if cancellable.is_cancelled():
+                    return result
+                similars = helper.get_similar_artists([artist_name],
+                                                      cancellable)
+                # Providers return nothing on errors, only remember
+                # refresh if one answered
+                if similars:
+                    App().similars.add(artist_name, similars, source)
+                    App().similars.set_mtime(artist_name)
+                    result += similars
+                    break
+        return result
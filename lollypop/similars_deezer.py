@@ -105,7 +105,7 @@ class DeezerSimilars(SaveWebHelper, DeezerWebHelper):
         try:
             uri = "https://api.deezer.com/artist/%s/related" % deezer_id
             (status, data) = App().task_helper.load_uri_content_sync(
-                uri, cancellable)
+                uri, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 for artist in decode["data"]:
@@ -105,7 +105,8 @@ class LastFMSimilars(SaveWebHelper, LastFMWebHelper):
             uri = "http://ws.audioscrobbler.com/2.0/?method=artist.getinfo"
             uri += "&artist=%s&api_key=%s&format=json" % (
                 artist, LASTFM_API_KEY)
-            (status, data) = App().task_helper.load_uri_content_sync(uri, None)
+            (status, data) = App().task_helper.load_uri_content_sync(
+                uri, None, cache=True)
             if status:
                 content = json.loads(data.decode("utf-8"))
                 for artist in content["artist"]["similar"]["artist"]:
@@ -36,6 +36,15 @@ class LocalSimilars:
         artist_ids = []
         for artist_name in artist_names:
             artist_ids.append(App().artists.get_id(artist_name)[0])
+        # Prefer artists listened in same sessions
+        similar_artist_ids = App().colistening.get_similar_artist_ids(
+            artist_ids)
+        names = [App().artists.get_name(artist_id)
+                 for artist_id in similar_artist_ids]
+        result = [(name, None) for name in names if name is not None]
+        if result:
+            Logger.info("Found similar artists with CoListening")
+            return result
         genre_ids = App().artists.get_genre_ids(artist_ids,
                                                 StorageType.COLLECTION)
         artists = App().artists.get(genre_ids, StorageType.COLLECTION)
@@ -139,7 +139,7 @@ class SpotifySimilars(SaveWebHelper, SpotifyWebHelper):
                 spotify_id
             (status,
              data) = App().task_helper.load_uri_content_sync_with_headers(
-                    uri, headers, cancellable)
+                    uri, headers, cancellable, cache=True)
             if status:
                 decode = json.loads(data.decode("utf-8"))
                 for item in decode["artists"]:
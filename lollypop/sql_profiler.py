@@ -0,0 +1,343 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import sqlite3
+import sys
+import json
+from os import path
+from threading import Lock, current_thread, main_thread
+from time import perf_counter, time
+
+from lollypop.define import App, CACHE_PATH
+from lollypop.logger import Logger
+
+
+class SqlProfiler:
+    """
+        Opt-in SQL statements instrumentation
+        Connections record statement duration, fetched rows, call site and
+        thread. Slow statements are logged, all are aggregated for report.
+    """
+    # Log statements slower than this (seconds)
+    __SLOW = 0.05
+    __SLOW_LOG_PATH = "%s/sql_slow.log" % CACHE_PATH
+
+    def __init__(self):
+        """
+            Init profiler, disabled
+        """
+        self.__enabled = False
+        self.__lock = Lock()
+        # {(statement, caller): [count, duration, max, rows, main thread]}
+        self.__stats = {}
+
+    def enable(self):
+        """
+            Instrument new connections
+        """
+        self.__enabled = True
+
+    def connect(self, database, timeout):
+        """
+            Get a connection to database
+            @param database as str
+            @param timeout as float
+            @return sqlite3.Connection
+        """
+        if self.__enabled:
+            return sqlite3.connect(database, timeout,
+                                   factory=ProfiledConnection)
+        return sqlite3.connect(database, timeout)
+
+    def record(self, statement, duration, rows, caller, main):
+        """
+            Record a statement
+            @param statement as str
+            @param duration as float (seconds)
+            @param rows as int
+            @param caller as str
+            @param main as bool: ran on main thread
+            @thread safe
+        """
+        statement = " ".join(statement.split())
+        with self.__lock:
+            stats = self.__stats.setdefault((statement, caller),
+                                            [0, 0, 0, 0, 0])
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+            stats[3] += rows
+            stats[4] += main
+        if duration >= self.__SLOW:
+            Logger.warning("Slow SQL %.1fms (%s rows, %s): %s",
+                           duration * 1000, rows, caller, statement[:200])
+            try:
+                with open(self.__SLOW_LOG_PATH, "a") as f:
+                    f.write(json.dumps({"time": int(time()),
+                                        "duration_ms": duration * 1000,
+                                        "rows": rows,
+                                        "caller": caller,
+                                        "main_thread": main,
+                                        "statement": statement}) + "\n")
+            except Exception as e:
+                Logger.error("SqlProfiler::record(): %s", e)
+
+    def get_top(self, count=20):
+        """
+            Get statements with biggest total duration
+            @param count as int
+            @return [{}]
+        """
+        with self.__lock:
+            items = list(self.__stats.items())
+        items.sort(key=lambda item: item[1][1], reverse=True)
+        top = []
+        for ((statement, caller), stats) in items[:count]:
+            (calls, duration, maximum, rows, main) = stats
+            top.append({"statement": statement,
+                        "caller": caller,
+                        "calls": calls,
+                        "total_ms": round(duration * 1000, 3),
+                        "mean_ms": round(duration * 1000 / calls, 3),
+                        "max_ms": round(maximum * 1000, 3),
+                        "rows": rows,
+                        "main_thread": main})
+        return top
+
+    def report(self, count=20):
+        """
+            Get a report of statements with biggest total duration
+            @param count as int
+            @return str
+        """
+        if not self.__enabled:
+            return "SQL profiling disabled, run with --profile-sql"
+        lines = ["%10s %7s %9s %9s %8s %6s  %s" % (
+            "Total", "Calls", "Mean", "Max", "Rows", "Main", "Caller")]
+        for entry in self.get_top(count):
+            lines.append("%8.1fms %7d %7.2fms %7.1fms %8d %6d  %s" % (
+                entry["total_ms"], entry["calls"], entry["mean_ms"],
+                entry["max_ms"], entry["rows"], entry["main_thread"],
+                entry["caller"]))
+            lines.append("    %s" % entry["statement"][:200])
+        return "\n".join(lines)
+
+    def reset(self):
+        """
+            Clear recorded statements
+        """
+        with self.__lock:
+            self.__stats = {}
+
+    @property
+    def enabled(self):
+        """
+            True if profiling is enabled
+            @return bool
+        """
+        return self.__enabled
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """
+        Connection with profiled cursors
+    """
+
+    def cursor(self, factory=None):
+        """
+            Get a profiled cursor
+            @param factory as sqlite3.Cursor type
+            @return sqlite3.Cursor
+        """
+        return sqlite3.Connection.cursor(self, factory or ProfiledCursor)
+
+    def execute(self, sql, parameters=()):
+        """
+            Execute statement with a new cursor
+            @param sql as str
+            @param parameters as ()
+            @return sqlite3.Cursor
+        """
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, parameters):
+        """
+            Execute statement with a new cursor
+            @param sql as str
+            @param parameters as [()]
+            @return sqlite3.Cursor
+        """
+        return self.cursor().executemany(sql, parameters)
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """
+        Cursor recording statements duration and fetched rows
+        A statement is recorded when its rows are exhausted, on next
+        statement or when cursor is released
+    """
+    # Call site is first frame out of these files
+    __SKIPPED = [__file__,
+                 path.join(path.dirname(__file__), "sqlcursor.py")]
+
+    def __init__(self, connection):
+        """
+            Init cursor
+            @param connection as sqlite3.Connection
+        """
+        sqlite3.Cursor.__init__(self, connection)
+        self.__statement = None
+        self.__duration = 0
+        self.__rows = 0
+        self.__caller = None
+        self.__main = False
+
+    def execute(self, sql, parameters=()):
+        """
+            Execute statement
+            @param sql as str
+            @param parameters as ()
+            @return sqlite3.Cursor
+        """
+        return self.__run(sqlite3.Cursor.execute, sql, parameters)
+
+    def executemany(self, sql, parameters):
+        """
+            Execute statement for all parameters
+            @param sql as str
+            @param parameters as [()]
+            @return sqlite3.Cursor
+        """
+        return self.__run(sqlite3.Cursor.executemany, sql, parameters)
+
+    def fetchone(self):
+        """
+            Fetch next row
+            @return tuple/None
+        """
+        row = self.__fetch(sqlite3.Cursor.fetchone)
+        if row is None:
+            self.__record()
+        else:
+            self.__rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        """
+            Fetch next rows
+            @return [tuple]
+        """
+        rows = self.__fetch(sqlite3.Cursor.fetchmany, *args)
+        if rows:
+            self.__rows += len(rows)
+        else:
+            self.__record()
+        return rows
+
+    def fetchall(self):
+        """
+            Fetch remaining rows
+            @return [tuple]
+        """
+        rows = self.__fetch(sqlite3.Cursor.fetchall)
+        self.__rows += len(rows)
+        self.__record()
+        return rows
+
+    def close(self):
+        """
+            Record statement and close cursor
+        """
+        self.__record()
+        sqlite3.Cursor.close(self)
+
+    def __next__(self):
+        """
+            Fetch next row
+            @return tuple
+        """
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def __del__(self):
+        """
+            Record pending statement
+        """
+        try:
+            self.__record()
+        except:
+            pass
+
+#######################
+# PRIVATE             #
+#######################
+    def __run(self, method, sql, parameters):
+        """
+            Run statement method and time it
+            @param method as function
+            @param sql as str
+            @param parameters as ()/[()]
+            @return sqlite3.Cursor
+        """
+        self.__record()
+        self.__statement = sql
+        self.__rows = 0
+        self.__caller = self.__get_caller()
+        self.__main = current_thread() is main_thread()
+        start = perf_counter()
+        try:
+            return method(self, sql, parameters)
+        finally:
+            self.__duration = perf_counter() - start
+
+    def __fetch(self, method, *args):
+        """
+            Run fetch method and time it
+            @param method as function
+            @return fetch result
+        """
+        start = perf_counter()
+        try:
+            return method(self, *args)
+        finally:
+            self.__duration += perf_counter() - start
+
+    def __record(self):
+        """
+            Record pending statement
+        """
+        if self.__statement is None:
+            return
+        rows = self.__rows
+        # Changed rows for INSERT/UPDATE/DELETE
+        if rows == 0 and self.rowcount > 0:
+            rows = self.rowcount
+        App().sql_profiler.record(self.__statement, self.__duration,
+                                  rows, self.__caller, self.__main)
+        self.__statement = None
+
+    def __get_caller(self):
+        """
+            Get statement call site
+            @return str
+        """
+        frame = sys._getframe(2)
+        while frame is not None and\
+                frame.f_code.co_filename in self.__SKIPPED:
+            frame = frame.f_back
+        if frame is None:
+            return "unknown"
+        return "%s:%s %s()" % (path.basename(frame.f_code.co_filename),
+                               frame.f_lineno,
+                               frame.f_code.co_name)
@@ -49,6 +49,16 @@ class SqlCursor:
             App().cursors[name].commit()
             obj.thread_lock.release()
 
+    def rollback(obj):
+        """
+            Rollback current obj
+        """
+        name = current_thread().getName() + obj.__class__.__name__
+        if name in App().cursors.keys():
+            obj.thread_lock.acquire()
+            App().cursors[name].rollback()
+            obj.thread_lock.release()
+
     def __init__(self, obj, commit=False):
         """
             Init object
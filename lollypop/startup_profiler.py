@@ -0,0 +1,67 @@
+# Copyright (c) 2014-2021 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from time import perf_counter
+
+from lollypop.logger import Logger
+
+
+class StartupProfiler:
+    """
+        Measure startup phases until first frame
+    """
+
+    def __init__(self):
+        """
+            Init profiler, startup begins now
+        """
+        self.__start = perf_counter()
+        self.__last = self.__start
+        self.__phases = []
+        self.__enabled = False
+        self.__finished = False
+
+    def enable(self):
+        """
+            Print a report when startup is finished
+        """
+        self.__enabled = True
+
+    def mark(self, phase):
+        """
+            Mark end of phase
+            @param phase as str
+        """
+        if self.__finished:
+            return
+        now = perf_counter()
+        self.__phases.append((phase, now - self.__last))
+        self.__last = now
+
+    def finish(self):
+        """
+            Mark first frame and log phases
+        """
+        if self.__finished:
+            return
+        self.mark("first frame")
+        self.__finished = True
+        total = self.__last - self.__start
+        Logger.info("Startup: %.3fs (%s)", total,
+                    ", ".join("%s %.3fs" % (phase, duration)
+                              for (phase, duration) in self.__phases))
+        if self.__enabled:
+            print("%-20s %10s %7s" % ("Phase", "Duration", "%"))
+            for (phase, duration) in self.__phases:
+                print("%-20s %9.1fms %6.1f%%" % (
+                    phase, duration * 1000, duration * 100 / total))
+            print("%-20s %9.1fms" % ("Time to window", total * 1000))
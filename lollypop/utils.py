@@ -603,21 +603,21 @@ def max_search_results():
     """
         Return maximum # of search results based on settings
     """
-    return App().settings.get_value("max-search-results").get_int32()
+    return App().settings.snapshot.max_search_results
 
 
 def regexp_search_p():
     """
         Return true if regexp search is enabled
     """
-    return App().settings.get_value("regexp-search").get_boolean()
+    return App().settings.snapshot.regexp_search
 
 
 def case_sensitive_search_p():
     """
         Return true if case-sensitive search is enabled
     """
-    return App().settings.get_value("case-sensitive-search").get_boolean()
+    return App().settings.snapshot.case_sensitive_search
 
 
 def search_settings_string():
@@ -32,6 +32,7 @@ class AlbumsBoxView(FlowBoxView, SignalsHelper):
     """
         Show albums in a box
     """
+    _VIRTUALIZED = True
 
     @signals_map
     def __init__(self, genre_ids, artist_ids, storage_type, view_type):
@@ -26,7 +26,8 @@ class AlbumsLineView(AlbumsBoxView, HorizontalScrollingHelper):
     """
         Albums on a line
     """
-
+    # Children are on a horizontal line, never far from visible area
+    _VIRTUALIZED = False
     ITEMS = 20
 
     def __init__(self, storage_type, view_type):
@@ -231,6 +232,46 @@ class AlbumsPopularsLineView(AlbumsLineView):
         App().task_helper.run(load, callback=(on_load,))
 
 
+class AlbumsCoListenedLineView(AlbumsLineView):
+    """
+        Albums listened with recently played albums
+    """
+
+    def __init__(self, storage_type, view_type):
+        """
+            Init view
+            @param storage_type as StorageType
+            @param view_type as ViewType
+        """
+        AlbumsLineView.__init__(self, storage_type, view_type)
+
+    def populate(self):
+        """
+            Populate view
+        """
+        def on_load(items):
+            AlbumsLineView.populate(self, items)
+
+        def load():
+            storage_type = get_default_storage_type()
+            track_ids = App().tracks.get_recently_listened_to(storage_type,
+                                                              False,
+                                                              self.ITEMS)
+            album_ids = []
+            for track_id in track_ids:
+                album_id = App().tracks.get_album_id(track_id)
+                if album_id not in album_ids:
+                    album_ids.append(album_id)
+            similar_album_ids = App().colistening.get_similar_album_ids(
+                album_ids, self.ITEMS)
+            return [Album(album_id) for album_id in similar_album_ids
+                    if App().albums.get_storage_type(album_id) &
+                    storage_type]
+
+        self._label.set_text(_("Often listened together"))
+        App().task_helper.run(load, callback=(on_load,))
+
+
 class AlbumsRandomGenresLineView(AlbumsLineView):
     """
         Populars albums line
@@ -25,6 +25,7 @@ class AlbumsListView(LazyLoadingView, SignalsHelper, GesturesHelper):
     """
         View showing albums
     """
+    _VIRTUALIZED = True
 
     @signals_map
     def __init__(self, genre_ids, artist_ids, view_type):
@@ -150,10 +150,7 @@ class FlowBoxView(LazyLoadingView, GesturesHelper):
         """
         LazyLoadingView._on_container_folded(self, leaflet, folded)
         self.pause()
-        children = self._box.get_children()
-        for child in children:
-            child.reset_artwork()
-            self.queue_lazy_loading(child)
+        self.requeue_lazy_loading(self._box.get_children())
         self.lazy_loading()
 
     def _on_view_leave(self, event_controller):
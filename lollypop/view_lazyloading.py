@@ -23,14 +23,23 @@ from lollypop.utils import emit_signal
 class LazyLoadingView(View):
     """
         Lazy loading for view
+        Virtualized views only populate children near visible area and
+        release far away children, they are populated again on scroll.
     """
 
     __gsignals__ = {
         # View has been populated/depopulated, children are not populated
         "initialized": (GObject.SignalFlags.RUN_FIRST, None, ()),
-        # All children are populated
+        # All children are populated, only near ones if virtualized
         "populated": (GObject.SignalFlags.RUN_FIRST, None, ()),
     }
+    _VIRTUALIZED = False
+    # Populate children in this count of pages around visible area
+    __NEAR_PAGES = 1
+    # Release children out of this count of pages
+    __KEPT_PAGES = 3
+    # Max time for adding children in one main loop iteration
+    __ADD_TIME = 0.01
 
     def __init__(self, storage_type, view_type):
         """
@@ -42,6 +51,10 @@ class LazyLoadingView(View):
         self.__loading_state = LoadingState.NONE
         self.__lazy_queue = []
         self.__priority_queue = []
+        # Populated children, if virtualized
+        self.__loaded = []
+        # Children connected to populated signal: {child: handler ids}
+        self.__connected = {}
         self.__scroll_timeout_id = None
         self.__start_time = time()
 
@@ -72,6 +85,11 @@ class LazyLoadingView(View):
             self.__scroll_timeout_id = None
         self.__lazy_queue = []
         self.__priority_queue = []
+        self.__loaded = []
+        for (child, handler_ids) in self.__connected.items():
+            for handler_id in handler_ids:
+                child.disconnect(handler_id)
+        self.__connected = {}
         View.stop(self)
 
     def lazy_loading(self):
@@ -88,6 +106,20 @@ class LazyLoadingView(View):
         """
         self.__lazy_queue.append(widget)
 
+    def requeue_lazy_loading(self, children):
+        """
+            Reset children artwork and queue them again into lazy loading
+            @param children as [Gtk.Widget]
+        """
+        queued = set(self.__lazy_queue)
+        requeued = set(children)
+        self.__loaded = [child for child in self.__loaded
+                         if child not in requeued]
+        for child in children:
+            child.reset_artwork()
+            if child not in queued:
+                self.__lazy_queue.append(child)
+
     def set_scrolled(self, scrolled):
         """
             Add an external scrolled window
@@ -131,7 +163,7 @@ class LazyLoadingView(View):
             @param adj as Gtk.Adjustment
         """
         View._on_value_changed(self, adj)
-        if not self.__lazy_queue:
+        if not self.__lazy_queue and not self.__loaded:
             return False
         if self.__scroll_timeout_id is not None:
             GLib.source_remove(self.__scroll_timeout_id)
@@ -159,14 +191,21 @@ class LazyLoadingView(View):
             Load the view in a lazy way
         """
         widget = None
+        if self._VIRTUALIZED and not self.__priority_queue:
+            self.__priority_queue = self.__get_near_children()
         if self.__priority_queue:
             widget = self.__priority_queue.pop(0)
             self.__lazy_queue.remove(widget)
-        elif self.__lazy_queue:
+        elif self.__lazy_queue and not self._VIRTUALIZED:
             widget = self.__lazy_queue.pop(0)
 
         if widget is not None:
-            widget.connect("populated", self._on_populated)
+            if self._VIRTUALIZED:
+                self.__loaded.append(widget)
+            if widget not in self.__connected.keys():
+                self.__connected[widget] = (
+                    widget.connect("populated", self._on_populated),
+                    widget.connect("destroy", self.__on_child_destroy))
             widget.populate()
         else:
             self.__loading_state = LoadingState.FINISHED
@@ -188,37 +227,79 @@ class LazyLoadingView(View):
             @param values as []
         """
         if values:
-            value = values.pop(0)
-            child = self._get_child(value)
-            if child is not None:
-                self.__lazy_queue.append(child)
+            start = time()
+            while values and time() - start < self.__ADD_TIME:
+                value = values.pop(0)
+                child = self._get_child(value)
+                if child is not None:
+                    self.__lazy_queue.append(child)
             GLib.idle_add(self.__add_values, values)
         elif self.__loading_state != LoadingState.RUNNING:
             self.__loading_state = LoadingState.RUNNING
             emit_signal(self, "initialized")
             self.__lazy_loading()
 
-    def __is_visible(self, widget):
+    def __is_visible(self, widget, pages=0):
         """
             Is widget visible in scrolled
             @param widget as Gtk.Widget
+            @param pages as int: pages around visible area
         """
         widget_alloc = widget.get_allocation()
         scrolled_alloc = self.scrolled.get_allocation()
+        margin = scrolled_alloc.height * pages
         try:
             (x, y) = widget.translate_coordinates(self.scrolled, 0, 0)
-            return (y > -widget_alloc.height or y >= 0) and\
-                y < scrolled_alloc.height
+            return (y > -widget_alloc.height - margin or y >= 0) and\
+                y < scrolled_alloc.height + margin
         except:
             return True
 
+    def __get_near_children(self):
+        """
+            Get queued children near visible area
+            @return [Gtk.Widget]
+        """
+        # Not allocated children may be visible
+        return [child for child in self.__lazy_queue
+                if child.get_allocated_height() <= 1 or
+                self.__is_visible(child, self.__NEAR_PAGES)]
+
+    def __release_far_children(self):
+        """
+            Release populated children far from visible area
+        """
+        for child in list(self.__loaded):
+            if child.get_parent() is None:
+                self.__loaded.remove(child)
+            elif child.get_allocated_height() > 1 and\
+                    not self.__is_visible(child, self.__KEPT_PAGES):
+                self.__loaded.remove(child)
+                child.reset_artwork()
+                self.__lazy_queue.append(child)
+
     def __lazy_or_not(self):
         """
             Add visible widgets to lazy queue
         """
         self.__scroll_timeout_id = None
-        if self.__loading_state == LoadingState.RUNNING:
+        if self._VIRTUALIZED:
+            if self.__loading_state == LoadingState.ABORTED:
+                return
+            self.__release_far_children()
+            self.__priority_queue = self.__get_near_children()
+            if self.__priority_queue and\
+                    self.__loading_state == LoadingState.FINISHED:
+                self.lazy_loading()
+        elif self.__loading_state == LoadingState.RUNNING:
             self.__priority_queue = []
             for child in self.__lazy_queue:
                 if self.__is_visible(child):
                     self.__priority_queue.append(child)
+
+    def __on_child_destroy(self, widget):
+        """
+            Forget child
+            @param widget as Gtk.Widget
+        """
+        self.__connected.pop(widget, None)
@@ -130,48 +130,10 @@ class LyricsView(View, SignalsHelper):
             self.__lyrics_label.set_text("")
             return
         self.__lyrics_label.set_text(_("Loading…"))
-        lyrics = ""
         if isinstance(track, Track):
-            self.__lyrics_helper.load(track)
-            # First check synced lyrics
-            if self.__lyrics_helper.available:
-                if self.__lyrics_timeout_id is None:
-                    self.__lyrics_timeout_id = GLib.timeout_add(
-                        200, self.__show_sync_lyrics)
-                return
-            else:
-                if self.__lyrics_timeout_id is not None:
-                    GLib.source_remove(self.__lyrics_timeout_id)
-                    self.__lyrics_timeout_id = None
-                if track.storage_type & (StorageType.COLLECTION |
-                                         StorageType.EXTERNAL):
-                    from lollypop.tagreader import TagReader, Discoverer
-                    tagreader = TagReader()
-                    discoverer = Discoverer()
-                    try:
-                        info = discoverer.get_info(track.uri)
-                    except:
-                        info = None
-                    if info is not None:
-                        tags = info.get_tags()
-                        lyrics = tagreader.get_lyrics(tags)
-        if lyrics:
-            self.__lyrics_label.set_text(lyrics)
-            self.__lyrics_text = lyrics
+            self.__lyrics_helper.load(track, self.__on_lyrics_loaded, track)
         else:
-            name = track.name + track.album.name + ",".join(track.artists)
-            content = self.__information_store.get_information(name,
-                                                               LYRICS_PATH)
-            if content:
-                self.__lyrics_label.set_text(content.decode("utf-8"))
-            elif not get_network_available():
-                self.__lyrics_label.set_text(
-                    _("Network unavailable or disabled in settings"))
-            else:
-                self.__lyrics_helper.get_lyrics_from_web(track,
-                                                         self.__on_lyrics,
-                                                         False,
-                                                         track)
+            self.__populate_unsynced(track, "")
 
     @property
     def args(self):
@@ -255,6 +217,30 @@ class LyricsView(View, SignalsHelper):
         self.__lyrics_label.set_markup(lyrics, True)
         return True
 
+    def __populate_unsynced(self, track, lyrics):
+        """
+            Set unsynced lyrics, from store or web if empty
+            @param track as Track
+            @param lyrics as str
+        """
+        if lyrics:
+            self.__lyrics_label.set_text(lyrics)
+            self.__lyrics_text = lyrics
+        else:
+            name = track.name + track.album.name + ",".join(track.artists)
+            content = self.__information_store.get_information(name,
+                                                               LYRICS_PATH)
+            if content:
+                self.__lyrics_label.set_text(content.decode("utf-8"))
+            elif not get_network_available():
+                self.__lyrics_label.set_text(
+                    _("Network unavailable or disabled in settings"))
+            else:
+                self.__lyrics_helper.get_lyrics_from_web(track,
+                                                         self.__on_lyrics,
+                                                         False,
+                                                         track)
+
     def __get_blob(self, text):
         """
             Translate text with current user locale
@@ -323,3 +309,22 @@ class LyricsView(View, SignalsHelper):
                                                       LYRICS_PATH,
                                                       lyrics.encode("utf-8"))
             self.__banner.translate_button.set_sensitive(True)
+
+    def __on_lyrics_loaded(self, track):
+        """
+            Show synced lyrics if available, else unsynced lyrics
+            @param track as Track
+        """
+        if self.__lyrics_helper.available:
+            if self.__lyrics_timeout_id is None:
+                self.__lyrics_timeout_id = GLib.timeout_add(
+                    200, self.__show_sync_lyrics)
+            return
+        if self.__lyrics_timeout_id is not None:
+            GLib.source_remove(self.__lyrics_timeout_id)
+            self.__lyrics_timeout_id = None
+        lyrics = ""
+        if track.storage_type & (StorageType.COLLECTION |
+                                 StorageType.EXTERNAL):
+            lyrics = self.__lyrics_helper.text
+        self.__populate_unsynced(track, lyrics)
@@ -19,6 +19,7 @@ from lollypop.utils import get_network_available
 from lollypop.define import ViewType, StorageType, Size, App
 from lollypop.view_albums_line import AlbumsPopularsLineView
 from lollypop.view_albums_line import AlbumsRandomGenresLineView
+from lollypop.view_albums_line import AlbumsCoListenedLineView
 from lollypop.view_artists_line import ArtistsRandomLineView
 from lollypop.widgets_banner_today import TodayBannerWidget
 from lollypop.helper_signals import signals_map
@@ -62,6 +63,7 @@ class SuggestionsView(View):
             Populate view
         """
         for cls in [AlbumsPopularsLineView,
+                    AlbumsCoListenedLineView,
                     ArtistsRandomLineView,
                     AlbumsRandomGenresLineView]:
             view = cls(self.storage_type, self.view_type)
@@ -80,7 +80,11 @@ class AlbumRow(Gtk.ListBoxRow):
             Populate widget content
         """
         if self.__artwork is not None:
-            self.emit("populated")
+            # Released by view, artwork will emit populated
+            if self.__artwork.get_storage_type() == Gtk.ImageType.EMPTY:
+                self.set_artwork()
+            else:
+                self.emit("populated")
             return
         self.__artwork = Gtk.Image.new()
         App().art_helper.set_frame(self.__artwork, "small-cover-frame",
@@ -190,6 +194,18 @@ class AlbumRow(Gtk.ListBoxRow):
         self.__tracks_view.populate()
         self.__revealer.add(self.__tracks_view)
 
+    def reset_artwork(self):
+        """
+            Release artwork and tracks if collapsed
+        """
+        if self.__artwork is None or self.revealed:
+            return
+        self.__artwork.clear()
+        if self.__tracks_view.is_populated:
+            self.__tracks_view.destroy()
+            self.__tracks_view = self.__get_new_tracks_view()
+            self.__revealer.add(self.__tracks_view)
+
     def set_artwork(self):
         """
             Set album artwork
@@ -102,12 +102,14 @@ class CollectionWebService(SaveWebHelper,
                     storage_types.append(storage_type)
             # Update needed storage types
             if storage_types:
+                album_ids = []
                 for storage_type in storage_types:
                     if self.__cancellable.is_cancelled():
                         raise Exception("cancelled")
-                    self.__METHODS[storage_type](self, self.__cancellable)
-                self.clean_old_albums(storage_types)
-                App().artists.update_featuring()
+                    album_ids += self.__METHODS[storage_type](
+                        self, self.__cancellable)
+                album_ids += self.clean_old_albums(storage_types)
+                App().artists.update_featuring(album_ids)
         except Exception as e:
             Logger.warning("CollectionWebService::__populate_db(): %s", e)
         self.__is_running = False
@@ -117,7 +119,9 @@ class CollectionWebService(SaveWebHelper,
         """
             Clean old albums from DB
             @param storage_types as [StorageType]
+            @return [int]: removed album ids
         """
+        removed_album_ids = []
         SqlCursor.add(App().db)
         # Remove older albums
         for storage_type in storage_types:
@@ -132,9 +136,11 @@ class CollectionWebService(SaveWebHelper,
                     App().albums.set_storage_type(album_id,
                                                   StorageType.EPHEMERAL)
                     App().tracks.remove_album(album_id, False)
+                removed_album_ids += album_ids
         # On cancel, clean not needed, done in Application::quit()
         if not self.__cancellable.is_cancelled():
             App().tracks.clean(False)
             App().albums.clean(False)
             App().artists.clean(False)
         SqlCursor.remove(App().db)
+        return removed_album_ids
@@ -32,8 +32,10 @@ class DeezerCollectionWebService(DeezerWebHelper):
         """
             Add charts to DB
             @param cancellable as Gio.Cancellable
+            @return [int]: saved album ids
         """
         Logger.info("Get charts with Deezer")
+        payloads = []
         try:
             album_ids = []
             uri = "https://api.deezer.com/chart/0/albums?limit=30"
@@ -50,12 +52,13 @@ class DeezerCollectionWebService(DeezerWebHelper):
                     self, album_id, cancellable)
                 if payload is None:
                     continue
-                lollypop_payload = DeezerWebHelper.lollypop_album_payload(
-                    self, payload)
-                self.save_album_payload_to_db(lollypop_payload,
-                                              StorageType.DEEZER_CHARTS,
-                                              True,
-                                              cancellable)
+                payloads.append(DeezerWebHelper.lollypop_album_payload(
+                    self, payload))
         except Exception as e:
             Logger.warning(
                 "DeezerCollectionWebService::search_charts(): %s", e)
+        items = self.save_album_payloads_to_db(payloads,
+                                               StorageType.DEEZER_CHARTS,
+                                               True,
+                                               cancellable)
+        return [item.album_id for item in items]
@@ -36,10 +36,12 @@ class SpotifyCollectionWebService(SpotifyWebHelper):
         """
             Add similar albums to DB
             @param cancellable as Gio.Cancellable
+            @return [int]: saved album ids
         """
         Logger.info("Get similar albums from Spotify")
         from lollypop.similars_spotify import SpotifySimilars
         similars = SpotifySimilars()
+        payloads = []
         try:
             storage_type = get_default_storage_type()
             artists = App().artists.get_randoms(
@@ -56,23 +58,25 @@ class SpotifyCollectionWebService(SpotifyWebHelper):
                 for album in albums_payload:
                     if cancellable.is_cancelled():
                         raise Exception("Cancelled")
-                    lollypop_payload = SpotifyWebHelper.lollypop_album_payload(
-                        self, album)
-                    self.save_album_payload_to_db(
-                                           lollypop_payload,
-                                           StorageType.SPOTIFY_SIMILARS,
-                                           True,
-                                           cancellable)
+                    payloads.append(SpotifyWebHelper.lollypop_album_payload(
+                        self, album))
                     break
         except Exception as e:
             Logger.warning("SpotifyWebService::search_similar_albums(): %s", e)
+        items = self.save_album_payloads_to_db(payloads,
+                                               StorageType.SPOTIFY_SIMILARS,
+                                               True,
+                                               cancellable)
+        return [item.album_id for item in items]
 
     def search_new_releases(self, cancellable):
         """
             Get new released albums from spotify
             @param cancellable as Gio.Cancellable
+            @return [int]: saved album ids
         """
         Logger.info("Get new releases from Spotify")
+        album_ids = []
         try:
             locale = getdefaultlocale()[0][0:2]
             token = App().ws_director.token_ws.get_token("SPOTIFY",
@@ -89,17 +93,15 @@ class SpotifyCollectionWebService(SpotifyWebHelper):
                     uri, headers, cancellable)
                 if status:
                     decode = json.loads(data.decode("utf-8"))
-                    for album in decode["albums"]["items"]:
-                        if cancellable.is_cancelled():
-                            raise Exception("Cancelled")
-                        lollypop_payload =\
-                            SpotifyWebHelper.lollypop_album_payload(
-                                self, album)
-                        self.save_album_payload_to_db(
-                                             lollypop_payload,
+                    payloads = [SpotifyWebHelper.lollypop_album_payload(
+                                    self, album)
+                                for album in decode["albums"]["items"]]
+                    items = self.save_album_payloads_to_db(
+                                             payloads,
                                              StorageType.SPOTIFY_NEW_RELEASES,
                                              True,
                                              cancellable)
+                    album_ids += [item.album_id for item in items]
                     # Check if storage type needs to be updated
                     # Check if albums newer than a week are enough
                     timestamp = time() - 604800
@@ -110,6 +112,7 @@ class SpotifyCollectionWebService(SpotifyWebHelper):
                         break
         except Exception as e:
             Logger.warning("SpotifyWebService::search_new_releases(): %s", e)
+        return album_ids
 
 #######################
 # PRIVATE             #